@@ -0,0 +1,74 @@
+"""Measure the render time of a full 12-floor abyss record, decoding the static images for every card (cold,
+the behaviour before the asset cache and sprites) and blitting from the prepared sprites (warm).
+
+Needs the images and fonts in `data/` (run `start.sh` once, or copy `assets/` to `data/`).
+
+Usage (from the project root): `python -m benchmark.abyss_card --records 10`
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from genshin_py.painter.genshin import render_abyss_card
+from utility import AssetCache
+
+FLOORS = 12
+
+
+def sample_chambers() -> list[tuple[int, list[list[tuple[int, int, str]]]]]:
+    """3 chambers of 2 battles of 4 characters, using the character portraits found in data/image/character"""
+    ids = [
+        int(path.stem)
+        for path in Path("data/image/character").glob("*.png")
+        if path.stem.isdigit()
+    ]
+    ids = (ids or [10000002]) * 8
+    return [
+        (
+            3,
+            [
+                [(ids[c * 8 + b * 4 + i], 4 + i % 2, f"{i}life 90class") for i in range(4)]
+                for b in range(2)
+            ],
+        )
+        for c in range(3)
+    ]
+
+
+def render_record(
+    chambers: list[tuple[int, list[list[tuple[int, int, str]]]]], cold: bool
+) -> float:
+    """Render the 12 floors of one abyss record, return the time (unit: millisecond)"""
+    started = time.perf_counter()
+    for floor in range(1, FLOORS + 1):
+        if cold:
+            AssetCache.clear()
+        render_abyss_card(floor, chambers)
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--records", type=int, default=10, help="number of abyss records rendered by each variant"
+    )
+    args = parser.parse_args()
+
+    chambers = sample_chambers()
+    for name, cold in (("cold", True), ("warm", False)):
+        AssetCache.clear()
+        if not cold:
+            AssetCache.warm_up()
+        durations = [render_record(chambers, cold) for _ in range(args.records)]
+        print(
+            f"{name}: mean {statistics.mean(durations):8.1f} ms  min {min(durations):8.1f} ms  "
+            f"per card {statistics.mean(durations) / FLOORS:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Synthetic, offline inputs of the painters, shaped like the data the bot passes to the render pool.
+
+The Genshin and Star Rail painters render from primitives built out of the genshin.py models (see the
+`draw_*` functions), so their fixtures are those primitives; the Enka card renders from the Enka models,
+so its fixture is an `EnkaNetworkResponse` parsed from a synthetic API payload.
+"""
+
+from io import BytesIO
+from typing import Any
+
+from PIL import Image
+
+UID = 800000000
+NICKNAME = "Benchmark"
+
+
+def avatar_bytes() -> bytes:
+    """A 256x256 Discord avatar"""
+    fp = BytesIO()
+    Image.new("RGB", (256, 256), (90, 140, 200)).save(fp, "png")
+    return fp.getvalue()
+
+
+def record_card() -> tuple[Any, ...]:
+    """Arguments of `render_record_card`"""
+    stat_list = [(100 + i * 37, f"Stat {i}") for i in range(17)]
+    return (avatar_bytes(), UID, NICKNAME, "os_asia", 60, 1, stat_list)
+
+
+def exploration_card() -> tuple[Any, ...]:
+    """Arguments of `render_exploration_card`"""
+    stat_list = [("Explore", 100.0 - i * 3.5, f"Region {i}") for i in range(13)]
+    stat_list += [("Level", 10 + i, f"Offering {i}") for i in range(6)]
+    return (avatar_bytes(), UID, NICKNAME, "os_asia", 60, 1, stat_list)
+
+
+def abyss_card() -> tuple[Any, ...]:
+    """Arguments of `render_abyss_card`: floor 12, 3 chambers of 2 battles of 4 characters"""
+    character_ids = [
+        10000002,
+        10000016,
+        10000030,
+        10000032,
+        10000037,
+        10000046,
+        10000052,
+        10000073,
+    ]
+    chambers = [
+        (
+            3,
+            [
+                [(character_ids[b * 4 + i], 5 - i % 2, f"{i}life 90class") for i in range(4)]
+                for b in range(2)
+            ],
+        )
+        for _ in range(3)
+    ]
+    return (12, chambers)
+
+
+def forgottenhall_card() -> tuple[Any, ...]:
+    """Arguments of `render_forgottenhall_card`: 3 floors of 2 nodes of 4 characters"""
+    character_ids = [1001, 1002, 1003, 1004, 1005, 1006, 1008, 1009]
+    header = {
+        "background": "data/image/forgotten_hall/bg.png",
+        "title": f"{NICKNAME} The Garden of Oblivion",
+        "period": "2024.01.01 ~ 2024.02.12",
+        "progress": "Level Progress：12　Number of battles：15",
+        "stars": "★：36",
+    }
+    floors = [
+        {
+            "name": f"Floor {12 - f}",
+            "round_num": 5 + f,
+            "score": None,
+            "star_num": 3,
+            "nodes": [
+                [(character_ids[n * 4 + i], 5 - i % 2, f"{i}soul 80class") for i in range(4)]
+                for n in range(2)
+            ],
+        }
+        for f in range(3)
+    ]
+    return (avatar_bytes(), UID, header, floors)
+
+
+def _artifact(equip_type: str, index: int) -> dict[str, Any]:
+    return {
+        "itemId": 80000 + index,
+        "reliquary": {
+            "level": 21,
+            "mainPropId": 10000 + index,
+            "appendPropIdList": [501024, 501054, 501064, 501204],
+        },
+        "flat": {
+            "nameTextMapHash": "1",
+            "setNameTextMapHash": "1524173875",
+            "rankLevel": 5,
+            "reliquaryMainstat": {
+                "mainPropId": "FIGHT_PROP_HP" if index == 0 else "FIGHT_PROP_ATTACK_PERCENT",
+                "statValue": 46.6,
+            },
+            "reliquarySubstats": [
+                {"appendPropId": "FIGHT_PROP_CRITICAL", "statValue": 10.5},
+                {"appendPropId": "FIGHT_PROP_CRITICAL_HURT", "statValue": 21.0},
+                {"appendPropId": "FIGHT_PROP_ATTACK_PERCENT", "statValue": 9.9},
+                {"appendPropId": "FIGHT_PROP_CHARGE_EFFICIENCY", "statValue": 6.5},
+            ],
+            "itemType": "ITEM_RELIQUARY",
+            "icon": f"UI_RelicIcon_15006_{index + 1}",
+            "equipType": equip_type,
+        },
+    }
+
+
+def enka_payload() -> dict[str, Any]:
+    """A synthetic Enka.Network API response with one Diluc"""
+    return {
+        "uid": str(UID),
+        "ttl": 60,
+        "playerInfo": {
+            "nickname": NICKNAME,
+            "level": 60,
+            "signature": "",
+            "worldLevel": 8,
+            "nameCardId": 210001,
+            "finishAchievementNum": 900,
+            "towerFloorIndex": 12,
+            "towerLevelIndex": 3,
+            "showAvatarInfoList": [{"avatarId": 10000016, "level": 90}],
+            "profilePicture": {"avatarId": 10000016},
+        },
+        "avatarInfoList": [
+            {
+                "avatarId": 10000016,
+                "propMap": {"1001": {"ival": "0"}, "1002": {"ival": "6"}, "4001": {"ival": "90"}},
+                "talentIdList": [161, 162],
+                "fightPropMap": {
+                    "1": 12981.0,
+                    "2": 4000.0,
+                    "3": 0.2,
+                    "4": 335.0,
+                    "5": 311.0,
+                    "6": 1.2,
+                    "7": 784.0,
+                    "20": 0.65,
+                    "22": 1.85,
+                    "23": 1.3,
+                    "28": 80.0,
+                    "40": 0.466,
+                    "2000": 20000.0,
+                    "2001": 2300.0,
+                    "2002": 950.0,
+                    "1000": 40.0,
+                },
+                "skillDepotId": 1601,
+                "inherentProudSkillList": [162101, 162301],
+                "skillLevelMap": {"10160": 9, "10161": 9, "10165": 9},
+                "fetterInfo": {"expLevel": 10},
+                "equipList": [
+                    _artifact(equip_type, index)
+                    for index, equip_type in enumerate(
+                        [
+                            "EQUIP_BRACER",
+                            "EQUIP_NECKLACE",
+                            "EQUIP_SHOES",
+                            "EQUIP_RING",
+                            "EQUIP_DRESS",
+                        ]
+                    )
+                ]
+                + [
+                    {
+                        "itemId": 12502,
+                        "weapon": {"level": 90, "promoteLevel": 6, "affixMap": {"112502": 0}},
+                        "flat": {
+                            "nameTextMapHash": "1",
+                            "rankLevel": 5,
+                            "weaponStats": [
+                                {"appendPropId": "FIGHT_PROP_BASE_ATTACK", "statValue": 608},
+                                {"appendPropId": "FIGHT_PROP_ATTACK_PERCENT", "statValue": 49.6},
+                            ],
+                            "itemType": "ITEM_WEAPON",
+                            "icon": "UI_EquipIcon_Claymore_Wolfmound",
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def enka_card() -> tuple[Any, ...]:
+    """Arguments of `render_image`"""
+    from enkanetwork import EnkaNetworkResponse
+
+    data = EnkaNetworkResponse.parse_obj(enka_payload())
+    return (data, data.characters[0])
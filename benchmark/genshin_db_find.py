@@ -0,0 +1,88 @@
+"""Measure `GenshinDbAllData.find` over the full genshin-db catalog: the unified index against the chain of
+category lookups it replaced, for every item name, lower-cased names and unknown names.
+
+Uses the local snapshot (`config.genshin_db_snapshot_path`) when there is one, otherwise requests the API.
+
+Usage (from the project root): `python -m benchmark.genshin_db_find --rounds 20`
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Callable
+
+import genshin_db
+
+
+def chained_find(data: genshin_db.GenshinDbAllData) -> Callable[[str], object]:
+    """The lookup before the unified index: one dictionary per category, tried one after another"""
+
+    def find(item_name: str) -> object:
+        return (
+            data.achievements.find(item_name)
+            or data.tcg_cards.find(item_name)
+            or data.weapons.find(item_name)
+            or data.foods.find(item_name)
+            or data.materials.find(item_name)
+            or data.artifacts.find(item_name)
+            or data.characters.find(item_name)
+            or data.constellations.find(item_name)
+            or data.talents.find(item_name)
+        )
+
+    return find
+
+
+def load() -> genshin_db.GenshinDbAllData:
+    if (data := genshin_db.Snapshot.load()) is not None:
+        return data
+    data, _ = asyncio.run(genshin_db.Snapshot.fetch())
+    return data
+
+
+def measure(find: Callable[[str], object], names: list[str], rounds: int) -> tuple[float, int]:
+    """Return the mean time per lookup (unit: microsecond) and the number of names found"""
+    found = sum(find(name) is not None for name in names)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            find(name)
+    return (time.perf_counter() - started) / (rounds * len(names)) * 1e6, found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rounds", type=int, default=20, help="number of lookups of every name")
+    args = parser.parse_args()
+
+    data = load()
+    categories = (
+        data.achievements,
+        data.tcg_cards,
+        data.weapons,
+        data.foods,
+        data.materials,
+        data.artifacts,
+        data.characters,
+        data.constellations,
+        data.talents,
+    )
+    names = sorted({item.name for category in categories for item in category.list})
+    workloads = {
+        "names": names,
+        "lower-cased": [name.lower() for name in names],
+        "unknown": [f"{name} (unknown)" for name in names],
+    }
+    print(f"{len(names)} item names")
+    for workload, queries in workloads.items():
+        for variant, find in (("chained", chained_find(data)), ("index", data.find)):
+            per_lookup, found = measure(find, queries, args.rounds)
+            print(
+                f"{workload:>12} {variant:>8}: {per_lookup:7.3f} µs per lookup, {found}/{len(queries)} found"
+            )
+
+
+if __name__ == "__main__":
+    main()
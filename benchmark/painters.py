@@ -0,0 +1,144 @@
+"""Render every painter N times with synthetic fixtures and report p50/p95 latency, peak RSS and output size.
+
+Each painter runs in a fresh process, in the same way as in the render pool. With `--baseline`, the run fails
+(exit code 1) when the p95 latency or the output size of a painter grows beyond `--threshold` of the baseline;
+`--save-baseline` writes the results of this run as the new baseline.
+
+Needs the images and fonts in `data/` (run `start.sh` once, or copy `assets/` to `data/`). The Enka card
+downloads its missing art into `enka_network/attributes` on the first run, later runs are offline.
+
+Usage (from the project root):
+    python -m benchmark.painters --runs 20 --save-baseline benchmark/baseline.json
+    python -m benchmark.painters --runs 20 --baseline benchmark/baseline.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from . import fixtures
+
+
+def painters() -> dict[str, tuple[Callable[..., bytes], Callable[[], tuple[Any, ...]]]]:
+    """{name: (rendering function, fixture)}, imported in the benchmark process"""
+    from enka_network.enka_card import render_image
+    from genshin_py.painter.genshin import (
+        render_abyss_card,
+        render_exploration_card,
+        render_record_card,
+    )
+    from genshin_py.painter.starrail import render_forgottenhall_card
+
+    return {
+        "record_card": (render_record_card, fixtures.record_card),
+        "exploration_card": (render_exploration_card, fixtures.exploration_card),
+        "abyss_card": (render_abyss_card, fixtures.abyss_card),
+        "forgottenhall_card": (render_forgottenhall_card, fixtures.forgottenhall_card),
+        "enka_card": (render_image, fixtures.enka_card),
+    }
+
+
+PAINTERS = ("record_card", "exploration_card", "abyss_card", "forgottenhall_card", "enka_card")
+
+
+def run(name: str, runs: int) -> dict[str, float]:
+    """Render the painter `runs` times after one warm-up render, in a fresh process"""
+    fn, fixture = painters()[name]
+    args = fixture()
+    if name == "enka_card":
+        asyncio.run(_prefetch_enka_assets(args[1]))
+    size = len(fn(*args))  # warm-up: fonts, sprites
+    durations: list[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(*args)
+        durations.append((time.perf_counter() - started) * 1000)
+    quantiles = statistics.quantiles(durations, n=100)
+    return {
+        "p50_ms": quantiles[49],
+        "p95_ms": quantiles[94],
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "size_kib": size / 1024,
+    }
+
+
+async def _prefetch_enka_assets(character: Any) -> None:
+    """Download the Enka card art as the bot does before submitting the card to the render pool"""
+    from enka_network.enka_card import prefetch_assets
+    from utility import HttpClient
+
+    try:
+        await prefetch_assets(character)
+    finally:
+        await HttpClient.close()
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """Return the regressions of p95 latency and output size beyond the threshold"""
+    regressions: list[str] = []
+    for name, result in results.items():
+        if (base := baseline.get(name)) is None:
+            continue
+        for metric in ("p95_ms", "size_kib"):
+            if result[metric] > base[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name} {metric}: {result[metric]:.1f} > baseline {base[metric]:.1f} (+{threshold:.0%})"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=20, help="number of renders of each painter")
+    parser.add_argument(
+        "--only", nargs="*", choices=PAINTERS, default=PAINTERS, help="painters to run"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, help="fail when the results regress beyond this baseline"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed regression, 0.2 means +20%%"
+    )
+    parser.add_argument("--save-baseline", type=Path, help="write the results to this file")
+    args = parser.parse_args()
+    runs = max(args.runs, 2)  # quantiles need at least two samples
+
+    results: dict[str, dict[str, float]] = {}
+    for name in args.only:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            try:
+                results[name] = executor.submit(run, name, runs).result()
+            except Exception as e:
+                print(f"{name:>18}: failed: {e!r}")
+                continue
+        r = results[name]
+        print(
+            f"{name:>18}: p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  "
+            f"peak RSS {r['peak_rss_mib']:7.1f} MiB  size {r['size_kib']:7.1f} KiB"
+        )
+
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline is not None:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if len(regressions) > 0 or len(results) < len(args.only):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare drawing the translucent panels of a record card by compositing the whole canvas (previous
+`draw_rounded_rect`) and by compositing only the bounding box of each panel (current `draw_rounded_rect`).
+
+Each variant runs in a fresh process, so the peak memory (max RSS) of one variant does not hide the other.
+
+Usage (from the project root): `python -m benchmark.rounded_rect --cards 200`
+"""
+
+import argparse
+import resource
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+
+from PIL import Image, ImageChops, ImageDraw
+
+from genshin_py.painter.genshin import draw_rounded_rect
+
+CANVAS_SIZE = (1080, 1920)
+PANELS: list[tuple[float, float, float, float]] = [(340, 130, 990, 320), (90, 380, 990, 1810)]
+"""The panels of `draw_basic_card`"""
+
+
+def draw_rounded_rect_full_canvas(
+    img: Image.Image, pos: tuple[float, float, float, float], **kwargs
+):
+    """The previous implementation, composites an overlay of the whole canvas"""
+    transparent = Image.new("RGBA", img.size, 0)
+    draw = ImageDraw.Draw(transparent, "RGBA")
+    draw.rounded_rectangle(pos, **kwargs)
+    img.paste(Image.alpha_composite(img, transparent))
+
+
+VARIANTS: dict[str, Callable[..., None]] = {
+    "full": draw_rounded_rect_full_canvas,
+    "bbox": draw_rounded_rect,
+}
+
+
+def draw_card(variant: str) -> Image.Image:
+    img = Image.new("RGBA", CANVAS_SIZE, (120, 160, 200, 255))
+    for panel in PANELS:
+        VARIANTS[variant](img, panel, radius=30, fill=(0, 0, 0, 120))
+    return img
+
+
+def run(variant: str, cards: int) -> tuple[list[float], int]:
+    """Draw the cards, return the time of each card (unit: millisecond) and the growth of max RSS (unit: KiB)"""
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    durations: list[float] = []
+    for _ in range(cards):
+        started = time.perf_counter()
+        draw_card(variant)
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--cards", type=int, default=200, help="number of cards drawn by each variant"
+    )
+    args = parser.parse_args()
+
+    if ImageChops.difference(draw_card("full"), draw_card("bbox")).getbbox() is not None:
+        print("warning: the variants draw different images")
+
+    for variant in VARIANTS:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            durations, rss = executor.submit(run, variant, args.cards).result()
+        quantiles = statistics.quantiles(durations, n=100)
+        print(
+            f"{variant:>5}: p50 {quantiles[49]:7.2f} ms  p95 {quantiles[94]:7.2f} ms  "
+            f"peak RSS growth {rss / 1024:7.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
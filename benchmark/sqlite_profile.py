@@ -0,0 +1,127 @@
+"""Measure the latency of interactive reads while a check-in sweep is writing, with and without the SQLite tuning profile.
+
+The writer updates `next_checkin_time` of every `ScheduleDailyCheckin` row with one commit per user, like a sweep
+without the write buffer; the reader selects random `User` rows in a loop, like slash commands do.
+
+Usage (from the project root): `python -m benchmark.sqlite_profile --users 5000 --duration 10`
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from database.app import apply_sqlite_pragmas, sqlite_pragmas
+from database.models import Base, ScheduleDailyCheckin, User
+
+
+def create_engine(path: Path, pragmas: dict[str, str | int]) -> AsyncEngine:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+    @sqlalchemy.event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    return engine
+
+
+async def prepare(engine: AsyncEngine, users: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.now()
+    async with sessionmaker() as session:
+        for i in range(users):
+            session.add(User(discord_id=i, cookie_default="ltuid=0; ltoken=0"))
+            session.add(
+                ScheduleDailyCheckin(
+                    discord_id=i, discord_channel_id=0, is_mention=False, next_checkin_time=now
+                )
+            )
+        await session.commit()
+
+
+async def writer(engine: AsyncEngine, users: int, stop: asyncio.Event) -> int:
+    """Update the check-in time of each user in its own transaction, return the number of commits"""
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    commits = 0
+    while not stop.is_set():
+        for i in range(users):
+            if stop.is_set():
+                break
+            async with sessionmaker() as session:
+                await session.execute(
+                    sqlalchemy.update(ScheduleDailyCheckin)
+                    .where(ScheduleDailyCheckin.discord_id == i)
+                    .values(next_checkin_time=datetime.now() + timedelta(days=1))
+                )
+                await session.commit()
+            commits += 1
+    return commits
+
+
+async def reader(engine: AsyncEngine, users: int, stop: asyncio.Event) -> list[float]:
+    """Select random users in a loop, return the latency of each read (unit: millisecond)"""
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    latencies: list[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        async with sessionmaker() as session:
+            await session.execute(
+                sqlalchemy.select(User).where(User.discord_id == random.randrange(users))
+            )
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def run(name: str, pragmas: dict[str, str | int], users: int, duration: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        # Separate engines, so that the reader does not queue behind the writer in one connection pool
+        path = Path(directory) / "bench.db"
+        write_engine = create_engine(path, pragmas)
+        read_engine = create_engine(path, pragmas)
+        await prepare(write_engine, users)
+
+        stop = asyncio.Event()
+        write_task = asyncio.create_task(writer(write_engine, users, stop))
+        read_task = asyncio.create_task(reader(read_engine, users, stop))
+        await asyncio.sleep(duration)
+        stop.set()
+        commits = await write_task
+        latencies = await read_task
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>8}: writes {commits / duration:8.1f}/s | reads {len(latencies):6d} "
+        f"p50 {quantiles[49]:7.2f} ms  p95 {quantiles[94]:7.2f} ms  max {max(latencies):7.2f} ms"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--users", type=int, default=5000, help="number of users in the database")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="duration of each run (unit: second)"
+    )
+    args = parser.parse_args()
+
+    print(f"Tuned profile: {sqlite_pragmas()}")
+    await run("default", {}, args.users, args.duration)
+    await run("tuned", sqlite_pragmas(), args.users, args.duration)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
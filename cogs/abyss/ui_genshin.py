@@ -6,7 +6,7 @@ import genshin
 
 import genshin_py
 from database import Database, GenshinSpiralAbyss
-from utility import EmbedTemplate, config
+from utility import EmbedTemplate, config, image_filename
 
 
 class AbyssRecordDropdown(discord.ui.Select):
@@ -112,9 +112,10 @@ class AbyssFloorDropdown(discord.ui.Select):
                 self.abyss_data.characters,
             )
             fp.seek(0)
-            self.embed.set_image(url="attachment://image.jpeg")
+            filename = image_filename("abyss_card")
+            self.embed.set_image(url=f"attachment://{filename}")
             await interaction.edit_original_response(
-                embed=self.embed, attachments=[discord.File(fp, "image.jpeg")]
+                embed=self.embed, attachments=[discord.File(fp, filename)]
             )
 
 
@@ -5,7 +5,7 @@ import discord
 
 import genshin_py
 from database import Database, StarrailForgottenHall, StarrailPureFiction, User
-from utility import EmbedTemplate, config
+from utility import EmbedTemplate, config, image_filename
 
 
 class AbyssMode(str, enum.Enum):
@@ -147,9 +147,10 @@ class HallFloorDropdown(discord.ui.Select):
                 self.avatar, self.nickname, self.uid, self.hall_data.data, floors
             )
             fp.seek(0)
-            self.embed.set_image(url="attachment://image.jpeg")
+            filename = image_filename("forgottenhall_card")
+            self.embed.set_image(url=f"attachment://{filename}")
             await interaction.edit_original_response(
-                embed=self.embed, attachments=[discord.File(fp, "image.jpeg")]
+                embed=self.embed, attachments=[discord.File(fp, filename)]
             )
 
 
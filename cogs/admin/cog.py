@@ -4,11 +4,11 @@ import typing
 from datetime import datetime, time, timedelta
 
 import discord
-import enkanetwork
 from discord import app_commands
 from discord.app_commands import Choice
 from discord.ext import commands, tasks
 
+import enka_network
 from genshin_py import auto_task
 from utility import SlashCommandLogger, config, get_app_command_mention
 
@@ -74,10 +74,7 @@ class Admin(commands.Cog):
                 await interaction.edit_original_response(content="Start executing the daily auto check-in")
                 asyncio.create_task(auto_task.DailyReward.execute(self.bot))
             case "UPDATE_ENKA_ASSETS":  # Update Enka assets for a new version
-                client = enkanetwork.EnkaNetworkAPI()
-                async with client:
-                    await client.update_assets()
-                enkanetwork.Assets(lang=enkanetwork.Language.EN)
+                await enka_network.update_assets(force=True)
                 await interaction.edit_original_response(content="Enka data update completed")
 
     # /config command: Set config file parameters
@@ -86,19 +83,12 @@ class Admin(commands.Cog):
     @app_commands.choices(
         option=[
             Choice(name="schedule_daily_reward_time", value="schedule_daily_reward_time"),
-            Choice(
-                name="schedule_check_resin_interval",
-                value="schedule_check_resin_interval",
-            ),
             Choice(name="schedule_loop_delay", value="schedule_loop_delay"),
         ]
     )
     @SlashCommandLogger
     async def slash_config(self, interaction: discord.Interaction, option: str, value: str):
-        if option in [
-            "schedule_daily_reward_time",
-            "schedule_check_resin_interval",
-        ]:
+        if option in ["schedule_daily_reward_time"]:
             setattr(config, option, int(value))
         elif option in ["schedule_loop_delay"]:
             setattr(config, option, float(value))
@@ -150,7 +140,9 @@ class Admin(commands.Cog):
     # Refresh genshin_db API data every day at a specific time
     @tasks.loop(time=time(hour=20, minute=00))
     async def refresh_genshin_db(self):
-        await self.bot.reload_extension("cogs.data_search.cog")
+        search = self.bot.get_cog("search-data")
+        if search is not None:
+            await search.refresh()  # type: ignore
 
     @refresh_genshin_db.before_loop
     async def before_refresh_genshin_db(self):
@@ -10,7 +10,7 @@ from genshinpyrail.src.tools.model import GenshinCharterList, StarRaillCharterLi
 from typing import Optional
 
 import genshin_py
-from utility import EmbedTemplate
+from utility import EmbedTemplate, encode_image, image_filename
 from utility.custom_log import SlashCommandLogger
 
 from .ui import DropdownView
@@ -73,14 +73,12 @@ class CharactersCog(commands.Cog, name="characters-list"):
             await interaction.edit_original_response(content="Please choose a character: ", view=view)
             return
         else:
-            fp = io.BytesIO()
-            image = image.convert("RGB")
-            image.save(fp, "jpeg", optimize=True, quality=90)
-            fp.seek(0)
+            fp = io.BytesIO(await asyncio.to_thread(encode_image, image, "character_list"))
+            filename = image_filename("character_list")
             embed = EmbedTemplate.normal(f"{user.display_name}'s Characters Overview")
-            embed.set_image(url="attachment://image.jpeg")
+            embed.set_image(url=f"attachment://{filename}")
             await interaction.edit_original_response(
-                embed=embed, attachments=[discord.File(fp, "image.jpeg")]
+                embed=embed, attachments=[discord.File(fp, filename)]
             )
 
 
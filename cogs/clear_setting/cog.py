@@ -2,6 +2,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
+import genshin_py
 from database import Database
 from utility import custom_log
 
@@ -21,6 +22,7 @@ class ClearSettingCog(commands.Cog, name="clear-user-data"):
         await view.wait()
         if view.value is True:
             await Database.delete_all(interaction.user.id)
+            genshin_py.invalidate_client(interaction.user.id)
             await interaction.edit_original_response(content="All user data has been deleted", view=None)
         else:
             await interaction.edit_original_response(content="Command canceled", view=None)
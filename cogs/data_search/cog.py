@@ -1,4 +1,4 @@
-import random
+import asyncio
 from typing import Iterable, List, Literal
 
 import discord
@@ -8,7 +8,7 @@ from discord.app_commands import Choice
 from discord.ext import commands
 
 import genshin_db
-from utility import EmbedTemplate, config, custom_log
+from utility import EmbedTemplate, Startup, config, custom_log
 
 from .ui import SearchResultsDropdown
 
@@ -16,9 +16,79 @@ StrCategory = Literal["Character", "Weapon", "Artifact", "Item/Food", "Achieveme
 
 
 class Search(commands.Cog, name="search-data"):
-    def __init__(self, bot: commands.Bot, genshin_db_data: genshin_db.GenshinDbAllData):
+    def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = genshin_db_data
+        self.db: genshin_db.GenshinDbAllData | None = None
+        """The data being searched, `None` until the snapshot or the API has been loaded"""
+        self.indexes: dict[str, genshin_db.SearchIndex] = {}
+        """{category: name index of the category} of `self.db`, used by the autocomplete"""
+        self._load_task: asyncio.Task | None = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def cog_load(self) -> None:
+        self._load_task = Startup.background("genshin-db data", self._load())
+
+    async def cog_unload(self) -> None:
+        if self._load_task is not None:
+            self._load_task.cancel()
+
+    async def _load(self) -> None:
+        """Load the local snapshot, then refresh it from the API when it is missing or outdated"""
+        try:
+            if (data := await asyncio.to_thread(genshin_db.Snapshot.load)) is not None:
+                await self._swap(data)
+        except Exception as e:
+            custom_log.LOG.Error(f"Failed to load the genshin-db snapshot: {e}")
+            sentry_sdk.capture_exception(e)
+        age = genshin_db.Snapshot.age()
+        if self.db is None or age is None or age > config.genshin_db_refresh_interval * 3600:
+            await self.refresh()
+
+    async def refresh(self) -> bool:
+        """Request the genshin-db data from the API and swap it in, the old data is served until then
+
+        Returns
+        ------
+        `bool`
+            Whether the data has been refreshed
+        """
+        async with self._refresh_lock:
+            try:
+                data, raw = await genshin_db.Snapshot.fetch()
+            except Exception as e:
+                custom_log.LOG.Error(f"Failed to refresh the genshin-db data: {e}")
+                sentry_sdk.capture_exception(e)
+                return False
+            await self._swap(data)
+            try:
+                await asyncio.to_thread(genshin_db.Snapshot.save, raw, data.version)
+            except Exception as e:
+                custom_log.LOG.Error(f"Failed to save the genshin-db snapshot: {e}")
+                sentry_sdk.capture_exception(e)
+            return True
+
+    async def _swap(self, data: genshin_db.GenshinDbAllData) -> None:
+        """Build the name indexes of the data in a worker thread, then replace the data and the indexes together"""
+        indexes = await asyncio.to_thread(self._build_indexes, data)
+        self.db, self.indexes = data, indexes
+        genshin_db.clear_embed_cache()
+
+    @staticmethod
+    def _build_indexes(data: genshin_db.GenshinDbAllData) -> dict[str, genshin_db.SearchIndex]:
+        categories: dict[str, Iterable[genshin_db.GenshinDbBase]] = {
+            "Character": data.characters.list,
+            "Weapon": data.weapons.list,
+            "Artifact": data.artifacts.list,
+            "Item/Food": data.materials.list + data.foods.list,
+            "Achievement": data.achievements.list,
+            "TCG-cards": data.tcg_cards.list,
+        }
+        return {
+            category: genshin_db.SearchIndex(
+                (item.name for item in items), config.genshin_db_aliases
+            )
+            for category, items in categories.items()
+        }
 
     @app_commands.command(name="search-data", description="Search the Genshin Impact database")
     @app_commands.rename(category="category", item_name="name")
@@ -41,37 +111,41 @@ class Search(commands.Cog, name="search-data"):
         item_name: str,
     ):
         """Search genshin-db database with a slash command"""
+        if self.db is None:
+            _embed = EmbedTemplate.normal("The database is still loading, please try again later")
+            await interaction.response.send_message(embed=_embed, ephemeral=True)
+            return
         titles: list[str] = []
         embeds: list[discord.Embed] = []
         match category:
             case "Character":
                 character = self.db.characters.find(item_name)
                 titles.append("Basic Information")
-                embeds.append(genshin_db.parse(character))
+                embeds.append(genshin_db.parse(character, self.db.version))
 
                 # Special handling for Traveler with multiple elements
                 if "Traveler" in item_name:
                     for element in ["Anemo", "Geo", "Electro", "Dendro", "Hydro"]:
                         talent = self.db.talents.find(f"Traveler ({element})")
                         titles.append(f"Talent: {element}")
-                        embeds.append(genshin_db.parse(talent))
+                        embeds.append(genshin_db.parse(talent, self.db.version))
                     for element in ["Anemo", "Geo", "Electro", "Dendro", "Hydro"]:
                         constell = self.db.constellations.find(f"Traveler ({element})")
                         titles.append(f"Constellation: {element}")
-                        embeds.append(genshin_db.parse(constell))
+                        embeds.append(genshin_db.parse(constell, self.db.version))
                 else:
                     talent = self.db.talents.find(item_name)
                     titles.append("Talent")
-                    embeds.append(genshin_db.parse(talent))
+                    embeds.append(genshin_db.parse(talent, self.db.version))
                     constell = self.db.constellations.find(item_name)
                     titles.append("Constellation")
-                    embeds.append(genshin_db.parse(constell))
+                    embeds.append(genshin_db.parse(constell, self.db.version))
             case "Artifact":
                 artifact = self.db.artifacts.find(item_name)
                 if artifact is None:
                     return
                 titles = ["Overview"]
-                embeds = [genshin_db.parse(artifact)]
+                embeds = [genshin_db.parse(artifact, self.db.version)]
                 _titles = ["Flower", "Plume", "Sands", "Goblet", "Circlet"]
                 _parts = [
                     artifact.flower,
@@ -83,10 +157,10 @@ class Search(commands.Cog, name="search-data"):
                 for i, _part in enumerate(_parts):
                     if _part is not None:
                         titles.append(_titles[i])
-                        embeds.append(genshin_db.parse(_part))
+                        embeds.append(genshin_db.parse(_part, self.db.version))
             case _:
                 item = self.db.find(item_name)
-                embeds.append(genshin_db.parse(item))
+                embeds.append(genshin_db.parse(item, self.db.version))
 
         match len(embeds):
             case 0:
@@ -109,33 +183,10 @@ class Search(commands.Cog, name="search-data"):
         if category is None:
             return []
 
-        item_list: Iterable[genshin_db.GenshinDbBase] = {
-            "Character": self.db.characters.list,
-            "Weapon": self.db.weapons.list,
-            "Artifact": self.db.artifacts.list,
-            "Item/Food": self.db.materials.list + self.db.foods.list,
-            "Achievement": self.db.achievements.list,
-            "TCG-cards": self.db.tcg_cards.list,
-        }.get(category, [])
-
-        choices: List[Choice[str]] = []
-        for item in item_list:
-            if current.lower() in item.name.lower():
-                choices.append(Choice(name=item.name, value=item.name))
-        # Randomly select 25 if the user didn't input anything
-        if current == "":
-            choices = random.sample(choices, k=25)
-
-        choices = choices[:25]
-        choices.sort(key=lambda choice: choice.name)
-        return choices
+        if (index := self.indexes.get(category)) is None:
+            return []
+        return [Choice(name=name, value=name) for name in index.search(current)]
 
 
 async def setup(client: commands.Bot):
-    try:
-        gdb_data = await genshin_db.fetch_all()
-    except Exception as e:
-        custom_log.LOG.Error(str(e))
-        sentry_sdk.capture_exception(e)
-    else:
-        await client.add_cog(Search(client, gdb_data))
+    await client.add_cog(Search(client))
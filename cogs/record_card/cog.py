@@ -8,7 +8,7 @@ from discord.app_commands import Choice
 from discord.ext import commands
 
 import genshin_py
-from utility import EmbedTemplate, config
+from utility import EmbedTemplate, config, image_filename
 from utility.custom_log import LOG, ContextCommandLogger, SlashCommandLogger
 
 
@@ -30,17 +30,18 @@ class RecordCard:
         try:
             avatar_bytes = await user.display_avatar.read()
             if option == "RECORD":
-                fp = genshin_py.draw_record_card(avatar_bytes, uid, userstats)
+                fp = await genshin_py.draw_record_card(avatar_bytes, uid, userstats)
             elif option == "EXPLORATION":
-                fp = genshin_py.draw_exploration_card(avatar_bytes, uid, userstats)
+                fp = await genshin_py.draw_exploration_card(avatar_bytes, uid, userstats)
         except Exception as e:
             LOG.ErrorLog(interaction, e)
             sentry_sdk.capture_exception(e)
             await interaction.edit_original_response(embed=EmbedTemplate.error(e))
         else:
             fp.seek(0)
+            card = "record_card" if option == "RECORD" else "exploration_card"
             await interaction.edit_original_response(
-                attachments=[discord.File(fp=fp, filename="image.jpeg")]
+                attachments=[discord.File(fp=fp, filename=image_filename(card))]
             )
             fp.close()
 
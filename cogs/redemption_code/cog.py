@@ -42,7 +42,6 @@ async def redeem(
             )
             await asyncio.sleep(5)
         try:
-            genshin_client = await genshin_py.get_client(user.id, game=game, check_uid=False)
             result = "✅ " + await genshin_py.redeem_code(user.id, genshin_client, code, game)
         except genshin_py.errors.GenshinAPIException as e:
             result = "❌ "
@@ -1,23 +1,23 @@
 import asyncio
-import shutil
-from datetime import date, datetime
+from datetime import datetime
 
-import sentry_sdk
 from discord.ext import commands, tasks
 
 import database
 from genshin_py import auto_task
 from utility import config
-from utility.custom_log import LOG
 
 
 class ScheduleLoopCog(commands.Cog, name="schedule"):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.schedule.start()
+        # Instant notes are checked by their own scheduler at each user's next check time
+        self.realtime_notes_task = asyncio.create_task(auto_task.RealtimeNotes.run(self.bot))
 
     async def cog_unload(self) -> None:
         self.schedule.cancel()
+        self.realtime_notes_task.cancel()
 
     loop_interval = 1
 
@@ -30,17 +30,8 @@ class ScheduleLoopCog(commands.Cog, name="schedule"):
             if now.minute % config.schedule_daily_checkin_interval < self.loop_interval:
                 asyncio.create_task(auto_task.DailyReward.execute(self.bot))
 
-            if now.minute % config.schedule_check_resin_interval < self.loop_interval:
-                asyncio.create_task(auto_task.RealtimeNotes.execute(self.bot))
-
         if now.hour == 1 and now.minute < self.loop_interval:
-            try:
-                db_path = "data/bot/bot.db"
-                today = date.today()
-                shutil.copyfile(db_path, f"{db_path.split('.')[0]}_backup_{today}.db")
-            except Exception as e:
-                LOG.Error(str(e))
-                sentry_sdk.capture_exception(e)
+            asyncio.create_task(database.Backup.run())
             asyncio.create_task(database.Tool.remove_expired_user(config.expired_user_days))
 
     @schedule.before_loop
@@ -2,8 +2,10 @@ from datetime import date, datetime, time, timedelta
 from typing import overload
 
 import discord
+import genshin
 
 from database import Database, GenshinScheduleNotes, StarrailScheduleNotes
+from genshin_py.auto_task import RealtimeNotes
 from utility import EmbedTemplate, config
 
 
@@ -226,6 +228,7 @@ class GenshinNotesThresholdModal(BaseNotesThresholdModal, title="Set Genshin Imp
                     check_commission_time=commission_time,
                 )
             )
+            RealtimeNotes.schedule(genshin.Game.GENSHIN, interaction.user.id, None)
             await interaction.response.send_message(
                 embed=EmbedTemplate.normal(
                 f"Genshin settings are configured. You will receive reminder messages when the following thresholds are reached:\n" # noqa
@@ -365,6 +368,7 @@ class StarrailCheckNotesThresholdModal(BaseNotesThresholdModal, title="Set Starr
                     check_echoofwar_time=echoofwar_time,
                 )
             )
+            RealtimeNotes.schedule(genshin.Game.STARRAIL, interaction.user.id, None)
             await interaction.response.send_message(
                 embed=EmbedTemplate.normal(
                 f"Starrail Check settings are configured. You will receive reminder messages when the following thresholds are reached:\n" # noqa
@@ -1,10 +1,11 @@
 from typing import Literal, Optional
 
 import discord
-import enkanetwork
 from discord import app_commands
 from discord.ext import commands
 
+import enka_network
+from utility import Startup
 from utility.custom_log import ContextCommandLogger, SlashCommandLogger
 
 from .ui_genshin import showcase as genshin_showcase
@@ -40,11 +41,8 @@ class ShowcaseCog(commands.Cog, name="showcase-characters"):
 
 
 async def setup(client: commands.Bot):
-    # Update Enka material data
-    enka = enkanetwork.EnkaNetworkAPI()
-    async with enka:
-        await enka.update_assets()
-    enkanetwork.Assets(lang=enkanetwork.Language.EN)
+    # The commands use the Enka assets on disk, outdated assets are updated in the background
+    Startup.background("enka assets", enka_network.update_assets())
 
     await client.add_cog(ShowcaseCog(client))
 
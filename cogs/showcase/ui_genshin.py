@@ -7,7 +7,7 @@ import sentry_sdk
 
 from database import Database, GenshinShowcase, User
 from enka_network import Showcase, enka_assets
-from utility import EmbedTemplate, config, emoji, get_app_command_mention
+from utility import EmbedTemplate, config, emoji, get_app_command_mention, image_filename
 from utility.custom_log import LOG
 
 
@@ -110,9 +110,10 @@ class GenerateImageButton(discord.ui.Button):
         )
         if image is not None:
             embed.set_thumbnail(url=None)
-            embed.set_image(url="attachment://image.jpeg")
+            filename = image_filename("enka_card")
+            embed.set_image(url=f"attachment://{filename}")
             await interaction.edit_original_response(
-                embed=embed, attachments=[discord.File(image, "image.jpeg")]
+                embed=embed, attachments=[discord.File(image, filename)]
             )
 
 
@@ -121,6 +122,8 @@ class ShowcaseView(discord.ui.View):
 
     def __init__(self, showcase: Showcase, character_index: Optional[int] = None):
         super().__init__(timeout=config.discord_view_long_timeout)
+        self.showcase = showcase
+        showcase.active_view = self
         if character_index is not None:
             self.add_item(GenerateImageButton(showcase, character_index))
             self.add_item(ShowcaseButton("Character Stats", showcase.get_character_stat_embed, character_index))
@@ -129,6 +132,11 @@ class ShowcaseView(discord.ui.View):
         if showcase.data.player.characters_preview:  # type: ignore
             self.add_item(ShowcaseCharactersDropdown(showcase))
 
+    async def on_timeout(self) -> None:
+        # Each interaction replaces the view, so earlier views time out while the showcase is still in use
+        if self.showcase.active_view is self:
+            self.showcase.cancel_renders()
+
 
 async def showcase(
     interaction: discord.Interaction,
@@ -151,6 +159,8 @@ async def showcase(
         showcase = Showcase(uid)
         try:
             await showcase.load_data()
+            if config.showcase_prerender:
+                showcase.prerender()
             view = ShowcaseView(showcase)
             embed = showcase.get_player_overview_embed()
             await interaction.edit_original_response(embed=embed, view=view)
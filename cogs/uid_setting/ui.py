@@ -3,6 +3,7 @@ import typing
 import discord
 import genshin
 
+import genshin_py
 from database import Database, User
 from utility import EmbedTemplate, get_server_name
 
@@ -35,6 +36,7 @@ class UIDModal(discord.ui.Modal, title="Submit UID"):
                 user.uid_starrail = int(self.uid.value)
         try:
             await Database.insert_or_replace(user)
+            genshin_py.invalidate_client(interaction.user.id)
         except Exception as e:
             await interaction.response.send_message(embed=EmbedTemplate.error(e), ephemeral=True)
         else:
@@ -71,6 +73,7 @@ class UidDropdown(discord.ui.Select):
             case genshin.Game.STARRAIL:
                 user.uid_starrail = uid
         await Database.insert_or_replace(user)
+        genshin_py.invalidate_client(interaction.user.id)
         await interaction.response.edit_message(
             embed=EmbedTemplate.normal(f"Character UID: {uid} has been successfully set"), view=None
         )
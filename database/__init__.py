@@ -1,4 +1,5 @@
 from .app import Database
+from .backup import Backup
 from .dataclass import *
 from .migration import migrate
 from .models import (
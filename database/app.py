@@ -1,12 +1,18 @@
+import asyncio
 import pathlib
-from typing import Sequence, TypeVar
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence, TypeVar
 
+import sentry_sdk
 import sqlalchemy
 from alembic import command as alembic_cmd
 from alembic.config import Config as alembic_config
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.sql._typing import ColumnExpressionArgument
 
+from utility import config
+from utility.custom_log import LOG
+
 from .models import (
     Base,
     GenshinScheduleNotes,
@@ -21,34 +27,139 @@ DatabaseModel = Base
 T_DatabaseModel = TypeVar("T_DatabaseModel", bound=Base)
 
 
+def sqlite_pragmas() -> dict[str, str | int]:
+    """The SQLite tuning profile from the config, settings that are `None` keep the SQLite default"""
+    pragmas: dict[str, str | int | None] = {
+        "journal_mode": config.sqlite_journal_mode,
+        "synchronous": config.sqlite_synchronous,
+        "mmap_size": config.sqlite_mmap_size,
+        "cache_size": config.sqlite_cache_size,
+        "temp_store": config.sqlite_temp_store,
+        "busy_timeout": config.sqlite_busy_timeout,
+    }
+    return {pragma: value for pragma, value in pragmas.items() if value is not None}
+
+
+def apply_sqlite_pragmas(dbapi_connection: Any, pragmas: dict[str, str | int]) -> None:
+    """Execute the PRAGMA statements on a new DBAPI connection"""
+    cursor = dbapi_connection.cursor()
+    for pragma, value in pragmas.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
 _engine = create_async_engine("sqlite+aiosqlite:///data/bot/bot.db")
 _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
 
 
+@sqlalchemy.event.listens_for(_engine.sync_engine, "connect")
+def _on_connect(dbapi_connection: Any, connection_record: Any) -> None:
+    apply_sqlite_pragmas(dbapi_connection, sqlite_pragmas())
+
+
+class WriteBuffer:
+    """Write-behind buffer: collects dirty ORM instances and writes them to the database in one transaction.
+    Only the latest instance of each primary key is kept, the buffer is flushed when it holds `max_size`
+    instances or `interval` seconds after the first instance was added.
+    """
+
+    def __init__(self, max_size: int, interval: float) -> None:
+        """
+        Parameters
+        ------
+        max_size: `int`
+            Flush when the number of pending instances reaches this value
+        interval: `float`
+            Flush this many seconds after the first pending instance was added (unit: second)
+        """
+        self.max_size = max_size
+        self.interval = interval
+        self._pending: dict[tuple[type[Base], tuple[Any, ...]], Base] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @staticmethod
+    def _key(instance: Base) -> tuple[type[Base], tuple[Any, ...]]:
+        mapper = sqlalchemy.inspect(type(instance))
+        return (type(instance), tuple(mapper.primary_key_from_instance(instance)))
+
+    async def add(self, instance: Base) -> None:
+        """Put the instance into the buffer, replacing the pending instance with the same primary key"""
+        self._pending[self._key(instance)] = instance
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+        elif self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._flush_later())
+
+    def discard(self, instance: Base) -> None:
+        """Drop the pending instance with the same primary key, used when the row is written or deleted directly"""
+        self._pending.pop(self._key(instance), None)
+
+    async def flush(self) -> None:
+        """Write all pending instances to the database in one transaction"""
+        async with self._lock:
+            if len(self._pending) == 0:
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                async with _sessionmaker() as session:
+                    for instance in pending.values():
+                        await session.merge(instance)
+                    await session.commit()
+            except Exception:
+                # Put back the instances that have not been replaced in the meantime, they are retried next flush
+                for key, instance in pending.items():
+                    self._pending.setdefault(key, instance)
+                raise
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            LOG.Error(f"Database write buffer flush error: {e}")
+
+
 class Database:
     """Database class providing class methods to operate on the database, including: initialize, close, insert, select, delete."""
 
     engine = _engine
     sessionmaker = _sessionmaker
+    STREAM_BATCH_SIZE = 500
+    """Number of rows fetched from the database at a time when streaming results"""
+    write_buffer = WriteBuffer(
+        config.database_write_buffer_size, config.database_write_buffer_interval
+    )
 
     @classmethod
     async def init(cls) -> None:
         """Initialize the database; call this once when the bot starts."""
         alembic_cfg = alembic_config("database/alembic/alembic.ini")
+        # Alembic uses a synchronous engine, run it in a worker thread to keep the event loop free
         if pathlib.Path("data/bot/bot.db").exists():
             # If the database file exists, run the Alembic upgrade command
-            alembic_cmd.upgrade(alembic_cfg, "head")
+            await asyncio.to_thread(alembic_cmd.upgrade, alembic_cfg, "head")
         else:
             # If the database file doesn't exist, create all tables and set the version to "head"
             async with cls.engine.begin() as conn:
                 await conn.run_sync(Base.metadata.create_all)
-            alembic_cmd.stamp(alembic_cfg, "head")
+            await asyncio.to_thread(alembic_cmd.stamp, alembic_cfg, "head")
 
     @classmethod
     async def close(cls) -> None:
         """Close the database; call this once before the bot shuts down."""
+        await cls.flush()
         await cls.engine.dispose()
 
+    @classmethod
+    async def flush(cls) -> None:
+        """Write all instances pending in the write buffer to the database in one transaction."""
+        await cls.write_buffer.flush()
+
     @classmethod
     async def insert_or_replace(cls, instance: DatabaseModel) -> None:
         """Insert an object into the database, replacing the old object if the same Primary Key exists.
@@ -59,10 +170,24 @@ class Database:
         instance: `DatabaseModel`
             Instance object of the database table (ORM).
         """
+        cls.write_buffer.discard(instance)
         async with cls.sessionmaker() as session:
             await session.merge(instance)
             await session.commit()
 
+    @classmethod
+    async def insert_or_replace_later(cls, instance: DatabaseModel) -> None:
+        """Same as `insert_or_replace`, but the object is put into the write buffer and written together
+        with other objects in one transaction later. Used for frequent updates such as schedule times.
+        Example: `Database.insert_or_replace_later(user)`
+
+        Parameters:
+        ------
+        instance: `DatabaseModel`
+            Instance object of the database table (ORM).
+        """
+        await cls.write_buffer.add(instance)
+
     @classmethod
     async def select_one(
         cls,
@@ -119,6 +244,43 @@ class Database:
             result = await session.execute(stmt)
             return result.scalars().all()
 
+    @classmethod
+    async def select_due(
+        cls,
+        table: type[T_DatabaseModel],
+        now: datetime,
+    ) -> AsyncIterator[T_DatabaseModel]:
+        """Specify a schedule table, stream the objects whose due time (`next_check_time` or `next_checkin_time`)
+        has arrived, ordered by the due time. Filtering and ordering are done by the indexed column in SQL.
+        Example: `async for user in Database.select_due(ScheduleDailyCheckin, datetime.now()):`
+
+        Parameters:
+        ------
+        table: `type[T_DatabaseModel]`
+            Schedule table (ORM) class to select, e.g., `ScheduleDailyCheckin`.
+        now: `datetime`
+            Objects whose due time is earlier than or equal to this time are selected; an empty due time means due.
+
+        Yields:
+        ------
+        `T_DatabaseModel`:
+            The objects from the table that are due.
+        """
+        if hasattr(table, "next_check_time"):
+            column = getattr(table, "next_check_time")
+        else:
+            column = getattr(table, "next_checkin_time")
+        stmt = (
+            sqlalchemy.select(table)
+            .where(column.is_(None) | (column <= now))
+            .order_by(column)
+            .execution_options(yield_per=cls.STREAM_BATCH_SIZE)
+        )
+        async with cls.sessionmaker() as session:
+            result = await session.stream_scalars(stmt)
+            async for instance in result:
+                yield instance
+
     @classmethod
     async def delete_instance(cls, instance: DatabaseModel) -> None:
         """Delete the object from the database. To use, first use the `select_one` or `select_all` methods to get the object instance, then pass it to this method for deletion.  # noqa
@@ -128,6 +290,7 @@ class Database:
         instance: `DatabaseModel`
             Instance object of the database table (ORM).
         """
+        cls.write_buffer.discard(instance)
         async with cls.sessionmaker() as session:
             await session.delete(instance)
             await session.commit()
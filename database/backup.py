@@ -0,0 +1,121 @@
+import asyncio
+import gzip
+import shutil
+import sqlite3
+import time
+from datetime import date
+from pathlib import Path
+
+import sentry_sdk
+
+from utility import config
+from utility.custom_log import LOG
+from utility.prometheus import Metrics
+
+
+class Backup:
+    """Consistent backups of the SQLite database taken while the bot keeps running.
+
+    The SQLite online-backup API copies the database `config.database_backup_pages` pages at a time in a
+    worker thread, and sleeps `config.database_backup_step_sleep` seconds after each step without holding
+    any lock, so that the bot's writes can go on; if the database is written by another connection between
+    steps, the copy restarts, so every backup is a consistent snapshot.
+
+    Methods
+    -----
+    run(db_path: `str`)
+        Back up the database, compress it and remove old backups
+    """
+
+    _lock: asyncio.Lock = asyncio.Lock()
+
+    @classmethod
+    async def run(cls, db_path: str = "data/bot/bot.db") -> Path | None:
+        """Back up the database to `<name>_backup_<date>.db` next to it, compress it if
+        `config.database_backup_compress` is set and keep the latest `config.database_backup_keep` backups
+
+        Parameters
+        ------
+        db_path: `str`
+            Path of the database to back up
+
+        Returns
+        ------
+        `Path` | `None`
+            Path of the backup file, `None` if the backup failed or another backup is running
+        """
+        if cls._lock.locked():
+            return None
+        async with cls._lock:
+            source = Path(db_path)
+            target = source.with_name(f"{source.stem}_backup_{date.today()}{source.suffix}")
+            started = time.perf_counter()
+            try:
+                await asyncio.to_thread(cls._backup, source, target)
+                if config.database_backup_compress:
+                    target = await asyncio.to_thread(cls._compress, target)
+                await asyncio.to_thread(cls._rotate, source, config.database_backup_keep)
+            except Exception as e:
+                Metrics.DATABASE_BACKUPS.labels("failure").inc()
+                LOG.Error(f"Database backup error: {e}")
+                sentry_sdk.capture_exception(e)
+                return None
+
+            duration = time.perf_counter() - started
+            size = target.stat().st_size
+            Metrics.DATABASE_BACKUPS.labels("success").inc()
+            Metrics.DATABASE_BACKUP_DURATION.set(duration)
+            Metrics.DATABASE_BACKUP_SIZE.set(size)
+            LOG.System(
+                f"Database backup: {target} ({size / 1024 / 1024:.1f} MiB) in {duration:.1f}s"
+            )
+            return target
+
+    @staticmethod
+    def _backup(source: Path, target: Path) -> None:
+        """Copy the database with the online-backup API (runs in a worker thread)"""
+        temp = target.with_name(target.name + ".tmp")
+        step_sleep = config.database_backup_step_sleep
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(temp)
+        try:
+            with dst:
+                # `sleep` of `backup()` only applies when a step finds the database busy or locked,
+                # the pause between steps is taken in the progress callback, which runs after each step
+                src.backup(
+                    dst,
+                    pages=config.database_backup_pages,
+                    progress=lambda status, remaining, total: time.sleep(step_sleep),
+                )
+        finally:
+            dst.close()
+            src.close()
+        temp.replace(target)
+
+    @staticmethod
+    def _compress(target: Path) -> Path:
+        """Compress the backup file with gzip and remove the uncompressed one (runs in a worker thread)"""
+        compressed = target.with_name(target.name + ".gz")
+        temp = compressed.with_name(compressed.name + ".tmp")
+        with open(target, "rb") as f_in, gzip.open(temp, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1024 * 1024)
+        temp.replace(compressed)
+        target.unlink()
+        return compressed
+
+    @staticmethod
+    def _rotate(source: Path, keep: int) -> None:
+        """Remove backups other than the latest `keep` ones (runs in a worker thread)"""
+        if keep <= 0:
+            return
+        backups = sorted(
+            (
+                path
+                for path in source.parent.glob(f"{source.stem}_backup_*")
+                if path.name.endswith((source.suffix, source.suffix + ".gz"))
+            ),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in backups[keep:]:
+            path.unlink()
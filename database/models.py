@@ -57,7 +57,7 @@ class ScheduleDailyCheckin(Base):
     """ID of the Discord channel to send notification messages"""
     is_mention: Mapped[bool]
     """Whether to tag the user when sending messages"""
-    next_checkin_time: Mapped[datetime.datetime]
+    next_checkin_time: Mapped[datetime.datetime] = mapped_column(index=True)
     """Next check-in time (user sets the daily check-in time)"""
 
     has_genshin: Mapped[bool] = mapped_column(default=False)
@@ -105,7 +105,7 @@ class GenshinScheduleNotes(Base):
     discord_channel_id: Mapped[int]
     """ID of the Discord channel to send notification messages"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """Next check time; when checking, data will only be requested from Hoyolab if it exceeds this time"""
 
@@ -228,7 +228,7 @@ class StarrailScheduleNotes(Base):
     discord_channel_id: Mapped[int]
     """ID of the Discord channel to send notification messages"""
     next_check_time: Mapped[datetime.datetime | None] = mapped_column(
-        insert_default=sqlalchemy.func.now(), default=None
+        insert_default=sqlalchemy.func.now(), default=None, index=True
     )
     """Next check time; when checking, data will only be requested from Hoyolab if it exceeds this time"""
 
@@ -1,3 +1,4 @@
 from .api import EnkaAPI, EnkaError
 from .enka_card import generate_image
+from .request import update_assets
 from .showcase import Showcase, enka_assets
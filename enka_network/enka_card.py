@@ -3,16 +3,123 @@ import re
 import textwrap
 from datetime import datetime
 from io import BytesIO
+from pathlib import Path
 
+from cachetools import LRUCache
 from enkanetwork import Assets, EnkaNetworkResponse, Language
 from enkanetwork.enum import DigitType, EquipmentsType
 from enkanetwork.model.character import CharacterInfo
 from enkanetwork.model.equipments import Equipments, EquipmentsType, EquipType  # noqa
+from enkanetwork.model.utils import IconAsset
 from PIL import Image, ImageChops, ImageDraw, ImageEnhance
 
+from utility import IconStore, config, encode_image
+
 from .prop_reference import RARITY_REFERENCE, SUBST_ORDER
 from .utils import (fade_asset_icon, fade_character_art, format_statistics, get_active_artifact_sets, get_font, get_stat_filename, open_image, scale_image, current_path) # noqa
 
+# Part of the card cache key, bump it whenever the card layout changes
+PAINTER_VERSION = 1
+
+
+def element_color(element: str) -> tuple[int, ...]:
+    return {
+        "Pyro": (186, 140, 131),
+        "Hydro": (132, 161, 198),
+        "Dendro": (45, 142, 52),
+        "Electro": (152, 118, 173),
+        "Anemo": (82, 176, 177),
+        "Cryo": (70, 168, 186),
+        "Geo": (187, 159, 75),
+    }.get(element, (255, 255, 255, 50))
+
+
+_layers: LRUCache[tuple[str, str], Image.Image] = LRUCache(
+    maxsize=config.enka_layer_cache_bytes,
+    getsizeof=lambda image: image.width * image.height * len(image.getbands()),
+)
+"""Static layers of the cards, (layer, asset) -> image; the images are shared and must not be drawn on"""
+
+
+def element_background_layer(element: str) -> Image.Image:
+    """Card background tinted with the color of the element"""
+    if (layer := _layers.get(("background", element))) is None:
+        background = open_image("attributes/Assets/default_enka_card.png")
+        background_color = Image.new("RGBA", background.size, element_color(element))
+        layer = ImageChops.overlay(background_color, background)
+        _layers[("background", element)] = layer
+    return layer
+
+
+def character_art_layer(character: CharacterInfo) -> Image.Image:
+    """Transparent card-sized layer with the scaled and faded character art and the shade"""
+    filename = character.image.banner.filename
+    if (layer := _layers.get(("character_art", filename))) is None:
+        character_art = open_image(f"attributes/Genshin/Gacha/{filename}.png")
+        character_art = scale_image(character_art, fixed_percent=90)
+        character_art = character_art.crop(
+            (615, 85, character_art.width, character_art.height)
+        )
+        character_art = fade_character_art(character_art)
+        character_shade = open_image("attributes/Assets/enka_character_shade.png")
+
+        background = element_background_layer(character.element.name)
+        layer = Image.new("RGBA", background.size, (0, 0, 0, 0))
+        layer.paste(character_art, (0, 0), character_art)
+        layer.paste(character_shade, (0, 0), character_shade)
+        _layers[("character_art", filename)] = layer
+    return layer
+
+
+def weapon_icon_layer(weapon: Equipments) -> Image.Image:
+    """Weapon icon scaled to the card"""
+    filename = weapon.detail.icon.filename
+    if (layer := _layers.get(("weapon", filename))) is None:
+        weapon_image = open_image(f"attributes/Genshin/Weapon/{filename}.png")
+        layer = scale_image(weapon_image, fixed_height=125)
+        _layers[("weapon", filename)] = layer
+    return layer
+
+
+def artifact_icon_layer(artifact: Equipments) -> Image.Image:
+    """Artifact icon faded and cropped to the card"""
+    filename = artifact.detail.icon.filename
+    if (layer := _layers.get(("artifact", filename))) is None:
+        artif_icon = fade_asset_icon(
+            open_image(
+                path=f"attributes/Genshin/Artifact/{filename}.png",
+                resize=(190, 190),
+            ),
+            "artifact",
+        )
+        layer = artif_icon.crop((40, 40, 146, 146))
+        _layers[("artifact", filename)] = layer
+    return layer
+
+
+def remote_assets(character: CharacterInfo) -> list[tuple[Path, list[str]]]:
+    """Local paths and download URLs of the character's assets that come from the Enka CDN"""
+
+    def asset(folder: str, icon: IconAsset) -> tuple[Path, list[str]]:
+        return Path(current_path, f"attributes/Genshin/{folder}/{icon.filename}.png"), [icon.url]
+
+    assets = [asset("Gacha", character.image.banner)]
+    assets += [asset("UI", constellation.icon) for constellation in character.constellations]
+    assets += [asset("UI", skill.icon) for skill in character.skills]
+    assets.append(asset("Weapon", character.equipments[-1].detail.icon))
+    assets += [
+        asset("Artifact", equipment.detail.icon)
+        for equipment in character.equipments
+        if equipment.type == EquipmentsType.ARTIFACT
+    ]
+    return assets
+
+
+async def prefetch_assets(character: CharacterInfo) -> None:
+    """Download the missing assets of the character's card, the card itself only reads local files"""
+    if not await IconStore.prefetch(remote_assets(character)):
+        raise Exception("There was an error downloading the asset.")
+
 
 async def generate_image(
     data: EnkaNetworkResponse,
@@ -21,6 +128,19 @@ async def generate_image(
     *,
     save_locally: bool = True,
 ) -> BytesIO:
+    """Download the missing assets, then draw the character card"""
+    await prefetch_assets(character)
+    return draw_image(data, character, locale, save_locally=save_locally)
+
+
+def draw_image(
+    data: EnkaNetworkResponse,
+    character: CharacterInfo,
+    locale: Language = Language.EN,
+    *,
+    save_locally: bool = True,
+) -> BytesIO:
+    """Draw the character card from local assets, see `prefetch_assets`"""
     """Create language-specific asset-getter"""
     asset_reference = Assets(lang=locale)
 
@@ -31,40 +151,14 @@ async def generate_image(
     BEIGE = (245, 222, 179)
 
     """ BACKGROUND SETUP """
-    background = await open_image("attributes/Assets/default_enka_card.png")
-
-    background_rgb = {
-        "Pyro": (186, 140, 131),
-        "Hydro": (132, 161, 198),
-        "Dendro": (45, 142, 52),
-        "Electro": (152, 118, 173),
-        "Anemo": (82, 176, 177),
-        "Cryo": (70, 168, 186),
-        "Geo": (187, 159, 75),
-    }.get(character.element.name, (255, 255, 255, 50))
+    background = element_background_layer(character.element.name)
 
-    background_color = Image.new("RGBA", background.size, background_rgb)
-    background = ImageChops.overlay(background_color, background)
-
-    foreground = Image.new("RGBA", background.size, (0, 0, 0, 0))
+    # The layers of the character art are cached, only the stats and texts are drawn for each card
+    foreground = character_art_layer(character).copy()
     textground = Image.new("RGBA", background.size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(textground)
 
     """ FIRST TRIMESTER """
-    character_art = await open_image(
-        path=f"attributes/Genshin/Gacha/{character.image.banner.filename}.png",
-        asset_url=character.image.banner.url,
-    )
-    character_art = scale_image(character_art, fixed_percent=90)
-    character_art = character_art.crop(
-        (615, 85, character_art.width, character_art.height)
-    )
-    character_art = fade_character_art(character_art)
-
-    foreground.paste(character_art, (0, 0), character_art)
-
-    character_shade = await open_image("attributes/Assets/enka_character_shade.png")
-    foreground.paste(character_shade, (0, 0), character_shade)
 
     w = int(draw.textlength(f"{character.name}", font=get_font("normal", 30)))
     draw.text(
@@ -131,7 +225,7 @@ async def generate_image(
         font=get_font("normal", 23),
     )
 
-    friendship_icon = await open_image("attributes/UI/COMPANIONSHIP.png")
+    friendship_icon = open_image("attributes/UI/COMPANIONSHIP.png")
     friendship_icon = scale_image(friendship_icon, fixed_height=45)
     foreground.paste(friendship_icon, (34, 108), friendship_icon)
     draw.text(
@@ -142,22 +236,19 @@ async def generate_image(
     )
 
     """ Constellations Section """
-    c_overlay = await open_image("attributes/Assets/enka_constellation_overlay.png")
+    c_overlay = open_image("attributes/Assets/enka_constellation_overlay.png")
     c_overlay = scale_image(c_overlay, fixed_height=75)
     ImageDraw.Draw(c_overlay).ellipse(
-        (15, 15, 59, 59), fill=(50, 50, 50, 150), outline=background_rgb, width=2
+        (15, 15, 59, 59), fill=(50, 50, 50, 150), outline=element_color(character.element.name), width=2
     )
-    lock = await open_image("attributes/UI/LOCKED.png", resize=(20, 25))
+    lock = open_image("attributes/UI/LOCKED.png", resize=(20, 25))
 
     constellation_starting_index = 160
     for index, constellation in enumerate(character.constellations):
         foreground.paste(
             c_overlay, (25, constellation_starting_index + 60 * index), c_overlay
         )
-        constellation_icon = await open_image(
-            path=f"attributes/Genshin/UI/{constellation.icon.filename}.png",
-            asset_url=constellation.icon.url,
-        )
+        constellation_icon = open_image(f"attributes/Genshin/UI/{constellation.icon.filename}.png")
         constellation_icon = scale_image(constellation_icon, fixed_height=45)
 
         if index >= character.constellations_unlocked:
@@ -185,16 +276,15 @@ async def generate_image(
         )
 
     """ Talents Section """
-    talent_overlay = await open_image(f"attributes/Assets/enka_talent_overlay.png") # noqa
+    talent_overlay = open_image(f"attributes/Assets/enka_talent_overlay.png") # noqa
     talent_overlay = scale_image(talent_overlay, fixed_height=80)
 
     for index, skill in enumerate(character.skills):
         for _ in range(4):
             foreground.paste(talent_overlay, (430, 305 + 90 * index), talent_overlay)
 
-        sk = await open_image(
+        sk = open_image(
             path=f"attributes/Genshin/UI/{skill.icon.filename}.png",
-            asset_url=skill.icon.url,
             resize=(50, 50),
         )
 
@@ -221,16 +311,12 @@ async def generate_image(
         )
 
     weapon = character.equipments[-1]
-    weapon_image = await open_image(
-        path=f"attributes/Genshin/Weapon/{weapon.detail.icon.filename}.png",
-        asset_url=weapon.detail.icon.url,
-    )
-    weapon_image = scale_image(weapon_image, fixed_height=125)
+    weapon_image = weapon_icon_layer(weapon)
 
     foreground.paste(weapon_image, (555, 25), weapon_image)
 
     rarity_light = scale_image(
-        await open_image(
+        open_image(
             f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}_WEAPON_LIGHT.png"
         ),
         fixed_height=40,
@@ -240,7 +326,7 @@ async def generate_image(
     )
 
     rarity = scale_image(
-        await open_image(f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png"),
+        open_image(f"attributes/UI/{RARITY_REFERENCE[str(weapon.detail.rarity)]}.png"),
         fixed_height=25,
     )
 
@@ -254,7 +340,7 @@ async def generate_image(
         draw.textlength(f"{weapon.detail.name}", font=get_font("normal", 22))
     )
 
-    async def draw_weapon_information(line_buffer: int = 0):
+    def draw_weapon_information(line_buffer: int = 0):
         # Weapon Main Stat
         mainstat = weapon.detail.mainstats
         w = int(
@@ -272,7 +358,7 @@ async def generate_image(
             radius=4,
         )
 
-        image = await open_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png")
+        image = open_image(f"attributes/UI/{get_stat_filename(mainstat.prop_id)}.png")
         icon_file = scale_image(image, fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
@@ -309,7 +395,7 @@ async def generate_image(
                 radius=4,
             )
 
-            image = await open_image(
+            image = open_image(
                 f"attributes/UI/{get_stat_filename(substat.prop_id)}.png"
             )
             icon_file = scale_image(image, fixed_height=30)
@@ -394,7 +480,7 @@ async def generate_image(
             (690, 32), f"{weapon.detail.name}", font=get_font("normal", 22), anchor="lt"
         )
 
-        await draw_weapon_information(line_buffer=5)
+        draw_weapon_information(line_buffer=5)
     else:
         weapon_name = textwrap.wrap(f"{weapon.detail.name}", width=20)
 
@@ -403,13 +489,13 @@ async def generate_image(
                 (690, 32 + (index * 25)), line, font=get_font("normal", 22), anchor="lt"
             )
 
-        await draw_weapon_information(line_buffer=28 * index)
+        draw_weapon_information(line_buffer=28 * index)
 
     all_stats = format_statistics(character)
     statistic_buffer = 365 // len(all_stats)
     for index, item in enumerate(all_stats):
         """Draw Icon for Stat"""
-        image = await open_image(f"attributes/UI/{get_stat_filename(item)}.png")
+        image = open_image(f"attributes/UI/{get_stat_filename(item)}.png")
         icon_file = scale_image(image, fixed_height=30)
         icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
@@ -493,15 +579,7 @@ async def generate_image(
         if not artifact:
             continue
 
-        artif_icon = fade_asset_icon(
-            await open_image(
-                path=f"attributes/Genshin/Artifact/{artifact.detail.icon.filename}.png",
-                asset_url=artifact.detail.icon.url,
-                resize=(190, 190),
-            ),
-            "artifact",
-        )
-        artif_icon = artif_icon.crop((40, 40, 146, 146))
+        artif_icon = artifact_icon_layer(artifact)
         foreground.paste(
             artif_icon, (1009, 14 + artifact_spacer * artif_index), artif_icon
         )
@@ -517,7 +595,7 @@ async def generate_image(
             width=2,
         )
 
-        image = await open_image(
+        image = open_image(
             f"attributes/UI/{get_stat_filename(artifact.detail.mainstats.prop_id)}.png"
         )
         icon_file = scale_image(image, fixed_height=30)
@@ -559,7 +637,7 @@ async def generate_image(
         )
 
         rarity = scale_image(
-            await open_image(
+            open_image(
                 f"attributes/UI/{RARITY_REFERENCE[str(artifact.detail.rarity)]}.png"
             ),
             fixed_height=18,
@@ -579,7 +657,7 @@ async def generate_image(
 
             position = {0: [0, 0], 1: [1, 0], 2: [0, 1], 3: [1, 1]}.get(index)
 
-            image = await open_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png")
+            image = open_image(f"attributes/UI/{get_stat_filename(subst.prop_id)}.png")
             icon_file = scale_image(image, fixed_height=30)
             icon_file = ImageEnhance.Brightness(icon_file).enhance(2)
 
@@ -607,7 +685,7 @@ async def generate_image(
         (555, 547, 555 + 48, 547 + 48), fill=(0, 0, 0, 50), radius=5
     )
 
-    flower_of_life = await open_image(
+    flower_of_life = open_image(
         "attributes/Assets/flower_of_life_icon.png", resize=(35, 35)
     )
     foreground.paste(flower_of_life, (562, 555), flower_of_life)
@@ -712,8 +790,12 @@ async def generate_image(
 
         return output
     """
-    buffer = BytesIO()
-    result.convert("RGB").save(buffer, format="jpeg")
-    buffer.seek(0)
+    return BytesIO(encode_image(result, "enka_card"))
+
 
-    return buffer
+def render_image(
+    data: EnkaNetworkResponse, character: CharacterInfo, locale: Language = Language.EN
+) -> bytes:
+    """Render the character card in the render pool, returns the encoded image.
+    The assets are downloaded on the bot's event loop by `prefetch_assets` before the job is submitted."""
+    return draw_image(data, character, locale, save_locally=False).getvalue()
@@ -1,8 +1,12 @@
 import asyncio
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-import aiohttp
+import enkanetwork
+
+from utility import LOG, HttpClient, config
 
 from .api import EnkaAPI, EnkaError
 
@@ -10,8 +14,7 @@ from .api import EnkaAPI, EnkaError
 async def fetch_enka_data(
     uid: int, cache_data: Optional[Dict[str, Any]] = None, retry: int = 1
 ) -> Dict[str, Any]:
-    async with aiohttp.request(
-        "GET",
+    async with HttpClient.session().get(
         EnkaAPI.get_user_data_url(uid),
         headers={"User-Agent": "KT-Yeh/Genshin-Discord-Bot"},
     ) as resp:
@@ -77,3 +80,35 @@ def _combine_cache_data(new_data: Dict[str, Any], cache_data: Dict[str, Any]) ->
         combine_list(new_data["avatarInfoList"], cache_data["avatarInfoList"])
 
     return new_data
+
+
+async def update_assets(force: bool = False) -> bool:
+    """Download the latest Enka assets (character, weapon and text data) into the enkanetwork package.
+
+    The assets on disk are used as they are while they are younger than `config.enka_assets_refresh_interval`,
+    so that restarts do not download them again.
+
+    Parameters
+    ------
+    force: `bool`
+        Download the assets even if they are recent
+
+    Returns
+    ------
+    `bool`
+        Whether the assets have been downloaded
+    """
+    stamp = Path(config.enka_assets_stamp_path)
+    if not force and stamp.exists():
+        if time.time() - stamp.stat().st_mtime < config.enka_assets_refresh_interval * 3600:
+            return False
+
+    enka = enkanetwork.EnkaNetworkAPI()
+    async with enka:
+        await enka.update_assets()
+    enkanetwork.Assets(lang=enkanetwork.Language.EN)
+
+    stamp.parent.mkdir(parents=True, exist_ok=True)
+    stamp.touch()
+    LOG.System("Enka assets: updated")
+    return True
@@ -1,3 +1,4 @@
+import asyncio
 import io
 from datetime import datetime
 from typing import Any
@@ -6,10 +7,10 @@ import discord
 import enkanetwork
 
 from database import Database, GenshinShowcase
-from utility import emoji
+from utility import RenderPool, config, emoji
 
 from .api import EnkaAPI
-from .enka_card import generate_image
+from .enka_card import prefetch_assets, render_image
 from .request import fetch_enka_data
 
 enka_assets = enkanetwork.Assets(lang=enkanetwork.Language.EN)
@@ -24,6 +25,10 @@ class Showcase:
         self.api_error_msg: str | None = None
         self.url: str = EnkaAPI.get_user_url(uid)
         self.image_buffers: list[io.BytesIO | None] = [None] * 25
+        self.render_tasks: list[asyncio.Task[bytes] | None] = [None] * 25
+        """Renders of the character cards that are running or finished"""
+        self.active_view: object | None = None
+        """The latest view showing this showcase, only its timeout cancels the pending renders"""
 
     async def load_data(self) -> None:
         gshowcase = await Database.select_one(GenshinShowcase, GenshinShowcase.uid.is_(self.uid))
@@ -264,15 +269,51 @@ class Showcase:
             image = image_buffer
             image.seek(0)
         else:
-            image = await generate_image(
-                self.data,
-                self.data.characters[index],
-                enkanetwork.Language.EN,
-                save_locally=False,
-            )
+            task = self.render_tasks[index]
+            # Render again when there is no render yet, or when the previous one was cancelled or failed
+            if task is None or task.cancelled() or (task.done() and task.exception() is not None):
+                task = asyncio.create_task(self._render(index))
+                self.render_tasks[index] = task
+            # shield: an interaction that stops waiting does not cancel the render
+            image = io.BytesIO(await asyncio.shield(task))
             self.image_buffers[index] = image
         return image
 
+    def prerender(self) -> None:
+        """Render the cards of all characters in the background, a few at a time
+        (`config.showcase_prerender_concurrency`), so that selecting a character returns the finished card
+        """
+        if self.data.characters is None:
+            return
+        semaphore = asyncio.Semaphore(max(config.showcase_prerender_concurrency, 1))
+        for index in range(min(len(self.data.characters), len(self.render_tasks))):
+            if self.render_tasks[index] is None:
+                task = asyncio.create_task(self._render(index, semaphore))
+                # A failed render is rendered again when selected, retrieve the exception to keep the log quiet
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                self.render_tasks[index] = task
+
+    def cancel_renders(self) -> None:
+        """Cancel the renders that have not finished, e.g. when the view times out"""
+        for task in self.render_tasks:
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def _render(self, index: int, semaphore: asyncio.Semaphore | None = None) -> bytes:
+        assert self.data.characters is not None
+        if semaphore is not None:
+            async with semaphore:
+                return await self._render(index)
+        # Download the assets on the event loop, the render pool only reads local files
+        await prefetch_assets(self.data.characters[index])
+        return await RenderPool.submit(
+            "enka_card",
+            render_image,
+            self.data,
+            self.data.characters[index],
+            enkanetwork.Language.EN,
+        )
+
     def get_default_embed(self, index: int) -> discord.Embed:
         character = self.data.player.characters_preview[index]
         color = {
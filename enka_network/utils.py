@@ -2,7 +2,6 @@ import os
 from collections import Counter
 from typing import List, Literal
 
-import aiohttp
 from enkanetwork.enum import EquipmentsType
 from enkanetwork.model import Stats
 from enkanetwork.model.character import CharacterInfo
@@ -10,6 +9,8 @@ from enkanetwork.model.equipments import EquipmentsType # noqa
 from PIL import Image, ImageChops, ImageFont, ImageOps
 from pydantic import BaseModel
 
+from utility import AssetCache
+
 from .prop_reference import ELEMENT_REFERENCE, RELIQUARY_STATS
 
 current_path = os.path.dirname(os.path.abspath(__file__))
@@ -20,46 +21,14 @@ class ActiveSet(BaseModel):
     count: int
 
 
-async def check_asset(path: str, asset_url: str) -> None:
-    """Helper function to check if an asset
-    exists given a path and reference to the
-    asset's source. If the asset does not exist,
-    the asset will be downloaded from the source.
-    """
-
-    if os.path.exists(path):
-        return
-
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-
-    async with aiohttp.ClientSession() as session:
-        async with session.get(asset_url) as response:
-            if response.status != 200:
-                raise Exception("There was an error downloading the asset.")
-            content = await response.read()
-
-    with open(path, "wb") as f:
-        f.write(content)
-
-
-async def open_image(
+def open_image(
     path: str,
-    asset_url: str = None,
     mode: str = "RGBA",
     resize: tuple = None,
     resample: int = Image.BICUBIC,
 ) -> Image:
-    path = os.path.join(current_path, path)
-    if not os.path.exists(path):
-        await check_asset(path, asset_url)
-
-    image = Image.open(path)
-    image = image.convert(mode)
-
-    if resize:
-        image = image.resize(resize, resample)
-
-    return image
+    """Open a local asset, the assets from the Enka CDN are downloaded beforehand by `prefetch_assets`"""
+    return AssetCache.image(os.path.join(current_path, path), mode, resize, resample)
 
 
 def scale_image(
@@ -88,15 +57,16 @@ def scale_image(
 
 def get_font(font: Literal["normal"], size: int) -> ImageFont.FreeTypeFont:
     """Helper method to get a font."""
-    return {
-        "normal": ImageFont.truetype(current_path + "/attributes/Fonts/JA-JP.TTF", size),
+    path = {
+        "normal": current_path + "/attributes/Fonts/JA-JP.TTF",
         # Insert other fonts you'd like to use here, if any
-    }.get(font, ImageFont.truetype(current_path + "/attributes/Fonts/JA-JP.TTF", size))
+    }.get(font, current_path + "/attributes/Fonts/JA-JP.TTF")
+    return AssetCache.font(path, size)
 
 
 def fade_character_art(im: Image) -> Image:
     # Load mask from attributes
-    mask = Image.open(current_path + "/attributes/Assets/enka_character_mask.png").convert("L")
+    mask = AssetCache.image(current_path + "/attributes/Assets/enka_character_mask.png", "L")
     mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
 
     # Extract alpha channel from original image
@@ -119,7 +89,7 @@ def fade_asset_icon(im: Image, _type: Literal["artifact"]) -> Image:
         # Insert other masks you'd like to use here, if any
     }.get(_type)
 
-    mask = Image.open(mask_fp).convert("L")
+    mask = AssetCache.image(mask_fp, "L")
     mask = mask.resize((im.size[0], im.size[1]), Image.NEAREST)
 
     overlay = Image.new("RGBA", im.size, (0, 0, 0, 0))
@@ -1,4 +1,6 @@
 from .api import API
 from .models import *
-from .parsers import parse
+from .parsers import clear_embed_cache, parse
 from .request import *
+from .search import SearchIndex
+from .snapshot import SNAPSHOT_VERSION, Snapshot
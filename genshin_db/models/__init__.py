@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .achievements import Achievement, Achievements
 from .artifacts import Artifact, Artifacts
@@ -10,6 +10,7 @@ from .materials import Material, Materials
 from .talents import Talent, Talents
 from .tcg_cards import ActionCard, CharacterCard, Summon, TCGCards
 from .weapons import Weapon, Weapons
+from ..search import normalize
 
 GenshinDbItem = (
     Achievement
@@ -38,16 +39,42 @@ class GenshinDbAllData:
     talents: Talents
     tcg_cards: TCGCards
     weapons: Weapons
+    version: str = ""
+    """Version of the data (hash of the API responses), changes whenever the data changes"""
+    aliases: dict[str, str] = field(default_factory=dict)
+    """{alias: item name}, extra keys of `find`"""
+
+    def __post_init__(self) -> None:
+        # {name, normalized name or alias: (item, category)}, categories in the order `find` used to chain them,
+        # so when several categories share a name (character, talents, constellations) the earlier one wins;
+        # within a category the last item of a name wins, the same as `GenshinDbListBase.find`
+        self._index: dict[str, tuple[GenshinDbItem, str]] = {}
+        categories: list[tuple[str, list]] = [
+            ("achievements", self.achievements.list),
+            ("tcg_cards", self.tcg_cards.list),
+            ("weapons", self.weapons.list),
+            ("foods", self.foods.list),
+            ("materials", self.materials.list),
+            ("artifacts", self.artifacts.list),
+            ("characters", self.characters.list),
+            ("constellations", self.constellations.list),
+            ("talents", self.talents.list),
+        ]
+        for category, items in categories:
+            for name, item in {item.name: item for item in items}.items():
+                self._index.setdefault(name, (item, category))
+        for category, items in categories:
+            for name, item in {normalize(item.name): item for item in items}.items():
+                self._index.setdefault(name, (item, category))
+        for alias, name in self.aliases.items():
+            if (entry := self._index.get(name)) is not None:
+                self._index.setdefault(normalize(alias), entry)
 
     def find(self, item_name: str) -> GenshinDbItem | None:
-        return (
-            self.achievements.find(item_name)
-            or self.tcg_cards.find(item_name)
-            or self.weapons.find(item_name)
-            or self.foods.find(item_name)
-            or self.materials.find(item_name)
-            or self.artifacts.find(item_name)
-            or self.characters.find(item_name)
-            or self.constellations.find(item_name)
-            or self.talents.find(item_name)
-        )
+        """Find the item by its name, case-insensitive, or by an alias"""
+        entry = self.find_with_category(item_name)
+        return entry[0] if entry is not None else None
+
+    def find_with_category(self, item_name: str) -> tuple[GenshinDbItem, str] | None:
+        """Find the item and the name of its category (the attribute of this class, e.g. "weapons")"""
+        return self._index.get(item_name) or self._index.get(normalize(item_name))
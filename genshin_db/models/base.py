@@ -1,4 +1,4 @@
-from typing import Dict, Generic, List, TypeVar
+from typing import Any, Dict, Generic, List, TypeVar
 
 from pydantic import BaseModel, PrivateAttr
 
@@ -16,12 +16,15 @@ class GenshinDbListBase(BaseModel, Generic[T]):
     __root__: List[T]
     _name_item_dict: Dict[str, T] = PrivateAttr({})
 
+    def __init__(self, **data: Any) -> None:
+        super().__init__(**data)
+        # the last item of each name wins, as it always has
+        for item in self.__root__:
+            self._name_item_dict[item.name] = item
+
     @property
     def list(self) -> List[T]:
         return self.__root__
 
     def find(self, name: str) -> T | None:
-        if self._name_item_dict == {}:
-            for item in self.list:
-                self._name_item_dict[item.name] = item
         return self._name_item_dict.get(name)
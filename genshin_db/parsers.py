@@ -1,8 +1,10 @@
-from typing import Callable, Type
+import copy
+from typing import Any, Callable, Type
 
 import discord
+from cachetools import LRUCache
 
-from utility import EmbedTemplate, emoji
+from utility import EmbedTemplate, config, emoji
 
 from .api import API
 from .models import Achievement, Character, Constellation, Food, Material, Talent, Weapon
@@ -10,7 +12,41 @@ from .models.artifacts import Artifact, PartDetail
 from .models.tcg_cards import ActionCard, CharacterCard, DiceCost, Summon
 
 
-def parse(model) -> discord.Embed:
+_embed_cache: LRUCache[tuple[str, str, str], dict[str, Any]] = LRUCache(
+    maxsize=config.genshin_db_embed_cache_size
+)
+"""Serialized embeds of the items dict[(model type, item name, data version), embed dict]"""
+
+
+def parse(model, version: str | None = None) -> discord.Embed:
+    """Build the embed of the genshin-db item
+
+    Parameters
+    ------
+    model:
+        The item, e.g. a `Character` or a `Weapon`
+    version: `str` | `None`
+        Version of the data the item belongs to (`GenshinDbAllData.version`), the embed is cached under
+        this version and rebuilt from the cache on later calls; `None` builds it without the cache
+    """
+    if version is None or not isinstance(name := getattr(model, "name", None), str):
+        return _parse(model)
+    key = (type(model).__name__, name, version)
+    # to_dict() and from_dict() share the nested fields, footer and image with the dict,
+    # so the cache holds its own copy and every returned embed gets another one
+    if (embed_dict := _embed_cache.get(key)) is None:
+        embed = _parse(model)
+        _embed_cache[key] = copy.deepcopy(embed.to_dict())
+        return embed
+    return discord.Embed.from_dict(copy.deepcopy(embed_dict))
+
+
+def clear_embed_cache() -> None:
+    """Remove all the cached embeds, called when new data is loaded"""
+    _embed_cache.clear()
+
+
+def _parse(model) -> discord.Embed:
     _map: dict[Type, Callable] = {
         CharacterCard: TCGCardParser.parse_character_card,
         ActionCard: TCGCardParser.parse_action_card,
@@ -1,4 +1,7 @@
-from typing import Any, Tuple
+import asyncio
+from typing import Any
+
+from utility import config
 
 from .api import API
 from .models import (
@@ -21,68 +24,50 @@ async def _request(folder: API.GenshinDBFolder) -> Any:
     )
 
 
-async def fetch_cards() -> TCGCards:
-
-    action_cards = await _request(API.GenshinDBFolder.TCG_ACTION_CARDS)
-    character_cards = await _request(API.GenshinDBFolder.TCG_CHARACTER_CARDS)
-    summons = await _request(API.GenshinDBFolder.TCG_SUMMONS)
-
-    return TCGCards(action_cards, character_cards, summons)
-
-
-async def fetch_achievements() -> Achievements:
-    data = await _request(API.GenshinDBFolder.ACHIEVEMENTS)
-    return Achievements.parse_obj(data)
-
-
-async def fetch_characters() -> Tuple[Characters, Constellations, Talents]:
-    data = await _request(API.GenshinDBFolder.CHARACTERS)
-    characters = Characters.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.CONSTELLATIONS)
-    constellations = Constellations.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.TALENTS)
-    talents = Talents.parse_obj(data)
-
-    return characters, constellations, talents
+async def fetch_raw() -> dict[str, Any]:
+    """Request all the folders of the genshin-db API concurrently
 
+    Returns
+    ------
+    `dict[str, Any]`
+        {folder name: API response}
+    """
+    folders = list(API.GenshinDBFolder)
+    responses = await asyncio.gather(*[_request(folder) for folder in folders])
+    return {folder.value: response for folder, response in zip(folders, responses)}
 
-async def fetch_materials() -> Tuple[Materials, Foods]:
-    data = await _request(API.GenshinDBFolder.MATERIALS)
-    materials = Materials.parse_obj(data)
 
-    data = await _request(API.GenshinDBFolder.FOODS)
-    foods = Foods.parse_obj(data)
+def parse_all(raw: dict[str, Any], version: str = "") -> GenshinDbAllData:
+    """Parse the API responses of all the folders (CPU-bound, call it in a worker thread)
 
-    return materials, foods
-
-
-async def fetch_equipments() -> Tuple[Artifacts, Weapons]:
-    data = await _request(API.GenshinDBFolder.ARTIFACTS)
-    artifacts = Artifacts.parse_obj(data)
-
-    data = await _request(API.GenshinDBFolder.WEAPONS)
-    weapons = Weapons.parse_obj(data)
-
-    return artifacts, weapons
+    Parameters
+    ------
+    raw: `dict[str, Any]`
+        {folder name: API response}, from `fetch_raw` or a snapshot
+    version: `str`
+        Version of the data, see `GenshinDbAllData.version`
+    """
+    folder = API.GenshinDBFolder
+    return GenshinDbAllData(
+        Achievements.parse_obj(raw[folder.ACHIEVEMENTS.value]),
+        Artifacts.parse_obj(raw[folder.ARTIFACTS.value]),
+        Characters.parse_obj(raw[folder.CHARACTERS.value]),
+        Constellations.parse_obj(raw[folder.CONSTELLATIONS.value]),
+        Foods.parse_obj(raw[folder.FOODS.value]),
+        Materials.parse_obj(raw[folder.MATERIALS.value]),
+        Talents.parse_obj(raw[folder.TALENTS.value]),
+        TCGCards(
+            raw[folder.TCG_ACTION_CARDS.value],
+            raw[folder.TCG_CHARACTER_CARDS.value],
+            raw[folder.TCG_SUMMONS.value],
+        ),
+        Weapons.parse_obj(raw[folder.WEAPONS.value]),
+        version,
+        config.genshin_db_aliases,
+    )
 
 
 async def fetch_all() -> GenshinDbAllData:
-    tcg_cards = await fetch_cards()
-    achievements = await fetch_achievements()
-    characters, constellations, talents = await fetch_characters()
-    materials, foods = await fetch_materials()
-    artifacts, weapons = await fetch_equipments()
-
-    return GenshinDbAllData(
-        achievements,
-        artifacts,
-        characters,
-        constellations,
-        foods,
-        materials,
-        talents,
-        tcg_cards,
-        weapons,
-    )
+    """Request and parse all the folders of the genshin-db API"""
+    raw = await fetch_raw()
+    return await asyncio.to_thread(parse_all, raw)
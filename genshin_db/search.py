@@ -0,0 +1,125 @@
+import re
+from collections import Counter
+from typing import Iterable
+
+_separators = re.compile(r"[\s\-_'’:.,()]+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case the text and turn punctuation into single spaces, e.g. "Kamisato Ayaka" -> "kamisato ayaka" """
+    return _separators.sub(" ", text.casefold()).strip()
+
+
+def trigrams(key: str) -> set[str]:
+    """Trigrams of a normalized key, spaces removed so that "hu tao" and "hutao" share them"""
+    compact = key.replace(" ", "")
+    return {compact[i : i + 3] for i in range(len(compact) - 2)}
+
+
+class SearchIndex:
+    """Name index of one category of the genshin-db data, for the search autocomplete.
+
+    Names and aliases are normalized once when the index is built. Queries of 3 characters or more are
+    answered from a trigram index and ranked (exact, prefix, word prefix, substring, then fuzzy matches
+    that share most trigrams); shorter queries have no trigram and scan all the normalized keys, ranked the
+    same way. The empty query returns the first 25 names in alphabetical order.
+
+    Parameters
+    ------
+    names: `Iterable[str]`
+        Names of the items
+    aliases: `dict[str, str]` | `None`
+        {alias: name}, aliases of names outside this category are ignored
+    """
+
+    LIMIT = 25
+    """Maximum number of choices Discord shows in an autocomplete"""
+
+    def __init__(self, names: Iterable[str], aliases: dict[str, str] | None = None) -> None:
+        self.names: list[str] = sorted(set(names), key=str.casefold)
+        self.top: list[str] = self.names[: self.LIMIT]
+        """Results of the empty query"""
+
+        name_ids = {name: i for i, name in enumerate(self.names)}
+        # keys: (normalized name or alias, index of the name), several keys can point to the same name
+        self._keys: list[tuple[str, int]] = [
+            (normalize(name), i) for i, name in enumerate(self.names)
+        ]
+        for alias, name in (aliases or {}).items():
+            if (i := name_ids.get(name)) is not None:
+                self._keys.append((normalize(alias), i))
+
+        self._trigrams: dict[str, list[int]] = {}
+        for k, (key, _) in enumerate(self._keys):
+            for trigram in trigrams(key):
+                self._trigrams.setdefault(trigram, []).append(k)
+
+    def search(self, query: str, limit: int = LIMIT) -> list[str]:
+        """Names matching the query, best matches first
+
+        Parameters
+        ------
+        query: `str`
+            What the user has typed so far
+        limit: `int`
+            Maximum number of names returned
+        """
+        q = normalize(query)
+        if q == "":
+            return self.top[:limit]
+
+        q_trigrams = trigrams(q)
+        if len(q_trigrams) == 0:
+            # 1-2 characters: the categories are small, so every key is a candidate and substrings match too
+            candidates: Iterable[int] = range(len(self._keys))
+        else:
+            postings = sorted((self._trigrams.get(t, []) for t in q_trigrams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+
+        ranked: list[tuple[int, int, str, int]] = []
+        for k in candidates:
+            key, i = self._keys[k]
+            if (rank := self._rank(q, key)) is not None:
+                ranked.append((rank, len(key), key, i))
+        results = self._unique(ranked, limit)
+
+        if len(results) < limit and len(q_trigrams) > 0:
+            results += self._fuzzy(q_trigrams, limit - len(results), exclude=set(results))
+        return results
+
+    def _fuzzy(self, q_trigrams: set[str], limit: int, exclude: set[str]) -> list[str]:
+        """Names sharing at least half of the query's trigrams, ranked by the share of common trigrams"""
+        shared: Counter[int] = Counter()
+        for trigram in q_trigrams:
+            shared.update(self._trigrams.get(trigram, []))
+        ranked: list[tuple[float, int, str, int]] = []
+        for k, count in shared.items():
+            if count * 2 < len(q_trigrams):
+                continue
+            key, i = self._keys[k]
+            if self.names[i] in exclude:
+                continue
+            similarity = count / len(q_trigrams | trigrams(key))
+            ranked.append((-similarity, len(key), key, i))
+        return self._unique(ranked, limit)
+
+    def _unique(self, ranked: list, limit: int) -> list[str]:
+        """Names of the ranked keys in order, each name once"""
+        results: list[str] = []
+        for *_, i in sorted(ranked):
+            if (name := self.names[i]) not in results:
+                results.append(name)
+                if len(results) >= limit:
+                    break
+        return results
+
+    @staticmethod
+    def _rank(q: str, key: str) -> int | None:
+        if key == q:
+            return 0
+        if key.startswith(q):
+            return 1
+        if (position := key.find(q)) < 0:
+            # the trigrams match but not in a row, e.g. spaces: "hutao" in "hu tao"
+            return 3 if q.replace(" ", "") in key.replace(" ", "") else None
+        return 2 if key[position - 1] == " " else 3
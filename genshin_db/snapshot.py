@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from utility import config
+
+from .models import GenshinDbAllData
+from .request import fetch_raw, parse_all
+
+SNAPSHOT_VERSION = 1
+"""Format version of the snapshot file, increase it when the models can no longer parse older snapshots"""
+
+
+class Snapshot:
+    """Local copy of the genshin-db API responses, so that the data loads at startup without the API.
+
+    The snapshot stores the raw responses of all the folders and is parsed again on load, so it stays valid
+    as long as the models can parse the API responses. Reading, writing and parsing block, call them in a
+    worker thread.
+
+    Methods
+    -----
+    load() -> `GenshinDbAllData` | `None`
+        Load the data from the snapshot file
+    save(raw: `dict[str, Any]`, version: `str`)
+        Write the API responses to the snapshot file
+    age() -> `float` | `None`
+        Time since the snapshot was saved
+    version_of(raw: `dict[str, Any]`) -> `str`
+        Hash of the API responses
+    fetch() -> `tuple[GenshinDbAllData, dict[str, Any]]`
+        Request all the folders and parse them
+    """
+
+    @staticmethod
+    def path() -> Path:
+        return Path(config.genshin_db_snapshot_path)
+
+    @classmethod
+    def load(cls) -> GenshinDbAllData | None:
+        """Load the data from the snapshot file, `None` if the file is missing, outdated or invalid"""
+        try:
+            snapshot = json.loads(cls.path().read_bytes())
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_VERSION:
+            return None
+        return parse_all(snapshot["data"], snapshot["version"])
+
+    @classmethod
+    def save(cls, raw: dict[str, Any], version: str) -> None:
+        """Write the API responses to the snapshot file, replacing the old file atomically
+
+        Parameters
+        ------
+        raw: `dict[str, Any]`
+            {folder name: API response}
+        version: `str`
+            Version of the data, from `version_of`
+        """
+        path = cls.path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        snapshot = {
+            "format": SNAPSHOT_VERSION,
+            "version": version,
+            "saved_at": time.time(),
+            "data": raw,
+        }
+        temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp.write_text(json.dumps(snapshot, ensure_ascii=False), encoding="utf-8")
+        temp.replace(path)
+
+    @classmethod
+    def age(cls) -> float | None:
+        """Time since the snapshot was saved (unit: second), `None` if there is no snapshot"""
+        try:
+            return time.time() - cls.path().stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def version_of(raw: dict[str, Any]) -> str:
+        """Version of the API responses: a hash of their content, equal responses have equal versions"""
+        content = json.dumps(raw, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.sha256(content).hexdigest()[:16]
+
+    @classmethod
+    async def fetch(cls) -> tuple[GenshinDbAllData, dict[str, Any]]:
+        """Request all the folders concurrently, then hash and parse them in a worker thread
+
+        Returns
+        ------
+        `tuple[GenshinDbAllData, dict[str, Any]]`
+            The parsed data and the raw API responses, to be passed to `save`
+        """
+        raw = await fetch_raw()
+        data = await asyncio.to_thread(cls._parse, raw)
+        return data, raw
+
+    @classmethod
+    def _parse(cls, raw: dict[str, Any]) -> GenshinDbAllData:
+        """Hash and parse the API responses, both take long on the multi-MB data (runs in a worker thread)"""
+        return parse_all(raw, cls.version_of(raw))
@@ -1,17 +1,22 @@
 import asyncio
+import json
+import time
 from datetime import datetime
-from typing import Any, ClassVar, Final
+from typing import Any, AsyncIterator, ClassVar, Sequence
 
 import aiohttp
 import discord
 import sentry_sdk
+import sqlalchemy
 from discord.ext import commands
 
 import database
 from database import Database, GeetestChallenge, ScheduleDailyCheckin, User
-from utility import LOG, EmbedTemplate, config
+from utility import LOG, EmbedTemplate, HttpClient, config
+from utility.prometheus import Metrics
 
 from .. import claim_daily_reward
+from .host_balancer import CircuitState, HostState
 
 
 class DailyReward:
@@ -35,6 +40,10 @@ class DailyReward:
     """Number of people who signed in to the Zenless Zone Zero dict[host, count]"""
     _themis_count: ClassVar[dict[str, int]] = {}
     """Number of people signed in to the undecided event book dict[host, count]"""
+    _hosts: ClassVar[dict[str, HostState]] = {}
+    """Measured capacity of each host, kept between executions dict[host, state]"""
+    _batch_unsupported_hosts: ClassVar[set[str]] = set()
+    """Remote hosts without the `/daily-reward/batch` endpoint, users are signed in one by one"""
 
     @classmethod
     async def execute(cls, bot: commands.Bot):
@@ -48,6 +57,7 @@ class DailyReward:
         if cls._lock.locked():
             return
         await cls._lock.acquire()
+        tasks: list[asyncio.Task] = []
         try:
             LOG.System("Daily automatic sign-in starts")
 
@@ -58,22 +68,49 @@ class DailyReward:
             cls._starrail_count = {}
             cls._zzz_count = {}
             cls._themis_count = {}
-            daily_users = await Database.select_all(ScheduleDailyCheckin)
+            await Database.flush()  # Write the pending sign-in times before selecting users
 
-            # Put all users who need to sign in into a queue (Producer)
-            for user in daily_users:
-                if user.next_checkin_time < datetime.now():
-                    await queue.put(user)
+            # Create local and remote sign-in tasks (Consumer), the number of tasks working at the same time
+            # on each host is limited by the host's measured capacity
+            queue_size = 0
+            for host in ["LOCAL", *config.daily_reward_api_list]:
+                if host not in cls._hosts:
+                    # Local sign-ins turn errors into result messages, so the local host cannot measure its
+                    # capacity; it keeps a fixed number of slots instead of ramping up requests from one IP
+                    cls._hosts[host] = HostState(
+                        host,
+                        config.daily_reward_local_slots if host == "LOCAL" else config.daily_reward_max_slots,
+                        config.daily_reward_circuit_failures,
+                        config.daily_reward_circuit_cooldown,
+                    )
+                state = cls._hosts[host]
+                LOG.Info(f"Automatically schedule the check-in task to start: {host}")
+                await cls._check_host(host, state)
+                cls._total[host] = 0  # Initialize the number of sign-ins
+                cls._honkai_count[host] = 0  # Initialize the number of people who signed in to Honkai Impact 3
+                cls._starrail_count[host] = 0  # Initialize the number of people who signed in to the Honkai: Star Rail
+                cls._zzz_count[host] = 0  # Initialize the number of people who sign in to the Zenless Zone Zero
+                cls._themis_count[host] = 0  # Initialize the number of people who signed in to the undecided event book
+                queue_size += state.max_slots * cls._batch_size(host)
 
-            # Create a local sign-in task (Consumer)
-            tasks = [asyncio.create_task(cls._claim_daily_reward_task(queue, "LOCAL", bot))]
-            # Create a remote sign-in task (Consumer)
-            for host in config.daily_reward_api_list:
-                tasks.append(asyncio.create_task(cls._claim_daily_reward_task(queue, host, bot)))
+            # At most as many users as all hosts can take at once are read from the database ahead of the consumers;
+            # a user holds its place until it is signed in, so a failed batch can always be put back in the queue
+            places = asyncio.Semaphore(queue_size)
+            for host in ["LOCAL", *config.daily_reward_api_list]:
+                for _ in range(cls._hosts[host].max_slots):
+                    tasks.append(
+                        asyncio.create_task(
+                            cls._claim_daily_reward_task(queue, places, host, cls._hosts[host], bot)
+                        )
+                    )
+
+            # Put all users who need to sign in into the queue (Producer)
+            async for user in Database.select_due(ScheduleDailyCheckin, datetime.now()):
+                await places.acquire()
+                queue.put_nowait(user)
 
             await queue.join()  # Wait for all users to sign in
-            for task in tasks:  # Close the sign-in task
-                task.cancel()
+            await Database.flush()
 
             _log_message = (
                 f"Automatic sign-in ends: Total {sum(cls._total.values())} People sign in,"
@@ -92,78 +129,128 @@ class DailyReward:
             sentry_sdk.capture_exception(e)
             LOG.Error(f"Automatically schedule DailyReward and an error occurred: {e}")
         finally:
+            for task in tasks:  # Close the sign-in task
+                task.cancel()
             cls._lock.release()
 
+    @staticmethod
+    def _batch_size(host: str) -> int:
+        """Remote hosts sign in users in batches, the local host signs in users one by one"""
+        return 1 if host == "LOCAL" else max(config.daily_reward_batch_size, 1)
+
+    @classmethod
+    async def _check_host(cls, host: str, state: HostState) -> None:
+        """Test whether the remote API is normal, the circuit of the host is opened if it is not"""
+        if host == "LOCAL":
+            return
+        try:
+            async with HttpClient.session().get(host) as resp:
+                if resp.status != 200:
+                    raise Exception(f"Http status code {resp.status}")
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            LOG.Error(f"Automatically schedule DailyReward test API {host} An error occurred: {e}")
+            state.open()
+
     @classmethod
     async def _claim_daily_reward_task(
-        cls, queue: asyncio.Queue[ScheduleDailyCheckin], host: str, bot: commands.Bot
+        cls,
+        queue: asyncio.Queue[ScheduleDailyCheckin],
+        places: asyncio.Semaphore,
+        host: str,
+        state: HostState,
+        bot: commands.Bot,
     ):
-        """Get the user from the passed asyncio.Queue, then sign in daily and send a message to the user based on the sign-in result
+        """Get the user from the passed asyncio.Queue, then sign in daily and send a message to the user based on the result.
+        Several tasks run for each host, each one waits for a free slot of the host before taking users from the queue.
 
         Parameters
         -----
         queue: `asyncio.Queue[ScheduleDailyCheckin]`
             A queue of users who need to sign in
+        places: `asyncio.Semaphore`
+            Places of the users read ahead of the consumers, released once a user is signed in
         host: `str`
            Signed in host
             - Local: Fixed as a string "LOCAL"
             - Remote: Check-in API URL
-
+        state: `HostState`
+            Measured capacity and circuit breaker of the host
         bot: `commands.Bot`
             Discord bot client
         """
-        LOG.Info(f"Automatically schedule the check-in task to start: {host}")
-        if host != "LOCAL":
-            # First test whether the API is normal
-            async with aiohttp.ClientSession() as session:
-                try:
-                    async with session.get(host) as resp:
-                        if resp.status != 200:
-                            raise Exception(f"Http status code {resp.status}")
-                except Exception as e:
-                    sentry_sdk.capture_exception(e)
-                    LOG.Error(f"Automatically schedule DailyReward test API {host} An error occurred: {e}")
-                    return
-
-        cls._total[host] = 0  # Initialize the number of sign-ins
-        cls._honkai_count[host] = 0  # Initialize the number of people who signed in to Honkai Impact 3
-        cls._starrail_count[host] = 0  # Initialize the number of people who signed in to the Honkai: Star Rail
-        cls._zzz_count[host] = 0  # Initialize the number of people who sign in to the Zenless Zone Zero
-        cls._themis_count[host] = 0  # Initialize the number of people who signed in to the undecided event book
-        MAX_API_ERROR_COUNT: Final[int] = 20  # Maximum number of remote API errors
-        api_error_count = 0  # The number of errors that occurred in the remote API
+        batch_size = cls._batch_size(host)
 
         while True:
-            user = await queue.get()
+            await state.acquire()
+            users: list[ScheduleDailyCheckin] = []
+            pending: dict[int, ScheduleDailyCheckin] = {}  # Users who have not received the result
+            success: bool | None = None
+            claim_time = 0.0  # Time spent waiting for the host, excluding sending messages
             try:
-                message = await cls._claim_daily_reward(host, user)
-            except Exception as e:
-                await queue.put(user)  # An exception occurred during sign-in, placing the user back in the queue
-                api_error_count += 1
-                LOG.Error(f"Remote API：{host} An error occurred ({api_error_count}/{MAX_API_ERROR_COUNT})")
-                # If the error exceeds MAX_API_ERROR_COUNT times, the sign-in task will be stopped
-                if api_error_count >= MAX_API_ERROR_COUNT:
-                    sentry_sdk.capture_exception(e)
-                    return
-            else:
-                # After successful sign-in, update the sign-in date in the database, send a message to the user, and update the counter
-                user.update_next_checkin_time()
-                await Database.insert_or_replace(user)
-                if message is not None:
-                    await cls._send_message(bot, user, message)
-                    cls._total[host] += 1
-                    cls._honkai_count[host] += int(user.has_honkai3rd)
-                    cls._starrail_count[host] += int(user.has_starrail)
-                    cls._zzz_count[host] += int(user.has_zzz)
-                    cls._themis_count[host] += int(user.has_themis) + int(user.has_themis_tw)
-                    await asyncio.sleep(config.schedule_loop_delay)
+                users.append(await queue.get())
+                while len(users) < batch_size and not queue.empty():
+                    users.append(queue.get_nowait())
+                pending.update((user.discord_id, user) for user in users)
+                claims = cls._claim_daily_rewards(host, users)
+                try:
+                    while True:
+                        started = time.monotonic()
+                        try:
+                            user, message = await anext(claims)
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            claim_time += time.monotonic() - started
+                        pending.pop(user.discord_id, None)
+                        Metrics.DAILY_REWARD_CLAIMS.labels(host, "success").inc()
+                        # Users of a batch are already signed in by the remote host, only one by one sign-ins wait
+                        delay = host == "LOCAL" or host in cls._batch_unsupported_hosts
+                        await cls._on_daily_reward_claimed(bot, host, user, message, delay)
+                    success = True
+                except Exception as e:
+                    # An exception occurred during sign-in, placing the users without result back in the queue,
+                    # they keep their places so the queue never blocks
+                    for user in pending.values():
+                        queue.put_nowait(user)
+                    Metrics.DAILY_REWARD_CLAIMS.labels(host, "failure").inc(len(pending))
+                    success = False
+                    LOG.Error(f"Remote API：{host} An error occurred: {e}")
+                    if state.circuit != CircuitState.OPEN and state.consecutive_failures + 1 >= state.failure_threshold:
+                        sentry_sdk.capture_exception(e)
             finally:
-                queue.task_done()
+                state.release(success, claim_time / len(users) if success and len(users) > 0 else None)
+                for user in users:
+                    queue.task_done()
+                    if success is not False or user.discord_id not in pending:
+                        places.release()
 
     @classmethod
-    async def _claim_daily_reward(cls, host: str, user: ScheduleDailyCheckin) -> str | None:
-        
-        """Perform daily check-ins for users.
+    async def _on_daily_reward_claimed(
+        cls, bot: commands.Bot, host: str, user: ScheduleDailyCheckin, message: str | None, delay: bool
+    ):
+        """After successful sign-in, update the sign-in date in the database, send a message to the user,
+        and update the counter. `delay` waits `config.schedule_loop_delay` before the next user is signed in."""
+        user.update_next_checkin_time()
+        await Database.insert_or_replace_later(user)
+        if message is not None:
+            await cls._send_message(bot, user, message)
+            cls._total[host] += 1
+            cls._honkai_count[host] += int(user.has_honkai3rd)
+            cls._starrail_count[host] += int(user.has_starrail)
+            cls._zzz_count[host] += int(user.has_zzz)
+            cls._themis_count[host] += int(user.has_themis) + int(user.has_themis_tw)
+            if delay:
+                await asyncio.sleep(config.schedule_loop_delay)
+
+    @classmethod
+    async def _claim_daily_rewards(
+        cls, host: str, users: Sequence[ScheduleDailyCheckin]
+    ) -> AsyncIterator[tuple[ScheduleDailyCheckin, str | None]]:
+        """Perform daily check-ins for a batch of users, yielding each result as soon as it is available.
+
+        Remote hosts receive the whole batch in one `/daily-reward/batch` request, the `User` and
+        `GeetestChallenge` rows of the batch are fetched with one joined query.
 
         Parameters
         ----------
@@ -171,73 +258,142 @@ class DailyReward:
             Signed in host
             - Local: Fixed as a string "LOCAL"
             - Remote: Check-in API URL
-        user: `ScheduleDailyCheckin`
+        users: `Sequence[ScheduleDailyCheckin]`
             Users who need to sign in
 
-        Returns
+        Yields
         -------
-        str | None
-            Sign-in result message; None means skipping this user.
+        (`ScheduleDailyCheckin`, `str` | `None`)
+            The user and the sign-in result message; None means skipping this user.
 
         Raises
         ------
         Exception
-            If the sign-in fails, an Exception will be thrown.
+            If the sign-in fails, an Exception will be thrown; users not yielded yet have no result.
         """
-        if host == "LOCAL":  # Local Check-in
-            message = await claim_daily_reward(
-                user.discord_id,
-                has_genshin=user.has_genshin,
-                has_honkai3rd=user.has_honkai3rd,
-                has_starrail=user.has_starrail,
-                has_zzz=user.has_zzz,
-                has_themis=user.has_themis,
-                has_themis_tw=user.has_themis_tw,
-            )
-            return message
-        else:  # Remote API Sign-in
-            # In order to have cookies, the User Table data is obtained from the database.
-            user_data = await Database.select_one(User, User.discord_id.is_(user.discord_id))
-            gt_challenge = await Database.select_one(
-                GeetestChallenge, GeetestChallenge.discord_id.is_(user.discord_id)
-            )
-            if user_data is None:
-                return None
+        if host == "LOCAL":
+            for user in users:
+                yield user, await cls._claim_local_daily_reward(user)
+            return
+
+        # In order to have cookies, the User Table data of the whole batch is obtained from the database at once.
+        stmt = (
+            sqlalchemy.select(User, GeetestChallenge)
+            .outerjoin(GeetestChallenge, GeetestChallenge.discord_id == User.discord_id)
+            .where(User.discord_id.in_([user.discord_id for user in users]))
+        )
+        async with Database.sessionmaker() as session:
+            rows = {row[0].discord_id: row for row in (await session.execute(stmt)).all()}
+
+        payloads: dict[int, dict[str, Any]] = {}
+        batch_users: dict[int, ScheduleDailyCheckin] = {}
+        for user in users:
+            user_data, gt_challenge = rows.get(user.discord_id, (None, None))
             check, msg = await database.Tool.check_user(user_data)
-            if check is False:
-                return msg
-            payload: dict[str, Any] = {
-                "discord_id": user.discord_id,
-                "uid": 0,
-                "cookie": user_data.cookie_default,
-                "cookie_genshin": user_data.cookie_genshin,
-                "cookie_honkai3rd": user_data.cookie_honkai3rd,
-                "cookie_starrail": user_data.cookie_starrail,
-                "cookie_zzz": user_data.cookie_zzz,
-                "cookie_themis": user_data.cookie_themis,
-                "has_genshin": "true" if user.has_genshin else "false",
-                "has_honkai": "true" if user.has_honkai3rd else "false",
-                "has_starrail": "true" if user.has_starrail else "false",
-                "has_zzz": "true" if user.has_zzz else "false",
-                "has_themis": "true" if user.has_themis else "false",
-                "has_themis_tw": "true" if user.has_themis_tw else "false",
-            }
-            if gt_challenge is not None:
-                payload.update(
-                    {
-                        "geetest_genshin": gt_challenge.genshin,
-                        "geetest_honkai3rd": gt_challenge.honkai3rd,
-                        "geetest_starrail": gt_challenge.starrail,
-                    }
-                )
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url=host + "/daily-reward", json=payload) as resp:
-                    if resp.status == 200:
-                        result: dict[str, str] = await resp.json()
-                        message = result.get("message", "Remote API sign-in failed")
-                        return message
-                    else:
-                        raise Exception(f"{host} Sign-in failed, HTTP status code：{resp.status}")
+            if check is False or user_data is None:
+                yield user, msg
+                continue
+            payloads[user.discord_id] = cls._build_remote_payload(user, user_data, gt_challenge)
+            batch_users[user.discord_id] = user
+        if len(payloads) == 0:
+            return
+
+        if host not in cls._batch_unsupported_hosts:
+            # The result of each user is streamed back as one JSON object per line (NDJSON):
+            # {"discord_id": int, "message": str}
+            async with HttpClient.session().post(
+                url=host + "/daily-reward/batch",
+                json={"users": list(payloads.values())},
+                timeout=aiohttp.ClientTimeout(total=None, sock_read=config.http_request_timeout),
+            ) as resp:
+                if resp.status == 200:
+                    async for line in resp.content:
+                        if len(line.strip()) == 0:
+                            continue
+                        result: dict[str, Any] = json.loads(line)
+                        user = batch_users.pop(int(result["discord_id"]), None)
+                        if user is not None:
+                            yield user, result.get("message", "Remote API sign-in failed")
+                    if len(batch_users) > 0:
+                        raise Exception(f"{host} Batch sign-in ended without the result of {len(batch_users)} users")
+                    return
+                elif resp.status in (404, 405):
+                    # The remote host only supports signing in users one by one
+                    LOG.Info(f"Remote API：{host} does not support batch sign-in")
+                    cls._batch_unsupported_hosts.add(host)
+                else:
+                    raise Exception(f"{host} Batch sign-in failed, HTTP status code：{resp.status}")
+
+        for discord_id, user in list(batch_users.items()):
+            yield user, await cls._post_daily_reward(host, payloads[discord_id])
+            del batch_users[discord_id]
+
+    @classmethod
+    async def _claim_local_daily_reward(cls, user: ScheduleDailyCheckin) -> str:
+        """Perform the daily check-in of a user on the local host, errors are returned as the result message.
+        Remote hosts sign in users through `_claim_daily_rewards`.
+
+        Parameters
+        ----------
+        user: `ScheduleDailyCheckin`
+            User who needs to sign in
+
+        Returns
+        -------
+        str
+            Sign-in result message
+        """
+        return await claim_daily_reward(
+            user.discord_id,
+            has_genshin=user.has_genshin,
+            has_honkai3rd=user.has_honkai3rd,
+            has_starrail=user.has_starrail,
+            has_zzz=user.has_zzz,
+            has_themis=user.has_themis,
+            has_themis_tw=user.has_themis_tw,
+        )
+
+    @classmethod
+    def _build_remote_payload(
+        cls, user: ScheduleDailyCheckin, user_data: User, gt_challenge: GeetestChallenge | None
+    ) -> dict[str, Any]:
+        """Build the request payload of a user for the remote check-in API"""
+        payload: dict[str, Any] = {
+            "discord_id": user.discord_id,
+            "uid": 0,
+            "cookie": user_data.cookie_default,
+            "cookie_genshin": user_data.cookie_genshin,
+            "cookie_honkai3rd": user_data.cookie_honkai3rd,
+            "cookie_starrail": user_data.cookie_starrail,
+            "cookie_zzz": user_data.cookie_zzz,
+            "cookie_themis": user_data.cookie_themis,
+            "has_genshin": "true" if user.has_genshin else "false",
+            "has_honkai": "true" if user.has_honkai3rd else "false",
+            "has_starrail": "true" if user.has_starrail else "false",
+            "has_zzz": "true" if user.has_zzz else "false",
+            "has_themis": "true" if user.has_themis else "false",
+            "has_themis_tw": "true" if user.has_themis_tw else "false",
+        }
+        if gt_challenge is not None:
+            payload.update(
+                {
+                    "geetest_genshin": gt_challenge.genshin,
+                    "geetest_honkai3rd": gt_challenge.honkai3rd,
+                    "geetest_starrail": gt_challenge.starrail,
+                }
+            )
+        return payload
+
+    @classmethod
+    async def _post_daily_reward(cls, host: str, payload: dict[str, Any]) -> str:
+        """Sign in one user through the `/daily-reward` endpoint of the remote check-in API"""
+        async with HttpClient.session().post(url=host + "/daily-reward", json=payload) as resp:
+            if resp.status == 200:
+                result: dict[str, str] = await resp.json()
+                message = result.get("message", "Remote API sign-in failed")
+                return message
+            else:
+                raise Exception(f"{host} Sign-in failed, HTTP status code：{resp.status}")
 
     @classmethod
     async def _send_message(cls, bot: commands.Bot, user: ScheduleDailyCheckin, message: str):
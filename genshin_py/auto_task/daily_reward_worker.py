@@ -0,0 +1,103 @@
+"""Local stand-in of a remote daily check-in worker, used to test `DailyReward` against
+`config.daily_reward_api_list` without signing in to Hoyolab.
+
+It implements the same endpoints as a real worker and answers every user with a fixed message:
+- `GET /`: health check
+- `POST /daily-reward`: sign in one user, returns `{"message": str}`
+- `POST /daily-reward/batch`: sign in `{"users": [...]}`, streams one `{"discord_id": int, "message": str}` per line
+
+Usage: `python genshin_py/auto_task/daily_reward_worker.py --port 8081 --delay 0.1`,
+then add `http://127.0.0.1:8081` to `daily_reward_api_list`.
+`python genshin_py/auto_task/daily_reward_worker.py --check` runs every endpoint once in process and
+verifies the answers have the shape `DailyReward` reads.
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any
+
+from aiohttp import web
+
+
+def _claim(payload: dict[str, Any]) -> str:
+    games = [
+        game
+        for game in ("genshin", "honkai", "starrail", "zzz", "themis", "themis_tw")
+        if payload.get(f"has_{game}") == "true"
+    ]
+    return f"[stand-in worker] Signed in: {', '.join(games) or 'none'}"
+
+
+def create_app(delay: float = 0.0) -> web.Application:
+    """Create the stand-in worker application
+
+    Parameters
+    ------
+    delay: `float`
+        Simulated time to sign in one user (unit: second)
+    """
+
+    async def health(request: web.Request) -> web.Response:
+        return web.Response(text="OK")
+
+    async def daily_reward(request: web.Request) -> web.Response:
+        payload: dict[str, Any] = await request.json()
+        await asyncio.sleep(delay)
+        return web.json_response({"message": _claim(payload)})
+
+    async def daily_reward_batch(request: web.Request) -> web.StreamResponse:
+        users: list[dict[str, Any]] = (await request.json())["users"]
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for payload in users:
+            await asyncio.sleep(delay)
+            result = {"discord_id": payload["discord_id"], "message": _claim(payload)}
+            await response.write(json.dumps(result).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/", health)
+    app.router.add_post("/daily-reward", daily_reward)
+    app.router.add_post("/daily-reward/batch", daily_reward_batch)
+    return app
+
+
+async def check() -> None:
+    """Run every endpoint once in process and verify the answers have the shape `DailyReward` reads"""
+    from aiohttp.test_utils import TestClient, TestServer
+
+    users = [{"discord_id": discord_id, "has_genshin": "true"} for discord_id in (1, 2, 3)]
+    async with TestClient(TestServer(create_app())) as client:
+        resp = await client.get("/")
+        assert resp.status == 200, f"GET / returned {resp.status}"
+
+        resp = await client.post("/daily-reward", json=users[0])
+        assert resp.status == 200, f"POST /daily-reward returned {resp.status}"
+        assert isinstance((await resp.json())["message"], str)
+
+        resp = await client.post("/daily-reward/batch", json={"users": users})
+        assert resp.status == 200, f"POST /daily-reward/batch returned {resp.status}"
+        discord_ids: list[int] = []
+        async for line in resp.content:
+            if len(line.strip()) == 0:
+                continue
+            result: dict[str, Any] = json.loads(line)
+            assert isinstance(result["message"], str)
+            discord_ids.append(int(result["discord_id"]))
+        assert discord_ids == [1, 2, 3], f"Batch answered {discord_ids}"
+    print("OK")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in daily check-in worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.0)
+    parser.add_argument("--check", action="store_true", help="verify the endpoints and exit")
+    args = parser.parse_args()
+    if args.check:
+        asyncio.run(check())
+    else:
+        web.run_app(create_app(args.delay), host=args.host, port=args.port)
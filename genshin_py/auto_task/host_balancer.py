@@ -0,0 +1,164 @@
+import asyncio
+import enum
+import time
+
+from utility.prometheus import Metrics
+
+
+class CircuitState(enum.IntEnum):
+    """Circuit breaker state of a check-in host"""
+
+    CLOSED = 0
+    """Normal, requests are sent to the host"""
+    HALF_OPEN = 1
+    """Probing, a single request is sent to test whether the host has recovered"""
+    OPEN = 2
+    """Broken, no request is sent to the host until the cooldown ends"""
+
+
+class HostState:
+    """Measured capacity of a check-in host, used to decide how many requests are sent to it at the same time
+
+    - Latency and error rate are tracked as exponentially weighted moving averages
+    - The number of concurrent slots grows by one per round of successes while the latency stays
+      close to the best latency seen, and is halved on failure (AIMD)
+    - After `failure_threshold` consecutive failures the circuit opens for `cooldown` seconds,
+      then a single probe is let through (half-open); the cooldown doubles each time the probe fails
+
+    Example:
+    ```
+    await state.acquire()
+    try:
+        ...
+    finally:
+        state.release(success, latency)
+    ```
+    """
+
+    EWMA_ALPHA = 0.2
+    MAX_COOLDOWN_FACTOR = 16
+
+    def __init__(self, host: str, max_slots: int, failure_threshold: int, cooldown: float) -> None:
+        """
+        Parameters
+        ------
+        host: `str`
+            Host name, "LOCAL" or the check-in API URL
+        max_slots: `int`
+            Maximum number of concurrent requests sent to the host
+        failure_threshold: `int`
+            Number of consecutive failures that opens the circuit
+        cooldown: `float`
+            Time the circuit stays open before probing the host again (unit: second)
+        """
+        self.host = host
+        self.max_slots = max(max_slots, 1)
+        self.failure_threshold = max(failure_threshold, 1)
+        self.cooldown = cooldown
+        self.slots: float = 1.0
+        self.in_flight = 0
+        self.latency: float | None = None
+        """EWMA of the latency of signing in one user (unit: second)"""
+        self.min_latency: float | None = None
+        self.error_rate: float = 0.0
+        """EWMA of the failure rate of requests"""
+        self.circuit = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self._cooldown_factor = 1
+        self._open_until: float = 0.0
+        self._waiters: list[asyncio.Future[None]] = []
+        self._export()
+
+    @property
+    def limit(self) -> int:
+        """Number of requests allowed at the same time in the current state"""
+        if self.circuit == CircuitState.OPEN:
+            return 0
+        if self.circuit == CircuitState.HALF_OPEN:
+            return 1
+        return int(self.slots)
+
+    async def acquire(self) -> None:
+        """Wait until a slot of the host is available and the circuit allows sending requests"""
+        while True:
+            now = time.monotonic()
+            if self.circuit == CircuitState.OPEN and now >= self._open_until:
+                self.circuit = CircuitState.HALF_OPEN
+                self._export()
+            if self.in_flight < self.limit:
+                self.in_flight += 1
+                return
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            timeout = self._open_until - now if self.circuit == CircuitState.OPEN else None
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, success: bool | None, latency: float | None = None) -> None:
+        """Release the slot and record the result of the request
+
+        Parameters
+        ------
+        success: `bool` | `None`
+            Whether the request succeeded; `None` means no request was sent (e.g. cancelled)
+        latency: `float` | `None`
+            The latency of signing in one user (unit: second)
+        """
+        self.in_flight -= 1
+        if success is True:
+            self._on_success(latency)
+        elif success is False:
+            self._on_failure()
+        self._export()
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    def open(self) -> None:
+        """Open the circuit, no request is sent to the host until the cooldown ends"""
+        self.circuit = CircuitState.OPEN
+        self._open_until = time.monotonic() + self.cooldown * self._cooldown_factor
+        self._cooldown_factor = min(self._cooldown_factor * 2, self.MAX_COOLDOWN_FACTOR)
+        self._export()
+
+    def _on_success(self, latency: float | None) -> None:
+        self.error_rate *= 1 - self.EWMA_ALPHA
+        self.consecutive_failures = 0
+        if self.circuit == CircuitState.HALF_OPEN:
+            # The host has recovered, restart from one slot
+            self.circuit = CircuitState.CLOSED
+            self._cooldown_factor = 1
+            self.slots = 1.0
+        if latency is not None:
+            self.latency = (
+                latency
+                if self.latency is None
+                else self.EWMA_ALPHA * latency + (1 - self.EWMA_ALPHA) * self.latency
+            )
+            self.min_latency = (
+                latency if self.min_latency is None else min(self.min_latency, latency)
+            )
+            Metrics.DAILY_REWARD_HOST_LATENCY.labels(self.host).set(self.latency)
+            # The host is saturated when the latency grows far beyond the best latency, stop adding slots
+            if self.latency > 2 * self.min_latency:
+                self.slots = max(1.0, self.slots - 1)
+                return
+        self.slots = min(float(self.max_slots), self.slots + 1 / self.slots)
+
+    def _on_failure(self) -> None:
+        self.error_rate = self.EWMA_ALPHA + (1 - self.EWMA_ALPHA) * self.error_rate
+        self.consecutive_failures += 1
+        self.slots = max(1.0, self.slots / 2)
+        if (
+            self.circuit == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            self.open()
+
+    def _export(self) -> None:
+        Metrics.DAILY_REWARD_HOST_SLOTS.labels(self.host).set(self.limit)
+        Metrics.DAILY_REWARD_HOST_CIRCUIT.labels(self.host).set(int(self.circuit))
+        Metrics.DAILY_REWARD_HOST_ERROR_RATE.labels(self.host).set(self.error_rate)
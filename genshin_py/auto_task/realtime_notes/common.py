@@ -7,6 +7,7 @@ import genshin
 from database import Database, GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes
 
 from ... import errors, get_genshin_notes, get_starrail_notes, get_zzz_notes
+from .scheduler import get_game, notes_scheduler
 
 T_User = TypeVar("T_User", GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes)
 
@@ -35,22 +36,26 @@ async def get_realtime_notes(
         if isinstance(e, errors.GenshinAPIException) and isinstance(
             e.origin, genshin.errors.InternalDatabaseError
         ):
-            user.next_check_time = datetime.now() + timedelta(hours=1)
-            await Database.insert_or_replace(user)
+            await update_next_check_time(user, datetime.now() + timedelta(hours=1))
         # When the error triggers a graphic validation error, set the check to occur after 24 hours
         elif isinstance(e, errors.GenshinAPIException) and isinstance(
             e.origin, genshin.errors.GeetestError
         ):
-            user.next_check_time = datetime.now() + timedelta(hours=24)
-            await Database.insert_or_replace(user)
+            await update_next_check_time(user, datetime.now() + timedelta(hours=24))
             raise e
         else:  # When an error occurs, expect to check again after 5 hours
-            user.next_check_time = datetime.now() + timedelta(hours=5)
-            await Database.insert_or_replace(user)
+            await update_next_check_time(user, datetime.now() + timedelta(hours=5))
             raise e
     return notes
 
 
+async def update_next_check_time(user: T_User, next_check_time: datetime) -> None:
+    """Set the next check time of the user, save it to the database and put it into the scheduler"""
+    user.next_check_time = next_check_time
+    await Database.insert_or_replace_later(user)
+    notes_scheduler.push(get_game(user), user.discord_id, next_check_time)
+
+
 def cal_next_check_time(remaining: timedelta, user_threshold: int) -> datetime:
     """Function to calculate the next check time
 
@@ -2,11 +2,11 @@ from datetime import datetime, timedelta
 
 import genshin
 
-from database import Database, GenshinScheduleNotes
+from database import GenshinScheduleNotes
 from utility import EmbedTemplate
 
 from ... import parse_genshin_notes
-from .common import CheckResult, cal_next_check_time, get_realtime_notes
+from .common import CheckResult, cal_next_check_time, get_realtime_notes, update_next_check_time
 
 
 async def check_genshin_notes(user: GenshinScheduleNotes) -> CheckResult | None:
@@ -113,7 +113,6 @@ async def check_threshold(user: GenshinScheduleNotes, notes: genshin.models.Note
     # If a message needs to be sent this time, set the next check time to at least 1 hour
     if len(msg) > 0:
         check_time = max(check_time, datetime.now() + timedelta(minutes=60))
-    user.next_check_time = check_time
-    await Database.insert_or_replace(user)
+    await update_next_check_time(user, check_time)
 
     return msg
@@ -1,17 +1,21 @@
 import asyncio
-from datetime import datetime
-from typing import Awaitable, Callable, ClassVar
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, ClassVar, Sequence
 
 import discord
+import genshin
 import sentry_sdk
 import sqlalchemy
 from discord.ext import commands
+from sqlalchemy import ColumnElement, Row
 
-from database import Database, GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes
-from utility import LOG, config
+from database import Database, User
+from utility import LOG, RateLimiter, config
 
+from ...client import get_region
 from .common import CheckResult, T_User
 from .genshin import check_genshin_notes
+from .scheduler import GAME_ORMS, get_game, notes_scheduler
 from .starrail import check_starrail_notes
 from .zzz import check_zzz_notes
 
@@ -21,77 +25,159 @@ class RealtimeNotes:
 
     Methods
     -----
-    execute(bot: `commands.Bot`)
-        Execute automatic scheduling
+    run(bot: `commands.Bot`)
+        Keep checking instant notes, each user is checked at the next check time in the scheduler
+    schedule(game: `genshin.Game`, discord_id: `int`, next_check_time: `datetime` | `None`)
+        Put the user into the scheduler
     """
 
-    _lock: ClassVar[asyncio.Lock] = asyncio.Lock()
     _bot: commands.Bot
+    _semaphore: ClassVar[asyncio.Semaphore] = asyncio.Semaphore(config.schedule_notes_concurrency)
+    """Limit the number of users checked at the same time"""
+    _rate_limiters: ClassVar[dict[genshin.Region, RateLimiter]] = {}
+    """Rate budget of requests for each region"""
+    _tasks: ClassVar[set[asyncio.Task]] = set()
+    """Running tasks of checking due users"""
+    _uid_columns: ClassVar[dict[genshin.Game, Any]] = {
+        genshin.Game.GENSHIN: User.uid_genshin,
+        genshin.Game.STARRAIL: User.uid_starrail,
+        genshin.Game.ZZZ: User.uid_zzz,
+    }
+    _check_functions: ClassVar[dict[genshin.Game, Callable[[Any], Awaitable[CheckResult | None]]]] = {
+        genshin.Game.GENSHIN: check_genshin_notes,
+        genshin.Game.STARRAIL: check_starrail_notes,
+        genshin.Game.ZZZ: check_zzz_notes,
+    }
+    _game_names: ClassVar[dict[genshin.Game, str]] = {
+        genshin.Game.GENSHIN: "Genshin Impact",
+        genshin.Game.STARRAIL: "Honkai: Star Rail",
+        genshin.Game.ZZZ: "Zenless Zone Zero",
+    }
 
     @classmethod
-    async def execute(cls, bot: commands.Bot):
-        """Execute automatic scheduling
+    async def run(cls, bot: commands.Bot):
+        """Load the next check time of all users into the scheduler, then sleep until the earliest
+        next check time and check only the users who are due. Runs until the task is cancelled.
 
         Parameters
         -----
         bot: `commands.Bot`
             Discord bot client
         """
-        if cls._lock.locked():
-            return
-        await cls._lock.acquire()
         cls._bot = bot
-        try:
-            LOG.System("Automatic resin check start")
-            await asyncio.gather(
-                cls._check_games_note(GenshinScheduleNotes, "Genshin Impact", check_genshin_notes),
-                cls._check_games_note(StarrailScheduleNotes, "Honkai: Star Rail", check_starrail_notes),
-                cls._check_games_note(ZZZScheduleNotes, "Zenless Zone Zero", check_zzz_notes),
-            )
-        except Exception as e:
-            sentry_sdk.capture_exception(e)
-            LOG.Error(f"Automatically scheduled Realtime Notes Error: {e}")
-        finally:
-            cls._lock.release()
+        await bot.wait_until_ready()
+        await cls._load_schedule()
+        while True:
+            try:
+                now = datetime.now()
+                # The automatic schedule will not be executed during the game maintenance time
+                if config.game_maintenance_time is not None and (
+                    config.game_maintenance_time[0] <= now < config.game_maintenance_time[1]
+                ):
+                    await asyncio.sleep((config.game_maintenance_time[1] - now).total_seconds())
+                    continue
+
+                deadline = notes_scheduler.next_deadline()
+                if deadline is None or deadline > now:
+                    # Wake up at least every minute to notice changes of the maintenance time
+                    timeout = 60.0 if deadline is None else min((deadline - now).total_seconds(), 60.0)
+                    await notes_scheduler.wait(timeout)
+                    continue
+
+                for game, discord_ids in notes_scheduler.pop_due(now).items():
+                    task = asyncio.create_task(cls._check_due_users(game, discord_ids))
+                    cls._tasks.add(task)
+                    task.add_done_callback(cls._tasks.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+                LOG.Error(f"Automatically scheduled Realtime Notes Error: {e}")
+                await asyncio.sleep(60)
 
     @classmethod
-    async def _check_games_note(
-        cls,
-        game_orm: type[T_User],
-        game_name: str,
-        game_check_fucntion: Callable[[T_User], Awaitable[CheckResult | None]],
-    ) -> None:
-        """Check all users' instant notes for a specific game
+    def schedule(cls, game: genshin.Game, discord_id: int, next_check_time: datetime | None) -> None:
+        """Put the user into the scheduler, replacing the previous next check time
 
         Parameters
-        ----------
-        game_orm: Type[`T_User`]
-            Scheduled check of instant notes ORM (Object association mapping) type
-        game_name: `str`
-            Game Title
-        game_check_function: Callable[[`T_User`], Awaitable[`CheckResult` | `None`]]
-           Function to check game notes
-
+        -----
+        game: `genshin.Game`
+            The game of the scheduled instant notes
+        discord_id: `int`
+            User's Discord ID
+        next_check_time: `datetime` | `None`
+            Next check time; `None` means checking as soon as possible
         """
-        count = 0
-        # Select All User IDs
-        stmt = sqlalchemy.select(game_orm.discord_id)
+        notes_scheduler.push(game, discord_id, next_check_time)
+
+    @classmethod
+    async def _load_schedule(cls) -> None:
+        """Load the next check time of all users from the database into the scheduler"""
+        await Database.flush()
+        for game, game_orm in GAME_ORMS.items():
+            stmt = sqlalchemy.select(game_orm.discord_id, game_orm.next_check_time)
+            async with Database.sessionmaker() as session:
+                rows = (await session.execute(stmt)).all()
+            for discord_id, next_check_time in rows:
+                notes_scheduler.push(game, discord_id, next_check_time)
+            LOG.System(f"{cls._game_names[game]} instant notes schedule loaded: {len(rows)} users")
+
+    @classmethod
+    async def _select_users(
+        cls, game: genshin.Game, whereclause: ColumnElement[bool]
+    ) -> Sequence[Row[tuple[Any, int | None]]]:
+        """Select users of the game matching the where clause together with their game UID,
+        at most `config.schedule_notes_page_size` users ordered by discord_id"""
+        game_orm = GAME_ORMS[game]
+        stmt = (
+            sqlalchemy.select(game_orm, cls._uid_columns[game])
+            .outerjoin(User, User.discord_id == game_orm.discord_id)
+            .where(whereclause)
+            .order_by(game_orm.discord_id)
+            .limit(config.schedule_notes_page_size)
+        )
         async with Database.sessionmaker() as session:
-            user_ids = (await session.execute(stmt)).scalars().all()
-        for user_id in user_ids:
-            # Get the user to be checked. If the check time has not yet arrived, skip it.
-            user = await Database.select_one(game_orm, game_orm.discord_id.is_(user_id))
-            if user is None or user.next_check_time and datetime.now() < user.next_check_time:
-                continue
-            r = await game_check_fucntion(user)
-            if r is not None:
-                count += 1
-            # Send messages to users when there are error messages or when the instant note is almost full
-            if r and len(r.message) > 0:
-                await cls._send_message(user, r.message, r.embed)
-            # Check interval between users
-            await asyncio.sleep(config.schedule_loop_delay)
-        LOG.System(f"{game_name}Automatically check for instant note ending，{count}/{len(user_ids)} People have checked")
+            return (await session.execute(stmt)).all()
+
+    @classmethod
+    async def _check_due_users(cls, game: genshin.Game, discord_ids: list[int]) -> None:
+        """Check the instant notes of the due users popped from the scheduler"""
+        game_orm = GAME_ORMS[game]
+        page_size = config.schedule_notes_page_size
+        for i in range(0, len(discord_ids), page_size):
+            # Users who have been deleted from the database are dropped here
+            rows = await cls._select_users(
+                game, game_orm.discord_id.in_(discord_ids[i : i + page_size])
+            )
+            await asyncio.gather(
+                *[cls._check_user(game, user, get_region(game, uid)) for user, uid in rows]
+            )
+
+    @classmethod
+    async def _check_user(cls, game: genshin.Game, user: T_User, region: genshin.Region) -> bool:
+        """Check the instant notes of a user and send a reminder message when needed
+
+        Returns
+        ------
+        `bool`: Whether the user has been checked
+        """
+        async with cls._semaphore:
+            # Rate budget of the region replaces the fixed waiting interval between users
+            if region not in cls._rate_limiters:
+                cls._rate_limiters[region] = RateLimiter(config.schedule_notes_region_rate)
+            await cls._rate_limiters[region].acquire()
+            try:
+                r = await cls._check_functions[game](user)
+                # Send messages to users when there are error messages or when the instant note is almost full
+                if r and len(r.message) > 0:
+                    await cls._send_message(user, r.message, r.embed)
+            except Exception as e:
+                sentry_sdk.capture_exception(e)
+                LOG.Error(f"Automatically check instant notes error {LOG.User(user.discord_id)}：{e}")
+                # Keep the user in the scheduler, expect to check again after 5 hours
+                notes_scheduler.push(game, user.discord_id, datetime.now() + timedelta(hours=5))
+                return False
+            return r is not None
 
     @classmethod
     async def _send_message(cls, user: T_User, message: str, embed: discord.Embed) -> None:
@@ -111,6 +197,7 @@ class RealtimeNotes:
                 f"Automatically check instant notes to send messages. Failed to remove this user. {LOG.User(user.discord_id)}：{e}"
             )
             await Database.delete_instance(user)
+            notes_scheduler.remove(get_game(user), user.discord_id)
         except Exception as e:
             sentry_sdk.capture_exception(e)
         else:  # Message sent successfully
@@ -120,3 +207,4 @@ class RealtimeNotes:
                     f"Automatically check if the instant note user is not in the channel and remove the user {LOG.User(discord_user)}"
                 )
                 await Database.delete_instance(user)
+                notes_scheduler.remove(get_game(user), user.discord_id)
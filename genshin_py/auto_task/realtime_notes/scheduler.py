@@ -0,0 +1,104 @@
+import asyncio
+import heapq
+from datetime import datetime
+
+import genshin
+
+from database import GenshinScheduleNotes, StarrailScheduleNotes, ZZZScheduleNotes
+
+GAME_ORMS: dict[
+    genshin.Game, type[GenshinScheduleNotes | StarrailScheduleNotes | ZZZScheduleNotes]
+] = {
+    genshin.Game.GENSHIN: GenshinScheduleNotes,
+    genshin.Game.STARRAIL: StarrailScheduleNotes,
+    genshin.Game.ZZZ: ZZZScheduleNotes,
+}
+"""The ORM table of scheduled instant notes of each game"""
+
+
+def get_game(
+    user: GenshinScheduleNotes | StarrailScheduleNotes | ZZZScheduleNotes,
+) -> genshin.Game:
+    """Get the game of the scheduled instant notes ORM instance"""
+    for game, orm in GAME_ORMS.items():
+        if isinstance(user, orm):
+            return game
+    raise TypeError(f"Unknown schedule notes type: {type(user)}")
+
+
+class NotesScheduler:
+    """In-memory min-heap of (next_check_time, game, discord_id)
+
+    Entries are never removed from the heap directly: each (game, discord_id) keeps only its latest
+    deadline in `_deadlines`, outdated heap entries are discarded when they reach the top of the heap.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime, genshin.Game, int]] = []
+        self._deadlines: dict[tuple[genshin.Game, int], datetime] = {}
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: tuple[genshin.Game, int]) -> bool:
+        return key in self._deadlines
+
+    def push(self, game: genshin.Game, discord_id: int, next_check_time: datetime | None) -> None:
+        """Set the next check time of the user, replacing the previous one
+
+        Parameters
+        ------
+        game: `genshin.Game`
+            The game of the scheduled instant notes
+        discord_id: `int`
+            User's Discord ID
+        next_check_time: `datetime` | `None`
+            Next check time; `None` means checking as soon as possible
+        """
+        next_check_time = next_check_time or datetime.now()
+        self._deadlines[(game, discord_id)] = next_check_time
+        heapq.heappush(self._heap, (next_check_time, game, discord_id))
+        # Wake up the waiting loop if the new deadline is the earliest one
+        if self._heap[0][0] == next_check_time:
+            self._wakeup.set()
+
+    def remove(self, game: genshin.Game, discord_id: int) -> None:
+        """Remove the user from the schedule"""
+        self._deadlines.pop((game, discord_id), None)
+
+    def next_deadline(self) -> datetime | None:
+        """The earliest next check time in the schedule, `None` if the schedule is empty"""
+        while len(self._heap) > 0:
+            deadline, game, discord_id = self._heap[0]
+            if self._deadlines.get((game, discord_id)) == deadline:
+                return deadline
+            heapq.heappop(self._heap)  # Outdated entry
+        return None
+
+    def pop_due(self, now: datetime) -> dict[genshin.Game, list[int]]:
+        """Pop all users whose next check time has arrived
+
+        Returns
+        ------
+        `dict[genshin.Game, list[int]]`
+            Discord IDs of due users, grouped by game
+        """
+        due: dict[genshin.Game, list[int]] = {}
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, game, discord_id = heapq.heappop(self._heap)
+            del self._deadlines[(game, discord_id)]
+            due.setdefault(game, []).append(discord_id)
+        return due
+
+    async def wait(self, timeout: float | None) -> None:
+        """Sleep until the timeout expires or an earlier deadline is pushed"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+notes_scheduler = NotesScheduler()
+"""The scheduler of automatically checking instant notes"""
@@ -2,11 +2,11 @@ from datetime import datetime, timedelta
 
 import genshin
 
-from database import Database, ZZZScheduleNotes
+from database import ZZZScheduleNotes
 from utility import EmbedTemplate
 
 from ... import parse_zzz_notes
-from .common import CheckResult, cal_next_check_time, get_realtime_notes
+from .common import CheckResult, cal_next_check_time, get_realtime_notes, update_next_check_time
 
 
 async def check_zzz_notes(user: ZZZScheduleNotes) -> CheckResult | None:
@@ -60,7 +60,6 @@ async def check_threshold(user: ZZZScheduleNotes, notes: genshin.models.ZZZNotes
     # If a message needs to be sent this time, set the next check time to at least 1 hour
     if len(msg) > 0:
         check_time = max(check_time, datetime.now() + timedelta(minutes=60))
-    user.next_check_time = check_time
-    await Database.insert_or_replace(user)
+    await update_next_check_time(user, check_time)
 
     return msg
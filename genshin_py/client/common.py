@@ -1,8 +1,10 @@
 import asyncio
-from typing import Mapping, Sequence
+from typing import Any, Mapping, Sequence
 
+import aiohttp
 import genshin
 import sentry_sdk
+from cachetools import TTLCache
 
 import database
 from database import Database, GeetestChallenge, User
@@ -11,6 +13,15 @@ from utility import LOG, config, get_app_command_mention
 from ..errors import UserDataNotFound
 from ..errors_decorator import generalErrorHandler
 
+_client_cache: TTLCache[tuple[int, genshin.Game], genshin.Client] = TTLCache(
+    maxsize=config.genshin_client_cache_size, ttl=config.genshin_client_cache_ttl
+)
+"""Configured clients dict[(discord_id, game), client]. A hit is not checked against the database,
+every path that changes a user's cookie or UID must call `invalidate_client`; entries also expire
+after `config.genshin_client_cache_ttl`"""
+_connectors: dict[genshin.Region, aiohttp.TCPConnector] = {}
+"""Connection pool shared by all cached clients of the same region"""
+
 
 async def get_client(
     user_id: int,
@@ -34,26 +45,26 @@ async def get_client(
     `genshin.Client`
         Genshin Impact API Client
     """
+    if (client := _client_cache.get((user_id, game))) is not None:
+        # A client built without UID still has to go through the UID check below
+        if check_uid is False or client.uid:
+            return client
+
     user = await Database.select_one(User, User.discord_id.is_(user_id))
     check, msg = await database.Tool.check_user(user, check_uid=check_uid, game=game)
     if check is False or user is None:
         raise UserDataNotFound(msg)
 
-    client = genshin.Client(lang="en-us")
     match game:
         case genshin.Game.GENSHIN:
             uid = user.uid_genshin or 0
             cookie = user.cookie_genshin or user.cookie_default
-            if len(str(uid)) == 9 and str(uid)[0] in ["1", "2", "5"]:
-                client = genshin.Client(region=genshin.Region.CHINESE, lang="en-us")
         case genshin.Game.HONKAI:
             uid = user.uid_honkai3rd or 0
             cookie = user.cookie_honkai3rd or user.cookie_default
         case genshin.Game.STARRAIL:
             uid = user.uid_starrail or 0
             cookie = user.cookie_starrail or user.cookie_default
-            if str(uid)[0] in ["1", "2", "5"]:
-                client = genshin.Client(region=genshin.Region.CHINESE, lang="en-us")
         case genshin.Game.ZZZ:
             uid = user.uid_zzz or 0
             cookie = user.cookie_zzz or user.cookie_default
@@ -67,13 +78,76 @@ async def get_client(
             uid = 0
             cookie = user.cookie_default
 
+    region = get_region(game, uid)
+    client = genshin.Client(region=region, lang="en-us")
     client.set_cookies(cookie)
     client.default_game = game
     client.uid = uid
     client.proxy = config.genshin_py_proxy_server
+    _share_connector(client, region)
+    _client_cache[(user_id, game)] = client
     return client
 
 
+def invalidate_client(user_id: int) -> None:
+    """Remove the cached clients of the user, this must be called after the user's cookie or UID has changed,
+    since `get_client` returns a cached client without reading the user from the database
+
+    Parameters
+    ------
+    user_id: `int`
+        User Discord ID
+    """
+    for key in [key for key in _client_cache.keys() if key[0] == user_id]:
+        _client_cache.pop(key, None)
+
+
+async def close_clients() -> None:
+    """Clear the client cache and close the shared connection pools, call this once before the bot shuts down"""
+    _client_cache.clear()
+    for connector in _connectors.values():
+        await connector.close()
+    _connectors.clear()
+
+
+def _share_connector(client: genshin.Client, region: genshin.Region) -> None:
+    """Make the sessions created by the client use the connection pool of its region,
+    so that connections (and TLS handshakes) are reused between requests and users"""
+    connector = _connectors.get(region)
+    if connector is None or connector.closed:
+        connector = aiohttp.TCPConnector(limit=config.genshin_client_connection_limit, ttl_dns_cache=300)
+        _connectors[region] = connector
+    create_session = client.cookie_manager.create_session
+
+    def create_shared_session(**kwargs: Any) -> aiohttp.ClientSession:
+        return create_session(connector=connector, connector_owner=False, **kwargs)
+
+    client.cookie_manager.create_session = create_shared_session  # type: ignore
+
+
+def get_region(game: genshin.Game, uid: int | None) -> genshin.Region:
+    """Determine the server region (Hoyolab / Miyoushe) of the game account by its UID
+
+    Parameters
+    ------
+    game: `genshin.Game`
+        The game of the account
+    uid: `int` | `None`
+        The in-game UID
+
+    Returns
+    ------
+    `genshin.Region`
+        `CHINESE` for Chinese mainland servers, otherwise `OVERSEAS`
+    """
+    _uid = str(uid or 0)
+    if game == genshin.Game.GENSHIN and len(_uid) == 9 and _uid[0] in ["1", "2", "5"]:
+        return genshin.Region.CHINESE
+    if game == genshin.Game.STARRAIL and _uid[0] in ["1", "2", "5"]:
+        return genshin.Region.CHINESE
+    return genshin.Region.OVERSEAS
+
+
 @generalErrorHandler
 async def get_game_accounts(
     user_id: int, game: genshin.Game
@@ -170,6 +244,8 @@ async def set_cookie(user_id: int, cookie: str, games: Sequence[genshin.Game]) -
         user.cookie_themis = cookie
 
     await Database.insert_or_replace(user)
+    # The UIDs are set again even when the cookie did not change, so all the cached clients are stale
+    invalidate_client(user_id)
     LOG.Info(f"{LOG.User(user_id)} Cookies set successfully")
 
     result = "Cookies have been set！"
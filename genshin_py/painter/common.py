@@ -1,4 +1,6 @@
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
+
+from utility import AssetCache
 
 
 def draw_avatar(img: Image.Image, avatar: Image.Image, pos: tuple[int, int]):
@@ -20,5 +22,5 @@ def draw_text(
 ):
     """Print text on pictures"""
     draw = ImageDraw.Draw(img)
-    font = ImageFont.truetype(f"data/font/{font_name}", size)  # type: ignore
+    font = AssetCache.font(f"data/font/{font_name}", size)
     draw.text(pos, text, fill, font, anchor=anchor)
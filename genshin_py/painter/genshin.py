@@ -1,35 +1,53 @@
-import random
-
+import math
+from datetime import date
 from io import BytesIO
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Sequence
 
-import aiohttp
 import enkanetwork
 import genshin
 from PIL import Image, ImageDraw
 
 from database.dataclass import spiral_abyss
-from utility import get_server_name
+from utility import AssetCache, IconStore, RenderPool, encode_image, get_server_name
 
 from .common import draw_avatar, draw_text
 
 __all__ = ["draw_abyss_card", "draw_exploration_card", "draw_record_card"]
 
+PAINTER_VERSION = 1
+"""Bump when the layout changes, cached cards of the previous version are not used"""
+
 
 def draw_rounded_rect(img: Image.Image, pos: tuple[float, float, float, float], **kwargs):
-    """Draw a semi-transparent rounded rectangle"""
-    transparent = Image.new("RGBA", img.size, 0)
+    """Draw a semi-transparent rounded rectangle, only the bounding box of the rectangle is composited"""
+    box = (
+        max(math.floor(pos[0]), 0),
+        max(math.floor(pos[1]), 0),
+        min(math.ceil(pos[2]) + 1, img.width),
+        min(math.ceil(pos[3]) + 1, img.height),
+    )
+    if box[0] >= box[2] or box[1] >= box[3]:
+        return
+    region = img.crop(box)
+    transparent = Image.new("RGBA", region.size, 0)
     draw = ImageDraw.Draw(transparent, "RGBA")
-    draw.rounded_rectangle(pos, **kwargs)
-    img.paste(Image.alpha_composite(img, transparent))
+    draw.rounded_rectangle(
+        (pos[0] - box[0], pos[1] - box[1], pos[2] - box[0], pos[3] - box[1]), **kwargs
+    )
+    img.paste(Image.alpha_composite(region, transparent), box[:2])
+
+
+def daily_background(uid: int) -> int:
+    """Background of the record cards: changes every day and differs between players, but stays the same
+    within a day, so that repeat views of a card are served from the card cache"""
+    return (uid + date.today().toordinal()) % 12 + 1
 
 
 def draw_basic_card(
-    avatar_bytes: bytes, uid: int, user_stats: genshin.models.PartialGenshinUserStats
+    avatar_bytes: bytes, uid: int, nickname: str, server: str, level: int, background: int
 ) -> Image.Image:
-    img: Image.Image = Image.open(f"data/image/record_card/{random.randint(1, 12)}.jpg")
-    img = img.convert("RGBA")
+    img = AssetCache.image(f"data/image/record_card/{background}.jpg")
 
     avatar: Image.Image = Image.open(BytesIO(avatar_bytes)).resize((250, 250))
     draw_avatar(img, avatar, (70, 100))
@@ -37,12 +55,11 @@ def draw_basic_card(
     draw_rounded_rect(img, (340, 130, 990, 320), radius=30, fill=(0, 0, 0, 120))
     draw_rounded_rect(img, (90, 380, 990, 1810), radius=30, fill=(0, 0, 0, 120))
 
-    info = user_stats.info
-    draw_text(img, (665, 195), info.nickname, "SourceHanSerifTC-Bold.otf", 88, (255, 255, 255, 255), "mm")
+    draw_text(img, (665, 195), nickname, "SourceHanSerifTC-Bold.otf", 88, (255, 255, 255, 255), "mm")
     draw_text(
         img,
         (665, 275),
-        f"{get_server_name(info.server)}  Lv.{info.level}  UID:{uid}",
+        f"{get_server_name(server)}  Lv.{level}  UID:{uid}",
         "SourceHanSansTC-Medium.otf",
         40,
         (255, 255, 255, 255),
@@ -52,7 +69,7 @@ def draw_basic_card(
     return img
 
 
-def draw_record_card(
+async def draw_record_card(
     avatar_bytes: bytes, uid: int, user_stats: genshin.models.PartialGenshinUserStats
 ) -> BytesIO:
     """Make a personal record card
@@ -66,11 +83,6 @@ def draw_record_card(
     Returns
     `BytesIO`: The finished image is stored in the memory and the file pointer is returned.`seek(0)`
     """
-    img = draw_basic_card(avatar_bytes, uid, user_stats)
-
-    white = (255, 255, 255, 255)
-    grey = (230, 230, 230, 255)
-
     s = user_stats.stats
     stat_list = [
         (s.days_active, "Active days"),
@@ -91,6 +103,35 @@ def draw_record_card(
         (s.common_chests, "Number of common treasure chests"),
         (s.remarkable_chests, "Number of remarkable treasure chests"),
     ]
+    info = user_stats.info
+    image = await RenderPool.submit(
+        "record_card",
+        render_record_card,
+        avatar_bytes,
+        uid,
+        info.nickname,
+        info.server,
+        info.level,
+        daily_background(uid),
+        stat_list,
+    )
+    return BytesIO(image)
+
+
+def render_record_card(
+    avatar_bytes: bytes,
+    uid: int,
+    nickname: str,
+    server: str,
+    level: int,
+    background: int,
+    stat_list: list[tuple[Any, str]],
+) -> bytes:
+    """Render the personal record card in the render pool, returns the encoded image"""
+    img = draw_basic_card(avatar_bytes, uid, nickname, server, level, background)
+
+    white = (255, 255, 255, 255)
+    grey = (230, 230, 230, 255)
 
     for n, stat in enumerate(stat_list):
         column = int(n % 3)
@@ -114,13 +155,10 @@ def draw_record_card(
             "mm",
         )
 
-    img = img.convert("RGB")
-    fp = BytesIO()
-    img.save(fp, "jpeg", optimize=True, quality=50)
-    return fp
+    return encode_image(img, "record_card")
 
 
-def draw_exploration_card(
+async def draw_exploration_card(
     avatar_bytes: bytes, uid: int, user_stats: genshin.models.PartialGenshinUserStats
 ) -> BytesIO:
     """Create a personal world exploration card
@@ -134,11 +172,6 @@ def draw_exploration_card(
     Returns
     `BytesIO`: The created image is stored in memory, and the file pointer is returned. `seek(0)` is required before access
     """
-    img = draw_basic_card(avatar_bytes, uid, user_stats)
-
-    white = (255, 255, 255, 255)
-    grey = (230, 230, 230, 255)
-
     explored_list = {  # {id: [地名, 探索度]}
         1: ["Mondstadt", 0],
         2: ["Liyue", 0],
@@ -180,6 +213,36 @@ def draw_exploration_card(
     for o in offering_list:
         stat_list.append(("Level", o[1], o[0]))
 
+    info = user_stats.info
+    image = await RenderPool.submit(
+        "exploration_card",
+        render_exploration_card,
+        avatar_bytes,
+        uid,
+        info.nickname,
+        info.server,
+        info.level,
+        daily_background(uid),
+        stat_list,
+    )
+    return BytesIO(image)
+
+
+def render_exploration_card(
+    avatar_bytes: bytes,
+    uid: int,
+    nickname: str,
+    server: str,
+    level: int,
+    background: int,
+    stat_list: list[tuple[str, float, str]],
+) -> bytes:
+    """Render the world exploration card in the render pool, returns the encoded image"""
+    img = draw_basic_card(avatar_bytes, uid, nickname, server, level, background)
+
+    white = (255, 255, 255, 255)
+    grey = (230, 230, 230, 255)
+
     for n, stat in enumerate(stat_list):
         column = int(n % 3)
         row = int(n / 3)
@@ -211,15 +274,26 @@ def draw_exploration_card(
             "mm",
         )
 
-    img = img.convert("RGB")
-    fp = BytesIO()
-    img.save(fp, "jpeg", optimize=True, quality=50)
-    return fp
+    return encode_image(img, "exploration_card")
 
 
-async def draw_character(
+def character_icon(character: genshin.models.AbyssCharacter) -> tuple[Path, list[str]]:
+    """Local path and download URLs of the character portrait"""
+    urls: list[str] = []
+    # 先從 Enkanetwork CDN 取得圖片，失敗時改用 Ambr
+    try:
+        urls.append(enkanetwork.Assets.character(character.id).images.icon.url)  # type: ignore
+    except Exception:
+        pass
+    icon_name = character.icon.split("/")[-1]  # UI_AvatarIcon_XXXX.png
+    urls.append("https://api.ambr.top/assets/UI/" + icon_name)
+    return Path(f"data/image/character/{character.id}.png"), urls
+
+
+def draw_character(
     img: Image.Image,
-    character: genshin.models.AbyssCharacter,
+    character_id: int,
+    rarity: int,
     size: tuple[int, int],
     pos: tuple[int, int],
 ):
@@ -227,42 +301,16 @@ async def draw_character(
 
     ------
     Parameters
-    character `AbyssCharacter`: character information
+    character_id `int`: character ID
+    rarity `int`: character rarity
     size `Tuple[int, int]`: background frame size
     pos `Tuple[int, int]`: the upper left corner position to be drawn
     """
-    background = (
-        Image.open(f"data/image/character/char_{character.rarity}star_bg.png")
-        .convert("RGBA")
-        .resize(size)
-    )
-    avatar_file = Path(f"data/image/character/{character.id}.png")
-    # 若本地沒有圖檔則從URL下載
+    avatar_file = Path(f"data/image/character/{character_id}.png")
     if avatar_file.exists() is False:
-        avatar_img: bytes | None = None
-        async with aiohttp.ClientSession() as session:
-            # 嘗試從 Enkanetwork CDN 取得圖片
-            try:
-                enka_cdn = enkanetwork.Assets.character(character.id).images.icon.url  # type: ignore
-            except Exception:
-                pass
-            else:
-                async with session.get(enka_cdn) as resp:
-                    if resp.status == 200:
-                        avatar_img = await resp.read()
-            # 當從 Enkanetwork CDN 取得圖片失敗時改用 Ambr
-            if avatar_img is None:
-                icon_name = character.icon.split("/")[-1]  # UI_AvatarIcon_XXXX.png
-                ambr_url = "https://api.ambr.top/assets/UI/" + icon_name
-                async with session.get(ambr_url) as resp:
-                    if resp.status == 200:
-                        avatar_img = await resp.read()
-        if avatar_img is None:
-            return
-        else:
-            with open(avatar_file, "wb") as fp:
-                fp.write(avatar_img)
-    avatar = Image.open(avatar_file).convert("RGBA").resize((size[0], size[0]))
+        return
+    background = AssetCache.sprite(f"data/image/character/char_{rarity}star_bg.png", size)
+    avatar = AssetCache.image(avatar_file, size=(size[0], size[0]))
     img.paste(background, pos, background)
     img.paste(avatar, pos, avatar)
 
@@ -278,7 +326,7 @@ def draw_abyss_star(
     size `Tuple[int, int]`: size of a single star
     pos `Tuple[float, float]`: the exact center position, the star will be automatically centered
     """
-    star = Image.open("data/image/spiral_abyss/star.png").convert("RGBA").resize(size)
+    star = AssetCache.sprite("data/image/spiral_abyss/star.png", size)
     pad = 5
     upper_left = (pos[0] - number / 2 * size[0] - (number - 1) * pad, pos[1] - size[1] / 2)
     for i in range(0, number):
@@ -299,8 +347,41 @@ async def draw_abyss_card(
     Returns
     `BytesIO`: The finished image is stored in memory, and the file pointer is returned. `seek(0)` is required before access
     """
-    img = Image.open("data/image/spiral_abyss/background_blur.jpg")
-    img = img.convert("RGBA")
+    # Download the character portraits first, the rendering only reads local files.
+    # A card missing a portrait is not cached, so it is complete once the download succeeds
+    complete = await IconStore.prefetch(
+        character_icon(character)
+        for chamber in abyss_floor.chambers
+        for battle in chamber.battles
+        for character in battle.characters
+    )
+    # [(stars, [[(character id, rarity, text), ...] of each battle])] of each chamber
+    chambers: list[tuple[int, list[list[tuple[int, int, str]]]]] = []
+    for chamber in abyss_floor.chambers:
+        battles: list[list[tuple[int, int, str]]] = []
+        for battle in chamber.battles:
+            battle_characters: list[tuple[int, int, str]] = []
+            for character in battle.characters:
+                if characters is not None:
+                    constellation = next(
+                        (c.constellation for c in characters if c.id == character.id), 0
+                    )  # Match character ID and get constellation
+                    text = f"{constellation}life {character.level}class"
+                else:
+                    text = f"{character.level}class"
+                battle_characters.append((character.id, character.rarity, text))
+            battles.append(battle_characters)
+        chambers.append((chamber.stars, battles))
+
+    image = await RenderPool.submit(
+        "abyss_card", render_abyss_card, abyss_floor.floor, chambers, cache=complete
+    )
+    return BytesIO(image)
+
+
+def render_abyss_card(floor: int, chambers: list[tuple[int, list[list[tuple[int, int, str]]]]]) -> bytes:
+    """Render the Abyss floor card in the render pool, returns the encoded image"""
+    img = AssetCache.image("data/image/spiral_abyss/background_blur.jpg")
 
     character_size = (172, 210)
     character_pad = 8
@@ -308,38 +389,31 @@ async def draw_abyss_card(
     draw_text(
         img,
         (1050, 145),
-        f"{abyss_floor.floor}",
+        f"{floor}",
         "SourceHanSansTC-Bold.otf",
         85,
         (50, 50, 50),
         "mm",
     )
     # Draw each
-    for i, chamber in enumerate(abyss_floor.chambers):
+    for i, (stars, battles) in enumerate(chambers):
         # Show the number of stars in this room
-        draw_abyss_star(img, chamber.stars, (70, 70), (1050, 500 + i * 400))
+        draw_abyss_star(img, stars, (70, 70), (1050, 500 + i * 400))
         # Upper and lower rooms
-        for j, battle in enumerate(chamber.battles):
+        for j, battle_characters in enumerate(battles):
             middle = 453 + j * 1196
             left_upper = (
                 int(
                     middle
-                    - len(battle.characters) / 2 * character_size[0]
-                    - (len(battle.characters) - 1) * character_pad
+                    - len(battle_characters) / 2 * character_size[0]
+                    - (len(battle_characters) - 1) * character_pad
                 ),
                 395 + i * 400,
             )
-            for k, character in enumerate(battle.characters):
+            for k, (character_id, rarity, text) in enumerate(battle_characters):
                 x = left_upper[0] + k * (character_size[0] + 2 * character_pad)
                 y = left_upper[1]
-                await draw_character(img, character, (172, 210), (x, y))
-                if characters is not None:
-                    constellation = next(
-                        (c.constellation for c in characters if c.id == character.id), 0
-                    )  # Match character ID and get constellation
-                    text = f"{constellation}life {character.level}class"
-                else:
-                    text = f"{character.level}class"
+                draw_character(img, character_id, rarity, (172, 210), (x, y))
                 draw_text(
                     img,
                     (x + character_size[0] / 2, y + character_size[1] * 0.90),
@@ -349,7 +423,4 @@ async def draw_abyss_card(
                     (50, 50, 50),
                     "mm",
                 )
-    img = img.convert("RGB")
-    fp = BytesIO()
-    img.save(fp, "jpeg", optimize=True, quality=40)
-    return fp
+    return encode_image(img, "abyss_card")
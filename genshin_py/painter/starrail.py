@@ -1,34 +1,33 @@
 from io import BytesIO
 from pathlib import Path
+from typing import Any
 
-import aiohttp
 import genshin
 from PIL import Image
 
+from utility import AssetCache, IconStore, RenderPool, encode_image
+
 from .common import draw_avatar, draw_text
 
 __all__ = ["draw_starrail_forgottenhall_card"]
 
+PAINTER_VERSION = 1
+"""Version of the Star Rail card layouts, part of the card cache key"""
+
+MAX_FLOOR_NUM = 3
 
-async def draw_character(character: genshin.models.FloorCharacter) -> Image.Image:
+
+def draw_character(character_id: int, rarity: int, text: str) -> Image.Image:
     """Draw the character portrait, including the background frame"""
-    background = Image.open(f"data/image/character/hsr_{character.rarity}star_bg.png").convert(
-        "RGBA"
-    )
-    avatar_file = Path(f"data/image/character/{character.id}.png")
-    # Download avatar if not exists
-    if avatar_file.exists() is False:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(character.icon) as response:
-                if response.status == 200:
-                    avatar_file.write_bytes(await response.read())
-
-    avatar = Image.open(avatar_file).convert("RGBA")
-    background.paste(avatar, (0, -8), avatar)
+    background = AssetCache.image(f"data/image/character/hsr_{rarity}star_bg.png")
+    avatar_file = Path(f"data/image/character/{character_id}.png")
+    if avatar_file.exists():
+        avatar = AssetCache.image(avatar_file)
+        background.paste(avatar, (0, -8), avatar)
     draw_text(
         background,
         (background.width / 2, 193),
-        f"{character.rank}soul {character.level}class",
+        text,
         "SourceHanSansTC-Regular.otf",
         24,
         (50, 50, 50),
@@ -37,30 +36,49 @@ async def draw_character(character: genshin.models.FloorCharacter) -> Image.Imag
     return background
 
 
-async def draw_floor(
+def floor_data(
     floor: genshin.models.StarRailFloor | genshin.models.FictionFloor,
-) -> Image.Image:
+) -> dict[str, Any]:
+    """Convert the floor to picklable data for the render pool"""
+    score: str | None = None
+    # Fictional narrative has more points up and down
+    if isinstance(floor, genshin.models.FictionFloor):
+        score = f"Total score：{floor.score} ({floor.node_1.score} + {floor.node_2.score})"
+    return {
+        "name": floor.name,
+        "round_num": floor.round_num,
+        "score": score,
+        "star_num": floor.star_num,
+        "nodes": [
+            [(c.id, c.rarity, f"{c.rank}soul {c.level}class") for c in node.avatars]
+            for node in (floor.node_1, floor.node_2)
+        ],
+    }
+
+
+def draw_floor(floor: dict[str, Any]) -> Image.Image:
     """Painting the Garden of Oblivion, Fictional Narrative Floor"""
     # Create a transparent image
     img = Image.new("RGBA", (1714, 270), (0, 0, 0, 0))
 
     # Draw floor title
-    draw_text(img, (0, 5), f"{floor.name}", "SourceHanSansTC-Bold.otf", 36, (200, 200, 200), "lt")
+    draw_text(
+        img, (0, 5), f"{floor['name']}", "SourceHanSansTC-Bold.otf", 36, (200, 200, 200), "lt"
+    )
     draw_text(
         img,
         (img.width, 5),
-        f"Use wheel：{floor.round_num}",
+        f"Use wheel：{floor['round_num']}",
         "SourceHanSansTC-Regular.otf",
         32,
         (200, 200, 200),
         "rt",
     )
-    # Fictional narrative has more points up and down
-    if isinstance(floor, genshin.models.FictionFloor):
+    if floor["score"] is not None:
         draw_text(
             img,
             (1000, 5),
-            f"Total score：{floor.score} ({floor.node_1.score} + {floor.node_2.score})",
+            floor["score"],
             "SourceHanSansTC-Regular.otf",
             32,
             (200, 200, 200),
@@ -70,21 +88,16 @@ async def draw_floor(
     # Draw floor characters
     character_width = 156
     pad = 15
-    character_num = len(floor.node_1.avatars)
-    x = int(357 - character_num / 2 * character_width - (character_num - 1) * pad)
-    for i, character in enumerate(floor.node_1.avatars):
-        character_img = await draw_character(character)
-        img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
-
-    character_num = len(floor.node_2.avatars)
-    x = int(1357 - character_num / 2 * character_width - (character_num - 1) * pad)
-    for i, character in enumerate(floor.node_2.avatars):
-        character_img = await draw_character(character)
-        img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
+    for middle, characters in zip((357, 1357), floor["nodes"]):
+        character_num = len(characters)
+        x = int(middle - character_num / 2 * character_width - (character_num - 1) * pad)
+        for i, (character_id, rarity, text) in enumerate(characters):
+            character_img = draw_character(character_id, rarity, text)
+            img.paste(character_img, (x + (character_img.width + 2 * pad) * i, 60), character_img)
 
     # Draw star
-    star = Image.open("data/image/forgotten_hall/star.png").convert("RGBA")
-    number = floor.star_num
+    star = AssetCache.sprite("data/image/forgotten_hall/star.png")
+    number = floor["star_num"]
     pos: tuple[int, int] = (int(img.width / 2), 130)
     pos = (int(pos[0] - number / 2 * (star.width) - (number - 1) * 5), pos[1])
     for i in range(number):
@@ -101,7 +114,6 @@ async def draw_starrail_forgottenhall_card(
     floors: list[genshin.models.StarRailFloor] | list[genshin.models.FictionFloor],
 ) -> BytesIO:
     """Drawing the Garden of Oblivion, Fictional Narrative Cards"""
-    MAX_FLOOR_NUM = 3
     floors = floors[:MAX_FLOOR_NUM]
 
     if isinstance(hall, genshin.models.StarRailChallenge):
@@ -111,7 +123,37 @@ async def draw_starrail_forgottenhall_card(
         background_img_path = "data/image/forgotten_hall/bg_blue.png"
         title = "Fictional Narrative"
 
-    img = Image.open(background_img_path).convert("RGBA")
+    # Download the character portraits first, the rendering only reads local files.
+    # A card missing a portrait is not cached, so it is complete once the download succeeds
+    complete = await IconStore.prefetch(
+        (Path(f"data/image/character/{character.id}.png"), [character.icon])
+        for floor in floors
+        for character in (*floor.node_1.avatars, *floor.node_2.avatars)
+    )
+    header = {
+        "background": background_img_path,
+        "title": f"{nickname} {title}",
+        "period": f"{hall.begin_time.datetime.strftime('%Y.%m.%d')} ~ {hall.end_time.datetime.strftime('%Y.%m.%d')}",
+        "progress": f"Level Progress：{hall.max_floor}　Number of battles：{hall.total_battles}",
+        "stars": f"★：{hall.total_stars}",
+    }
+    image = await RenderPool.submit(
+        "forgottenhall_card",
+        render_forgottenhall_card,
+        avatar_bytes,
+        uid,
+        header,
+        [floor_data(floor) for floor in floors],
+        cache=complete,
+    )
+    return BytesIO(image)
+
+
+def render_forgottenhall_card(
+    avatar_bytes: bytes, uid: int, header: dict[str, str], floors: list[dict[str, Any]]
+) -> bytes:
+    """Render the Garden of Oblivion, Fictional Narrative card in the render pool, returns the encoded image"""
+    img = AssetCache.image(header["background"])
 
     avatar: Image.Image = Image.open(BytesIO(avatar_bytes)).resize((160, 160), Image.LANCZOS)
     draw_avatar(img, avatar, (230, 55))
@@ -119,7 +161,7 @@ async def draw_starrail_forgottenhall_card(
     draw_text(
         img,
         (img.width / 2, 80),
-        f"{nickname} {title}",
+        header["title"],
         "SourceHanSansTC-Bold.otf",
         38,
         (255, 198, 118),
@@ -128,7 +170,7 @@ async def draw_starrail_forgottenhall_card(
     draw_text(
         img,
         (img.width / 2, 140),
-        f"{hall.begin_time.datetime.strftime('%Y.%m.%d')} ~ {hall.end_time.datetime.strftime('%Y.%m.%d')}",
+        header["period"],
         "SourceHanSansTC-Regular.otf",
         28,
         (220, 220, 220),
@@ -137,7 +179,7 @@ async def draw_starrail_forgottenhall_card(
     draw_text(
         img,
         (img.width / 2, 190),
-        f"Level Progress：{hall.max_floor}　Number of battles：{hall.total_battles}",
+        header["progress"],
         "SourceHanSansTC-Regular.otf",
         28,
         (220, 220, 220),
@@ -146,7 +188,7 @@ async def draw_starrail_forgottenhall_card(
     draw_text(
         img,
         (img.width - 220, 140),
-        f"★：{hall.total_stars}",
+        header["stars"],
         "SourceHanSansTC-Bold.otf",
         38,
         (255, 198, 118),
@@ -165,7 +207,7 @@ async def draw_starrail_forgottenhall_card(
     # Draw all floors
     floor_img_height = 0
     for i, floor in enumerate(floors):
-        floor_img = await draw_floor(floor)
+        floor_img = draw_floor(floor)
         w = floor_img.width
         h = floor_img.height
         floor_img = floor_img.resize((int(w * 0.85), int(h * 0.85)), Image.LANCZOS)
@@ -181,7 +223,4 @@ async def draw_starrail_forgottenhall_card(
         (0, 0, img.width, img.height - (MAX_FLOOR_NUM - len(floors)) * floor_img_height)
     )
 
-    img = img.convert("RGB")
-    fp = BytesIO()
-    img.save(fp, "jpeg", optimize=True, quality=95)
-    return fp
+    return encode_image(img, "forgottenhall_card")
@@ -1,5 +1,7 @@
 import argparse
 import asyncio
+import hashlib
+import json
 from pathlib import Path
 
 import discord
@@ -9,7 +11,8 @@ import sentry_sdk
 from discord.ext import commands
 
 import database
-from utility import LOG, config, sentry_logging
+import genshin_py
+from utility import LOG, HttpClient, RenderPool, Startup, config, sentry_logging
 
 intents = discord.Intents.default()
 argparser = argparse.ArgumentParser()
@@ -30,43 +33,107 @@ class GenshinDiscordBot(commands.AutoShardedBot):
 
     async def setup_hook(self) -> None:
         # Load jishaku
-        await self.load_extension("jishaku")
+        with Startup.phase("jishaku"):
+            await self.load_extension("jishaku")
 
         # Initialize the database
-        await database.Database.init()
+        with Startup.phase("database"):
+            await database.Database.init()
 
-        # Initialize Genshin API character names
-        await genshin.utility.update_characters_enka(["en-us"])
+        # Start the bot-wide HTTP session and the process pool that renders the images
+        with Startup.phase("http session, render pool"):
+            await HttpClient.start()
+            RenderPool.start()
 
-        # Load all cogs from the 'cogs' folder
-        for filepath in Path("./cogs").glob("**/*cog.py"):
-            parts = list(filepath.parts)
-            parts[-1] = filepath.stem
-            await self.load_extension(".".join(parts))
+        # Update Genshin API character names, the commands use the built-in names until it finishes
+        Startup.background(
+            "genshin character names", genshin.utility.update_characters_enka(["en-us"])
+        )
 
-        # Load all cogs from the 'cogs_external' folder
-        for filepath in Path("./cogs_external").glob("**/*.py"):
-            cog_name = Path(filepath).stem
-            await self.load_extension(f"cogs_external.{cog_name}")
+        # Load all cogs from the 'cogs' folder, cogs that need remote data load it in the background
+        with Startup.phase("cogs"):
+            for filepath in Path("./cogs").glob("**/*cog.py"):
+                parts = list(filepath.parts)
+                parts[-1] = filepath.stem
+                await self.load_extension(".".join(parts))
 
-        # Sync slash commands
-        if config.test_server_id is not None:
-            test_guild = discord.Object(id=config.test_server_id)
-            self.tree.copy_global_to(guild=test_guild)
-            await self.tree.sync(guild=test_guild)
-        await self.tree.sync()
+            # Load all cogs from the 'cogs_external' folder
+            for filepath in Path("./cogs_external").glob("**/*.py"):
+                cog_name = Path(filepath).stem
+                await self.load_extension(f"cogs_external.{cog_name}")
+
+        # Sync slash commands when their definitions have changed since the last sync
+        with Startup.phase("command tree sync"):
+            await self.sync_tree()
 
         # Start Prometheus Server
         if config.prometheus_server_port is not None:
             prometheus_client.start_http_server(config.prometheus_server_port)
             LOG.System(f"prometheus server: started on port {config.prometheus_server_port}")
 
+        Startup.report()
+
+    async def sync_tree(self, force: bool = False) -> bool:
+        """Sync the slash commands to Discord if their definitions differ from the last synced ones
+
+        Parameters
+        ------
+        force: `bool`
+            Sync even if the definitions have not changed
+
+        Returns
+        ------
+        `bool`
+            Whether the commands have been synced
+        """
+        test_guild = (
+            discord.Object(id=config.test_server_id) if config.test_server_id is not None else None
+        )
+        if test_guild is not None:
+            self.tree.copy_global_to(guild=test_guild)
+
+        definitions = {
+            "application_id": config.application_id,
+            "global": [command.to_dict(self.tree) for command in self.tree.get_commands()],
+            "guild": (
+                {
+                    str(test_guild.id): [
+                        command.to_dict(self.tree)
+                        for command in self.tree.get_commands(guild=test_guild)
+                    ]
+                }
+                if test_guild is not None
+                else {}
+            ),
+        }
+        digest = hashlib.sha256(
+            json.dumps(definitions, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        hash_path = Path(config.command_tree_hash_path)
+        if not force and hash_path.exists() and hash_path.read_text().strip() == digest:
+            LOG.System("command tree: unchanged, sync skipped")
+            return False
+
+        if test_guild is not None:
+            await self.tree.sync(guild=test_guild)
+        await self.tree.sync()
+        hash_path.parent.mkdir(parents=True, exist_ok=True)
+        hash_path.write_text(digest)
+        LOG.System("command tree: synced")
+        return True
+
     async def on_ready(self):
         LOG.System(f"on_ready: You have logged in as {self.user}")
         LOG.System(f"on_ready: Total {len(self.guilds)} servers connected")
 
     async def close(self) -> None:
-        # Close the database
+        # Close the connection pools of the Genshin API clients and the bot-wide HTTP session
+        await genshin_py.close_clients()
+        await HttpClient.close()
+        RenderPool.close()
+        # Write the buffered rows, then close the database
+        await database.Database.flush()
+        LOG.System("on_close: The database write buffer is flushed")
         await database.Database.close()
         LOG.System("on_close: The database is closed")
         await super().close()
@@ -79,19 +146,6 @@ class GenshinDiscordBot(commands.AutoShardedBot):
         LOG.ErrorLog(ctx, error)
 
 
-argparser.add_argument("--migrate_database", action="store_true")
-args = argparser.parse_args()
-
-if args.migrate_database:
-    asyncio.run(database.migration.migrate())
-    exit()
-
-sentry_sdk.init(dsn=config.sentry_sdk_dsn, integrations=[sentry_logging], traces_sample_rate=1.0)
-
-client = GenshinDiscordBot()
-
-
-@client.tree.error
 async def on_error(
     interaction: discord.Interaction, error: discord.app_commands.AppCommandError
 ) -> None:
@@ -99,4 +153,19 @@ async def on_error(
     sentry_sdk.capture_exception(error)
 
 
-client.run(config.bot_token)
+# The render pool's worker processes import this module, only the main process starts the bot
+if __name__ == "__main__":
+    argparser.add_argument("--migrate_database", action="store_true")
+    args = argparser.parse_args()
+
+    if args.migrate_database:
+        asyncio.run(database.migration.migrate())
+        exit()
+
+    sentry_sdk.init(
+        dsn=config.sentry_sdk_dsn, integrations=[sentry_logging], traces_sample_rate=1.0
+    )
+
+    client = GenshinDiscordBot()
+    client.tree.error(on_error)
+    client.run(config.bot_token)
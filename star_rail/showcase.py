@@ -1,3 +1,4 @@
+import asyncio
 import io
 import json
 from typing import Tuple
@@ -8,9 +9,9 @@ from honkairail.src.tools.modalV2 import StarRailApiDataV2
 from hsrcard.hsr import HonkaiCard
 from mihomo import MihomoAPI, StarrailInfoParsed
 from mihomo import tools as mihomo_tools
-from PIL.Image import Image
 
 from database import Database, StarrailShowcase
+from utility import encode_image, image_filename
 
 
 class Showcase:
@@ -20,7 +21,8 @@ class Showcase:
         self.uid = uid
         self.client = MihomoAPI()
         self.data: StarrailInfoParsed
-        self.image_cache: LRUCache[int, Image] = LRUCache(maxsize=10)
+        self.image_cache: LRUCache[int, bytes] = LRUCache(maxsize=10)
+        """Encoded character card of each character index"""
         self.is_cached_data: bool = False
 
     async def load_data(self) -> None:
@@ -82,25 +84,20 @@ class Showcase:
         embed = self.get_default_embed(index)
         embed.set_thumbnail(url=None)
 
-        if self.image_cache.get(index) is not None:
-            image = self.image_cache.get(index)
-        else:
+        if (image := self.image_cache.get(index)) is None:
             data_dict = self.data.dict(by_alias=True)
             data_dict["player"]["space_info"] = {}
             data_hsrcard = StarRailApiDataV2.parse_raw(json.dumps(data_dict, ensure_ascii=False))
 
             async with HonkaiCard(lang="cht") as card_creater:
                 result = await card_creater.creat(self.uid, data_hsrcard, index)
-                image = result.card[0].card
+                card = result.card[0].card
+            image = await asyncio.to_thread(encode_image, card, "starrail_showcase")
             self.image_cache[index] = image
 
-        fp = io.BytesIO()
-        image = image.convert("RGB")
-        image.save(fp, "jpeg", optimize=True, quality=90)
-        fp.seek(0)
-
-        embed.set_image(url="attachment://image.jpeg")
-        file = discord.File(fp, "image.jpeg")
+        filename = image_filename("starrail_showcase")
+        embed.set_image(url=f"attachment://{filename}")
+        file = discord.File(io.BytesIO(image), filename)
         return (embed, file)
 
     def get_character_stat_embed(self, index: int) -> discord.Embed:
@@ -1,5 +1,13 @@
+from .asset_cache import AssetCache
+from .card_cache import CardCache
 from .config import config
 from .custom_log import LOG, ContextCommandLogger, SlashCommandLogger
 from .discord_ui_template import *
 from .emoji import emoji
+from .encoder import encode_image, image_filename
+from .http import HttpClient
+from .icon_store import IconStore
+from .rate_limiter import RateLimiter
+from .render_pool import RenderPool
+from .startup import Startup
 from .utils import *
@@ -0,0 +1,170 @@
+import functools
+from collections import OrderedDict
+from pathlib import Path
+from typing import ClassVar
+
+from PIL import Image, ImageFont
+
+from .config import config
+from .prometheus import Metrics
+
+WARM_UP_IMAGES: tuple[str, ...] = (
+    *(f"data/image/record_card/{i}.jpg" for i in range(1, 13)),
+    "data/image/spiral_abyss/background_blur.jpg",
+    *(f"data/image/character/hsr_{rarity}star_bg.png" for rarity in (4, 5)),
+    "data/image/forgotten_hall/bg.png",
+    "data/image/forgotten_hall/bg_blue.png",
+)
+"""Static images used by every card, decoded by `AssetCache.warm_up`"""
+
+SPRITES: tuple[tuple[str, tuple[int, int] | None], ...] = (
+    ("data/image/spiral_abyss/star.png", (70, 70)),
+    *((f"data/image/character/char_{rarity}star_bg.png", (172, 210)) for rarity in (4, 5)),
+    ("data/image/forgotten_hall/star.png", None),
+)
+"""(file, size) of the sprites the painters paste many times per card, built by `AssetCache.warm_up`"""
+
+
+class AssetCache:
+    """Process-wide cache of fonts and decoded static images used by the painters.
+
+    Fonts are kept by (file, size); images are kept decoded and converted by (file, mode, size) in an
+    LRU that is bounded by `config.asset_cache_max_bytes` of pixel data. Small images pasted many times per card
+    (stars, rarity frames) are kept as sprites, resized once and shared without copying.
+    Each render pool process has its own cache.
+
+    Methods
+    -----
+    font(path: `str`, size: `int`)
+        Get the font of the size
+    image(path: `str`, mode: `str`, size: `tuple[int, int]` | `None`)
+        Get a copy of the decoded image
+    sprite(path: `str`, size: `tuple[int, int]` | `None`)
+        Get the shared sprite, for pasting only
+    warm_up()
+        Load the static images and sprites used by every card
+    pop_requests()
+        Number of image requests since the last call, by result
+    clear()
+        Remove all cached fonts, images and sprites
+    """
+
+    _images: ClassVar[OrderedDict[tuple[str, str, tuple[int, int] | None], Image.Image]] = (
+        OrderedDict()
+    )
+    _images_bytes: ClassVar[int] = 0
+    _sprites: ClassVar[dict[tuple[str, tuple[int, int] | None], Image.Image]] = {}
+    _requests: ClassVar[dict[str, int]] = {"hit": 0, "miss": 0}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def font(path: str, size: int) -> ImageFont.FreeTypeFont:
+        """Get the font of the size, the font is shared and must not be modified
+
+        Parameters
+        ------
+        path: `str`
+            Path of the font file
+        size: `int`
+            Font size
+        """
+        return ImageFont.truetype(path, size)
+
+    @classmethod
+    def image(
+        cls,
+        path: str | Path,
+        mode: str = "RGBA",
+        size: tuple[int, int] | None = None,
+        resample: int = Image.BICUBIC,
+    ) -> Image.Image:
+        """Get a copy of the decoded image, the copy can be drawn on freely
+
+        Parameters
+        ------
+        path: `str` | `Path`
+            Path of the image file
+        mode: `str`
+            Mode the image is converted to
+        size: `tuple[int, int]` | `None`
+            Size the image is resized to, `None` keeps the original size
+        resample: `int`
+            Resampling filter used when resizing
+        """
+        key = (str(path), mode, size)
+        if (image := cls._images.get(key)) is not None:
+            cls._images.move_to_end(key)
+            cls._record("hit")
+            return image.copy()
+
+        cls._record("miss")
+        with Image.open(path) as file:
+            image = file.convert(mode)
+        if size is not None:
+            image = image.resize(size, resample)
+
+        image_bytes = cls._image_bytes(image)
+        if image_bytes <= config.asset_cache_max_bytes:
+            cls._images[key] = image
+            cls._images_bytes += image_bytes
+            while cls._images_bytes > config.asset_cache_max_bytes:
+                _, evicted = cls._images.popitem(last=False)
+                cls._images_bytes -= cls._image_bytes(evicted)
+        return image.copy()
+
+    @classmethod
+    def sprite(cls, path: str | Path, size: tuple[int, int] | None = None) -> Image.Image:
+        """Get the shared RGBA sprite, it is not copied and must only be pasted, never drawn on
+
+        Parameters
+        ------
+        path: `str` | `Path`
+            Path of the image file
+        size: `tuple[int, int]` | `None`
+            Size the sprite is resized to, `None` keeps the original size
+        """
+        key = (str(path), size)
+        if (sprite := cls._sprites.get(key)) is None:
+            with Image.open(path) as file:
+                sprite = file.convert("RGBA")
+            if size is not None:
+                sprite = sprite.resize(size)
+            cls._sprites[key] = sprite
+        return sprite
+
+    @classmethod
+    def warm_up(cls) -> None:
+        """Load the static images and sprites used by every card, missing files are skipped"""
+        if not config.asset_cache_warm_up:
+            return
+        for path in WARM_UP_IMAGES:
+            if Path(path).exists():
+                cls.image(path)
+        for path, size in SPRITES:
+            if Path(path).exists():
+                cls.sprite(path, size)
+
+    @classmethod
+    def pop_requests(cls) -> dict[str, int]:
+        """Number of image requests since the last call by result ("hit", "miss"), reset to 0
+        (used to report the requests of the render pool, whose metrics are not exported)"""
+        requests = cls._requests
+        cls._requests = {"hit": 0, "miss": 0}
+        return requests
+
+    @classmethod
+    def _record(cls, result: str) -> None:
+        Metrics.ASSET_CACHE_REQUESTS.labels(result).inc()
+        cls._requests[result] += 1
+
+    @classmethod
+    def clear(cls) -> None:
+        """Remove all cached fonts, images and sprites"""
+        cls.font.cache_clear()
+        cls._images.clear()
+        cls._images_bytes = 0
+        cls._sprites.clear()
+
+    @staticmethod
+    def _image_bytes(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
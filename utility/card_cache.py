@@ -0,0 +1,216 @@
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path, PurePath
+from typing import Any, Callable, ClassVar
+
+import pydantic
+
+from .config import config
+from .custom_log import LOG
+from .encoder import image_format
+from .prometheus import Metrics
+
+
+class CardCache:
+    """Cache of rendered card images, addressed by a hash of the rendering function and its inputs.
+
+    The key covers the job name, the rendering function, the `PAINTER_VERSION` of its module, the encoding
+    settings and all of its arguments, so a card is rendered again whenever the data or the painter changes
+    and never served stale. A job whose arguments cannot be serialized stably is not cached.
+    Images are kept in a memory LRU bounded by `config.card_cache_memory_bytes`, and on disk under
+    `config.card_cache_directory`, bounded by `config.card_cache_disk_bytes` and `config.card_cache_max_age`.
+
+    Methods
+    -----
+    key(job: `str`, fn: `Callable`, args: `tuple`)
+        Compute the cache key of a render job, `None` if it cannot be cached
+    get(key: `str`)
+        Get the image from memory or disk
+    put(key: `str`, image: `bytes`)
+        Store the image in memory and on disk
+    prune()
+        Remove expired images and the oldest images beyond the disk size limit
+    """
+
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+    _memory: ClassVar[OrderedDict[str, bytes]] = OrderedDict()
+    _memory_bytes: ClassVar[int] = 0
+    _disk_bytes: ClassVar[int | None] = None
+
+    @classmethod
+    def key(cls, job: str, fn: Callable[..., bytes], args: tuple[Any, ...]) -> str | None:
+        """Compute the cache key of a render job
+
+        Parameters
+        ------
+        job: `str`
+            Name of the job
+        fn: `Callable[..., bytes]`
+            Module-level rendering function
+        args: `tuple[Any, ...]`
+            Arguments of the rendering function
+
+        Returns
+        ------
+        `str` | `None`
+            SHA-256 hex digest of the job, the painter version and the arguments,
+            `None` if an argument cannot be serialized stably
+        """
+        version = getattr(sys.modules.get(fn.__module__), "PAINTER_VERSION", 0)
+        # The encoding settings are part of the key, so a cached card always matches the configured format
+        encoding = [image_format(job), config.image_quality.get(job), config.image_effort]
+        try:
+            payload = json.dumps(
+                [job, fn.__module__, fn.__qualname__, version, encoding, args],
+                default=cls._serialize,
+                sort_keys=True,
+                ensure_ascii=False,
+            )
+        except (TypeError, ValueError) as e:
+            LOG.System(f"Card cache: {job} is not cached, its arguments cannot be serialized: {e}")
+            return None
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @classmethod
+    def get(cls, key: str) -> bytes | None:
+        """Get the image from memory or disk (disk access blocks, call it in a worker thread)
+
+        Parameters
+        ------
+        key: `str`
+            Cache key from `CardCache.key`
+
+        Returns
+        ------
+        `bytes` | `None`
+            The encoded image, `None` if it is not cached
+        """
+        with cls._lock:
+            if (image := cls._memory.get(key)) is not None:
+                cls._memory.move_to_end(key)
+        if image is not None:
+            Metrics.CARD_CACHE_REQUESTS.labels("memory").inc()
+            return image
+
+        path = cls._path(key)
+        try:
+            if time.time() - path.stat().st_mtime > config.card_cache_max_age:
+                cls._unlink(path)
+                raise FileNotFoundError
+            image = path.read_bytes()
+        except FileNotFoundError:
+            Metrics.CARD_CACHE_REQUESTS.labels("miss").inc()
+            return None
+        Metrics.CARD_CACHE_REQUESTS.labels("disk").inc()
+        cls._remember(key, image)
+        return image
+
+    @classmethod
+    def put(cls, key: str, image: bytes) -> None:
+        """Store the image in memory and on disk (disk access blocks, call it in a worker thread)
+
+        Parameters
+        ------
+        key: `str`
+            Cache key from `CardCache.key`
+        image: `bytes`
+            The encoded image
+        """
+        cls._remember(key, image)
+        if config.card_cache_disk_bytes <= 0:
+            return
+        path = cls._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(path.name + ".tmp")
+        temp.write_bytes(image)
+        temp.replace(path)
+
+        with cls._lock:
+            if cls._disk_bytes is not None:
+                cls._disk_bytes += len(image)
+            disk_bytes = cls._disk_bytes
+        if disk_bytes is None or disk_bytes > config.card_cache_disk_bytes:
+            cls.prune()
+
+    @classmethod
+    def prune(cls) -> None:
+        """Remove expired images and the oldest images beyond the disk size limit (blocks, call it in a worker thread)"""
+        directory = Path(config.card_cache_directory)
+        if not directory.exists():
+            with cls._lock:
+                cls._disk_bytes = 0
+            return
+        now = time.time()
+        files: list[tuple[float, int, Path]] = []
+        for path in directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > config.card_cache_max_age:
+                cls._unlink(path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        # Remove the oldest images until the cache is at 90% of the limit, so that pruning does not run on every write
+        files.sort(reverse=True)
+        total = 0
+        removed = 0
+        for mtime, size, path in files:
+            if total + size > config.card_cache_disk_bytes * 0.9:
+                cls._unlink(path)
+                removed += 1
+            else:
+                total += size
+        with cls._lock:
+            cls._disk_bytes = total
+        if removed > 0:
+            LOG.System(f"Card cache: removed {removed} images beyond the disk size limit")
+
+    @classmethod
+    def _remember(cls, key: str, image: bytes) -> None:
+        if len(image) > config.card_cache_memory_bytes:
+            return
+        with cls._lock:
+            if (old := cls._memory.pop(key, None)) is not None:
+                cls._memory_bytes -= len(old)
+            cls._memory[key] = image
+            cls._memory_bytes += len(image)
+            while cls._memory_bytes > config.card_cache_memory_bytes:
+                _, evicted = cls._memory.popitem(last=False)
+                cls._memory_bytes -= len(evicted)
+
+    @staticmethod
+    def _path(key: str) -> Path:
+        return Path(config.card_cache_directory) / key[:2] / key
+
+    @staticmethod
+    def _unlink(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _serialize(obj: Any) -> Any:
+        """Convert the objects json cannot serialize, raise `TypeError` for objects without a stable form"""
+        if isinstance(obj, (bytes, bytearray)):
+            return hashlib.sha256(obj).hexdigest()
+        if isinstance(obj, pydantic.BaseModel):
+            return obj.dict()
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        if isinstance(obj, Enum):
+            return obj.value
+        if isinstance(obj, PurePath):
+            return str(obj)
+        if isinstance(obj, (set, frozenset)):
+            return sorted(obj, key=repr)
+        # repr() of other objects may contain a memory address, which would give a different key every time
+        raise TypeError(f"{type(obj).__name__} cannot be part of a card cache key")
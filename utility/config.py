@@ -17,19 +17,118 @@ class Config(BaseSettings):
 
     daily_reward_api_list: list[str] = []
     """The daily-checkin API url list"""
+    daily_reward_batch_size: int = 50
+    """Number of users sent to a remote daily-checkin API in one batch request"""
+    daily_reward_max_slots: int = 8
+    """Maximum number of concurrent sign-in requests sent to each remote host, adapted to its latency and errors"""
+    daily_reward_local_slots: int = 1
+    """Number of users signed in by the bot itself at the same time"""
+    daily_reward_circuit_failures: int = 5
+    """Number of consecutive failures of a host that stops sending requests to it"""
+    daily_reward_circuit_cooldown: float = 60.0
+    """Time before a failing host is probed again, doubled each time the probe fails (unit: second)"""
 
     schedule_daily_checkin_interval: int = 10
     """The interval between automatic sign -in (unit: minute)"""
-    schedule_check_resin_interval: int = 10
-    """Automatically check the interval of resins (unit: minute)"""
     schedule_loop_delay: float = 2.0
     """The waiting interval between each user during scheduling (unit: second)"""
+    sqlite_journal_mode: str | None = "WAL"
+    """SQLite journal mode, WAL lets command reads run while the schedule is writing, None keeps the default"""
+    sqlite_synchronous: str | None = "NORMAL"
+    """SQLite synchronous level, NORMAL skips the sync on each commit in WAL mode, None keeps the default"""
+    sqlite_mmap_size: int | None = 268435456
+    """Size of the database file mapped into memory (unit: byte), None keeps the default"""
+    sqlite_cache_size: int | None = -65536
+    """SQLite page cache size, negative values are in KiB, None keeps the default"""
+    sqlite_temp_store: str | None = "MEMORY"
+    """Where SQLite keeps temporary tables and indexes, None keeps the default"""
+    sqlite_busy_timeout: int | None = 5000
+    """Time to wait for a locked database before failing (unit: millisecond), None keeps the default"""
+    database_backup_compress: bool = True
+    """Whether to compress the daily database backup with gzip"""
+    database_backup_keep: int = 7
+    """Number of latest database backups to keep, 0 keeps all backups"""
+    database_backup_pages: int = 256
+    """Number of database pages copied in each step of the backup"""
+    database_backup_step_sleep: float = 0.005
+    """Time to sleep after each step of the backup, no lock is held so the bot can write (unit: second)"""
+    database_write_buffer_size: int = 200
+    """Number of buffered rows that triggers writing them to the database in one transaction"""
+    database_write_buffer_interval: float = 5.0
+    """Maximum time a buffered row waits before being written to the database (unit: second)"""
+    schedule_notes_concurrency: int = 10
+    """Maximum number of users whose realtime notes are checked at the same time"""
+    schedule_notes_page_size: int = 500
+    """Number of due users fetched from the database at a time when checking realtime notes"""
+    schedule_notes_region_rate: float = 2.0
+    """Maximum number of realtime notes requests per second sent to each region (Hoyolab / Miyoushe), 0 means no limit"""
     game_maintenance_time: tuple[datetime, datetime] | None = None
     """The maintenance time of the game (start, end), the automatic schedule will not be executed within this period"""
 
     expired_user_days: int = 180
     """The number of days expired users will delete users who have not used any instructions for this day."""
 
+    http_connection_limit: int = 100
+    """Maximum number of connections of the bot-wide HTTP session"""
+    http_connection_limit_per_host: int = 20
+    """Maximum number of connections to the same host of the bot-wide HTTP session"""
+    http_dns_cache_ttl: int = 300
+    """Time DNS results are cached by the bot-wide HTTP session (unit: second)"""
+    http_keepalive_timeout: float = 30
+    """Time idle connections of the bot-wide HTTP session are kept alive (unit: second)"""
+    http_request_timeout: float = 60
+    """Total timeout of a request sent by the bot-wide HTTP session (unit: second)"""
+    genshin_client_cache_size: int = 1000
+    """Maximum number of configured Genshin API clients kept in memory"""
+    genshin_client_cache_ttl: float = 600
+    """Time a configured Genshin API client is kept in memory (unit: second)"""
+    genshin_client_connection_limit: int = 100
+    """Maximum number of connections of the connection pool shared by Genshin API clients of the same region"""
+
+    render_pool_workers: int = 0
+    """Number of processes rendering images, 0 means the number of CPU cores"""
+    render_pool_queue_size: int = 16
+    """Number of render jobs queued in the render pool beyond the busy processes, further jobs wait"""
+    card_cache_directory: str = "data/card_cache"
+    """Directory of the rendered card images cached on disk"""
+    card_cache_memory_bytes: int = 64 * 1024 * 1024
+    """Maximum size of the rendered card images kept in memory (unit: byte)"""
+    card_cache_disk_bytes: int = 512 * 1024 * 1024
+    """Maximum size of the rendered card images kept on disk, 0 disables the disk cache (unit: byte)"""
+    card_cache_max_age: int = 7 * 24 * 60 * 60
+    """Time a rendered card image is kept on disk (unit: second)"""
+    asset_cache_max_bytes: int = 256 * 1024 * 1024
+    """Maximum pixel data of decoded images kept in memory by each rendering process (unit: byte)"""
+    asset_cache_warm_up: bool = True
+    """Whether the rendering processes decode the static images of the cards when they start"""
+
+    enka_layer_cache_bytes: int = 128 * 1024 * 1024
+    """Maximum pixel data of the cached static layers of Enka character cards in each rendering process (unit: byte)"""
+    enka_assets_refresh_interval: int = 24
+    """The Enka assets on disk are downloaded again in the background at startup when they are older than this (unit: hour)"""
+    enka_assets_stamp_path: str = "data/bot/enka_assets_updated"
+    """File whose modification time records the last download of the Enka assets"""
+    command_tree_hash_path: str = "data/bot/command_tree.sha256"
+    """Hash of the slash command definitions last synced to Discord, the tree is only synced again when it changes"""
+    genshin_db_snapshot_path: str = "data/genshin_db.json"
+    """Local snapshot of the genshin-db data, loaded at startup before the data is requested from the API"""
+    genshin_db_refresh_interval: int = 24
+    """Snapshots older than this are refreshed from the API in the background after startup (unit: hour)"""
+    genshin_db_aliases: dict[str, str] = {}
+    """Extra names accepted by the data search, {alias: item name}, e.g. {"Baal": "Raiden Shogun"}"""
+    genshin_db_embed_cache_size: int = 1024
+    """Number of genshin-db item embeds kept so that repeated searches skip building them"""
+    showcase_prerender: bool = False
+    """Whether the Genshin showcase renders the cards of all characters in the background after loading"""
+    showcase_prerender_concurrency: int = 2
+    """Number of character cards of one showcase rendered at the same time in the background"""
+    image_formats: dict[str, str] = {}
+    """Image format of each card type ("jpeg", "webp" or "png"), e.g. {"abyss_card": "webp"}, unlisted card types use jpeg"""
+    image_quality: dict[str, int] = {}
+    """Encoding quality of each card type (1-100), unlisted card types use the built-in quality of the card"""
+    image_effort: int = 4
+    """Encoder effort 0-6: WebP method, PNG compression level (scaled to 0-9), JPEG optimize pass when 4 or more"""
+
     slash_cmd_cooldown: float = 5.0
     """The cooldown time of the user using slash commands (unit: second)"""
     discord_view_long_timeout: float = 1800
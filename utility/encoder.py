@@ -0,0 +1,83 @@
+import time
+from io import BytesIO
+
+from PIL import Image
+
+from .config import config
+from .prometheus import Metrics
+
+DEFAULT_QUALITY: dict[str, int] = {
+    "record_card": 50,
+    "exploration_card": 50,
+    "abyss_card": 40,
+    "forgottenhall_card": 95,
+    "enka_card": 75,
+    "starrail_showcase": 90,
+    "character_list": 90,
+}
+"""Quality of each card type when `config.image_quality` does not set it"""
+
+_last_encode_seconds: float = 0.0
+
+
+def image_format(card: str) -> str:
+    """Image format of the card type: "jpeg", "webp" or "png" """
+    return config.image_formats.get(card, "jpeg").lower()
+
+
+def image_filename(card: str) -> str:
+    """File name of the card type's image when sent to Discord, e.g. "image.jpeg" """
+    return f"image.{image_format(card)}"
+
+
+def encode_image(img: Image.Image, card: str) -> bytes:
+    """Encode the card with the format, quality and effort configured for the card type
+
+    Parameters
+    ------
+    img: `Image`
+        The finished card
+    card: `str`
+        Card type, the key of `config.image_formats` and `config.image_quality`
+
+    Returns
+    ------
+    `bytes`
+        The encoded image
+    """
+    global _last_encode_seconds
+    started = time.perf_counter()
+    format = image_format(card)
+    quality = config.image_quality.get(card, DEFAULT_QUALITY.get(card, 85))
+    effort = min(max(config.image_effort, 0), 6)
+
+    fp = BytesIO()
+    img = img.convert("RGB")
+    match format:
+        case "webp":
+            img.save(fp, "webp", quality=quality, method=effort)
+        case "png":
+            img.save(fp, "png", compress_level=round(effort * 9 / 6))
+        case _:
+            # optimize takes an extra pass to compute the Huffman tables
+            img.save(fp, "jpeg", quality=quality, optimize=effort >= 4)
+    data = fp.getvalue()
+
+    _last_encode_seconds = time.perf_counter() - started
+    record_encoding(card, _last_encode_seconds, len(data))
+    return data
+
+
+def record_encoding(card: str, seconds: float, size: int) -> None:
+    """Record the encode time and the encoded size of the card type"""
+    format = image_format(card)
+    Metrics.IMAGE_ENCODE_SECONDS.labels(card, format).observe(seconds)
+    Metrics.IMAGE_ENCODED_BYTES.labels(card, format).observe(size)
+
+
+def pop_encode_seconds() -> float:
+    """Time of the last `encode_image` call in this process, reset to 0
+    (used to report the encodes done in the render pool)"""
+    global _last_encode_seconds
+    seconds, _last_encode_seconds = _last_encode_seconds, 0.0
+    return seconds
@@ -0,0 +1,52 @@
+from typing import ClassVar
+
+import aiohttp
+
+from .config import config
+
+
+class HttpClient:
+    """Bot-wide HTTP session. All outbound requests (other than the Genshin API clients) share one
+    connection pool with per-host connection limits, DNS caching and keep-alive.
+
+    Example: `async with HttpClient.session().get(url) as resp:`
+
+    Methods
+    -----
+    start()
+        Create the shared session, call this once when the bot starts
+    session()
+        Get the shared session, it is created if it has not been started yet
+    close()
+        Close the shared session, call this once before the bot shuts down
+    """
+
+    _session: ClassVar[aiohttp.ClientSession | None] = None
+
+    @classmethod
+    async def start(cls) -> None:
+        """Create the shared session, call this once when the bot starts"""
+        cls.session()
+
+    @classmethod
+    def session(cls) -> aiohttp.ClientSession:
+        """Get the shared session, it is created if it has not been started yet (must be called inside the event loop)"""
+        if cls._session is None or cls._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.http_connection_limit,
+                limit_per_host=config.http_connection_limit_per_host,
+                ttl_dns_cache=config.http_dns_cache_ttl,
+                keepalive_timeout=config.http_keepalive_timeout,
+            )
+            cls._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=config.http_request_timeout),
+            )
+        return cls._session
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared session, call this once before the bot shuts down"""
+        if cls._session is not None and not cls._session.closed:
+            await cls._session.close()
+        cls._session = None
@@ -0,0 +1,98 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import ClassVar, Iterable
+
+import sentry_sdk
+
+from .custom_log import LOG
+from .http import HttpClient
+
+
+class IconStore:
+    """Downloads the icons the painters need into the local image folders.
+
+    All missing icons of a card are fetched concurrently; a file that is already being downloaded by another
+    card is awaited instead of downloaded again (single-flight), and files are written to a temporary file
+    then renamed, so a half-written icon is never read. Decoded icons are cached in memory by `AssetCache`.
+
+    Methods
+    -----
+    fetch(path: `Path`, urls: `list[str]`)
+        Download the icon if it does not exist locally
+    prefetch(icons: `Iterable[tuple[Path, list[str]]]`)
+        Download all the missing icons concurrently, returns whether all of them exist
+    """
+
+    _inflight: ClassVar[dict[Path, asyncio.Task[bool]]] = {}
+
+    @classmethod
+    async def fetch(cls, path: Path, urls: list[str]) -> bool:
+        """Download the icon if it does not exist locally
+
+        Parameters
+        ------
+        path: `Path`
+            Local path of the icon
+        urls: `list[str]`
+            URLs of the icon, tried in order until one succeeds
+
+        Returns
+        ------
+        `bool`
+            Whether the icon exists locally
+        """
+        if path.exists():
+            return True
+        if (task := cls._inflight.get(path)) is None:
+            task = asyncio.create_task(cls._download(path, urls))
+            cls._inflight[path] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(path, None))
+        # shield: a cancelled card does not cancel the download other cards are waiting for
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def prefetch(cls, icons: Iterable[tuple[Path, list[str]]]) -> bool:
+        """Download all the missing icons concurrently
+
+        Parameters
+        ------
+        icons: `Iterable[tuple[Path, list[str]]]`
+            (local path, URLs) of each icon, duplicates are downloaded once
+
+        Returns
+        ------
+        `bool`
+            Whether all the icons exist locally
+        """
+        missing = {path: urls for path, urls in icons if not path.exists()}
+        if len(missing) == 0:
+            return True
+        return all(
+            await asyncio.gather(*[cls.fetch(path, urls) for path, urls in missing.items()])
+        )
+
+    @staticmethod
+    async def _download(path: Path, urls: list[str]) -> bool:
+        session = HttpClient.session()
+        for url in urls:
+            try:
+                async with session.get(url) as response:
+                    if response.status != 200:
+                        continue
+                    content = await response.read()
+            except Exception as e:
+                LOG.Error(f"Icon download error {url}: {e}")
+                sentry_sdk.capture_exception(e)
+                continue
+            await asyncio.to_thread(IconStore._write, path, content)
+            return True
+        return False
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The temporary file is per process, render pool processes may download the same icon
+        temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temp.write_bytes(content)
+        temp.replace(path)
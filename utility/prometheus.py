@@ -1,6 +1,6 @@
 from typing import Final
 
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 
 class Metrics:
@@ -36,3 +36,66 @@ class Metrics:
     PROCESS_START_TIME: Final[Gauge] = Gauge(
         PREFIX + "process_start_time_seconds", "The current time when the bot started"
     )
+
+    RENDER_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "render_seconds", "Time spent rendering an image in the render pool", ["job"]
+    )
+
+    RENDER_WAIT_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "render_wait_seconds", "Time a render job waited for a free place in the render pool", ["job"]
+    )
+
+    RENDER_JOBS_WAITING: Final[Gauge] = Gauge(
+        PREFIX + "render_jobs_waiting", "Number of render jobs waiting for a free place in the render pool"
+    )
+
+    IMAGE_ENCODE_SECONDS: Final[Histogram] = Histogram(
+        PREFIX + "image_encode_seconds", "Time spent encoding a card image", ["card", "format"]
+    )
+
+    IMAGE_ENCODED_BYTES: Final[Histogram] = Histogram(
+        PREFIX + "image_encoded_bytes",
+        "Size of an encoded card image",
+        ["card", "format"],
+        buckets=(50_000, 100_000, 200_000, 400_000, 800_000, 1_600_000, 3_200_000, 6_400_000),
+    )
+
+    CARD_CACHE_REQUESTS: Final[Counter] = Counter(
+        PREFIX + "card_cache_requests", "Number of rendered card cache lookups by the tier that answered", ["tier"]
+    )
+
+    ASSET_CACHE_REQUESTS: Final[Counter] = Counter(
+        PREFIX + "asset_cache_requests", "Number of decoded image requests to the asset cache", ["result"]
+    )
+
+    DATABASE_BACKUPS: Final[Counter] = Counter(
+        PREFIX + "database_backups", "Number of database backups", ["result"]
+    )
+
+    DATABASE_BACKUP_DURATION: Final[Gauge] = Gauge(
+        PREFIX + "database_backup_duration_seconds", "Duration of the latest database backup"
+    )
+
+    DATABASE_BACKUP_SIZE: Final[Gauge] = Gauge(
+        PREFIX + "database_backup_size_bytes", "File size of the latest database backup"
+    )
+
+    DAILY_REWARD_CLAIMS: Final[Counter] = Counter(
+        PREFIX + "daily_reward_claims", "Number of users signed in by each check-in host", ["host", "result"]
+    )
+
+    DAILY_REWARD_HOST_LATENCY: Final[Gauge] = Gauge(
+        PREFIX + "daily_reward_host_latency_seconds", "Moving average latency of signing in one user", ["host"]
+    )
+
+    DAILY_REWARD_HOST_ERROR_RATE: Final[Gauge] = Gauge(
+        PREFIX + "daily_reward_host_error_rate", "Moving average failure rate of check-in requests", ["host"]
+    )
+
+    DAILY_REWARD_HOST_SLOTS: Final[Gauge] = Gauge(
+        PREFIX + "daily_reward_host_slots", "Number of concurrent check-in requests allowed for each host", ["host"]
+    )
+
+    DAILY_REWARD_HOST_CIRCUIT: Final[Gauge] = Gauge(
+        PREFIX + "daily_reward_host_circuit", "Circuit breaker state of each host: 0 closed, 1 half-open, 2 open", ["host"]
+    )
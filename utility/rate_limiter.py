@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+
+class RateLimiter:
+    """Token bucket rate limiter, used to limit the number of requests per second sent to an API
+
+    Example: `await limiter.acquire()` before each request
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Parameters
+        ------
+        rate: `float`
+            Number of tokens refilled per second (requests per second)
+        burst: `int`
+            Maximum number of tokens the bucket can hold (requests allowed in a burst)
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens: float = float(self.burst)
+        self._updated_at: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then consume it"""
+        if self.rate <= 0:  # A rate of 0 or less means no limit
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
@@ -0,0 +1,139 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, ClassVar
+
+from .asset_cache import AssetCache
+from .card_cache import CardCache
+from .config import config
+from .encoder import pop_encode_seconds, record_encoding
+from .prometheus import Metrics
+
+
+class RenderPool:
+    """Process pool for CPU-heavy Pillow rendering, keeping the event loop (and the gateway heartbeats) responsive.
+
+    Jobs are module-level functions taking picklable arguments and returning the encoded image bytes.
+    Results are cached by `CardCache`, a job with the same function and arguments is only rendered once.
+    At most `workers + config.render_pool_queue_size` jobs are handed to the pool at the same time,
+    further callers wait for a free place (backpressure) instead of growing the pool's queue without bound.
+
+    Example: `image = await RenderPool.submit("record_card", render_record_card, avatar_bytes, uid, ...)`
+
+    Methods
+    -----
+    start()
+        Create the process pool, call this once when the bot starts
+    submit(job: `str`, fn: `Callable[..., bytes]`, *args, cache: `bool`)
+        Run the rendering function in the pool and return its result
+    close()
+        Shut down the process pool, call this once before the bot shuts down
+    """
+
+    _executor: ClassVar[ProcessPoolExecutor | None] = None
+    _semaphore: ClassVar[asyncio.Semaphore | None] = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Create the process pool, call this once when the bot starts"""
+        if cls._executor is not None:
+            return
+        workers = config.render_pool_workers or os.cpu_count() or 1
+        # spawn: worker processes do not inherit the bot's threads and event loop
+        cls._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=AssetCache.warm_up,
+        )
+        if cls._semaphore is None:
+            # Kept when a broken pool is replaced, jobs waiting on it still hold or await its places
+            cls._semaphore = asyncio.Semaphore(workers + config.render_pool_queue_size)
+
+    @classmethod
+    async def submit(
+        cls, job: str, fn: Callable[..., bytes], *args: Any, cache: bool = True
+    ) -> bytes:
+        """Run the rendering function in the pool and return its result
+
+        Parameters
+        ------
+        job: `str`
+            Name of the job, used as the label of the metrics
+        fn: `Callable[..., bytes]`
+            Module-level rendering function, returns the encoded image
+        *args: `Any`
+            Picklable arguments of the rendering function
+        cache: `bool`
+            Whether to look up and store the result in `CardCache`
+
+        Returns
+        ------
+        `bytes`
+            The encoded image
+        """
+        key = await asyncio.to_thread(CardCache.key, job, fn, args) if cache else None
+        if key is None:
+            return await cls._render(job, fn, *args)
+        if (image := await asyncio.to_thread(CardCache.get, key)) is not None:
+            return image
+        image = await cls._render(job, fn, *args)
+        await asyncio.to_thread(CardCache.put, key, image)
+        return image
+
+    @classmethod
+    async def _render(cls, job: str, fn: Callable[..., bytes], *args: Any) -> bytes:
+        if cls._executor is None or cls._semaphore is None:
+            cls.start()
+        assert cls._executor is not None and cls._semaphore is not None
+
+        queued_at = time.perf_counter()
+        Metrics.RENDER_JOBS_WAITING.inc()
+        try:
+            await cls._semaphore.acquire()
+        finally:
+            Metrics.RENDER_JOBS_WAITING.dec()
+        try:
+            started = time.perf_counter()
+            Metrics.RENDER_WAIT_SECONDS.labels(job).observe(started - queued_at)
+            if cls._executor is None:  # The pool broke while this job was waiting
+                cls.start()
+            executor = cls._executor
+            assert executor is not None
+            try:
+                result, encode_seconds, asset_requests = (
+                    await asyncio.get_running_loop().run_in_executor(executor, _run_job, fn, *args)
+                )
+            except BrokenProcessPool:
+                # A worker died, shut down the broken pool (its management thread and remaining processes),
+                # the next job creates a new pool
+                executor.shutdown(wait=False, cancel_futures=True)
+                if cls._executor is executor:
+                    cls._executor = None
+                raise
+            Metrics.RENDER_SECONDS.labels(job).observe(time.perf_counter() - started)
+            if encode_seconds > 0:
+                record_encoding(job, encode_seconds, len(result))
+            for asset_result, count in asset_requests.items():
+                if count > 0:
+                    Metrics.ASSET_CACHE_REQUESTS.labels(asset_result).inc(count)
+            return result
+        finally:
+            cls._semaphore.release()
+
+    @classmethod
+    def close(cls) -> None:
+        """Shut down the process pool, call this once before the bot shuts down"""
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+
+def _run_job(fn: Callable[..., bytes], *args: Any) -> tuple[bytes, float, dict[str, int]]:
+    """Run the rendering function in a worker process, also return its encode time and asset cache requests,
+    since metrics are only exported by the bot's process"""
+    pop_encode_seconds()
+    result = fn(*args)
+    return result, pop_encode_seconds(), AssetCache.pop_requests()
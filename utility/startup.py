@@ -0,0 +1,92 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, ClassVar, Coroutine, Iterator
+
+import sentry_sdk
+
+from .custom_log import LOG
+
+
+class Startup:
+    """Timing of the bot's startup phases.
+
+    Phases that the bot needs before it can answer run in `setup_hook` inside `phase`; work that can finish
+    later (remote data, asset updates) runs in `background`, so that it does not delay the login.
+    `report` logs how long each phase took, background phases are logged as they finish.
+
+    Example:
+    ```
+    with Startup.phase("database"):
+        await Database.init()
+    Startup.background("genshin character names", update_characters_enka(["en-us"]))
+    ```
+
+    Methods
+    -----
+    phase(name: `str`)
+        Context manager that times a startup phase
+    background(name: `str`, coro: `Coroutine`) -> `asyncio.Task`
+        Run the coroutine in the background and log its duration
+    report()
+        Log the duration of the phases run so far
+    """
+
+    _started: ClassVar[float] = time.perf_counter()
+    _phases: ClassVar[list[tuple[str, float]]] = []
+    _tasks: ClassVar[set[asyncio.Task]] = set()
+
+    @classmethod
+    @contextlib.contextmanager
+    def phase(cls, name: str) -> Iterator[None]:
+        """Time the startup phase run in the with block
+
+        Parameters
+        ------
+        name: `str`
+            Name of the phase shown in the report
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls._phases.append((name, time.perf_counter() - started))
+
+    @classmethod
+    def background(cls, name: str, coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Run the coroutine in the background, log its duration when it finishes and report its errors
+
+        Parameters
+        ------
+        name: `str`
+            Name of the phase shown in the log
+        coro: `Coroutine`
+            The work to run
+        """
+
+        async def run() -> None:
+            started = time.perf_counter()
+            try:
+                await coro
+            except Exception as e:
+                LOG.Error(
+                    f"startup: {name} failed after {time.perf_counter() - started:.2f}s: {e}"
+                )
+                sentry_sdk.capture_exception(e)
+            else:
+                LOG.System(
+                    f"startup: {name} finished in the background in {time.perf_counter() - started:.2f}s"
+                )
+
+        task = asyncio.create_task(run())
+        # keep a reference so that the task is not garbage collected before it finishes
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+        return task
+
+    @classmethod
+    def report(cls) -> None:
+        """Log the duration of each phase and the total time since the process started"""
+        for name, seconds in cls._phases:
+            LOG.System(f"startup: {name:<24} {seconds:7.2f}s")
+        LOG.System(f"startup: {'total':<24} {time.perf_counter() - cls._started:7.2f}s")